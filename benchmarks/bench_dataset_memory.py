@@ -0,0 +1,98 @@
+"""
+Per-process memory of the dashboard dataset: pandas.read_csv vs memory-mapped Arrow.
+
+Each mode is loaded in a fresh subprocess. We report private (anonymous) RSS,
+which is what grows with every extra Streamlit process, and file-backed RSS,
+which lives in the shared OS page cache.
+
+    python benchmarks/bench_dataset_memory.py --scale 500
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+sys.path.insert(0, SRC_DIR)
+
+
+def read_rss():
+    """ Returns (private_mb, file_backed_mb) from /proc, or ru_maxrss when /proc is unavailable. """
+    status = '/proc/self/status'
+    if os.path.exists(status):
+        fields = {}
+        with open(status) as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                fields[key] = value.strip()
+        kb = lambda k: int(fields.get(k, '0 kB').split()[0])
+        return kb('RssAnon') / 1024, kb('RssFile') / 1024
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 0.0
+
+
+def _worker(mode, csv_path, cache_dir):
+    import pandas as pd
+    import data_store
+
+    data_store.CACHE_DIR = cache_dir
+
+    before_anon, before_file = read_rss()
+    if mode == 'csv':
+        df = pd.read_csv(csv_path)
+    else:
+        df = data_store.load_table(csv_path)
+    # Touch every column, like a dashboard page would
+    for col in df.columns:
+        df[col].iloc[-1]
+    after_anon, after_file = read_rss()
+    print(json.dumps({'mode': mode, 'rows': len(df),
+                      'private_mb': round(after_anon - before_anon, 2),
+                      'shared_mb': round(after_file - before_file, 2)}))
+
+
+def build_scaled_csv(scale, out_dir):
+    import pandas as pd
+    import data_store
+
+    df = pd.read_csv(data_store.SILVER_FILE)
+    scaled = pd.concat([df] * scale, ignore_index=True)
+    path = os.path.join(out_dir, 'silver_cleaned.csv')
+    scaled.to_csv(path, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scale', type=int, default=500, help="Replicate the silver table N times")
+    parser.add_argument('--worker', nargs=3, metavar=('MODE', 'CSV', 'CACHE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(*args.worker)
+        return
+
+    import data_store
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = build_scaled_csv(args.scale, tmp)
+
+        # Build the Arrow cache up front so only the read is measured
+        data_store.CACHE_DIR = os.path.join(tmp, 'cache')
+        data_store.build_arrow_cache(csv_path)
+
+        results = []
+        for mode in ('csv', 'arrow'):
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', mode, csv_path, data_store.CACHE_DIR],
+                                 check=True, capture_output=True, text=True)
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    for r in results:
+        print(f"{r['mode']:>6}: {r['rows']} rows | private {r['private_mb']:.1f} MB | shared page cache {r['shared_mb']:.1f} MB")
+    saved = results[0]['private_mb'] - results[1]['private_mb']
+    print(f"Per-process private RSS saved by memory-mapped Arrow: {saved:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
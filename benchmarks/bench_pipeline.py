@@ -0,0 +1,385 @@
+"""
+Stage-level benchmark of the bronze -> silver -> gold pipeline at several cohort sizes.
+
+Cohorts come from data_generator in the real bronze layout, shaped by a scenario
+profile (clean / realistic / adversarial, see data_generator.SCENARIOS), and are
+cached in benchmarks/.cache. For every scale the suite times each cleaning step,
+each statistical query, the correlation matrices, P/T reliability, each trajectory
+model fit, the per-participant rolling windows, the distress alert replay, the
+streaming NLP engine (read, narrative build, tokenize, inference, write) and the
+distinctive-terms slices, using the same RunLogger spans the pipeline writes in
+production.
+Sentiment uses a tiny local stand-in model so no network or torch is needed.
+A second pass under tracemalloc records peak Python/numpy allocations per engine
+(kept separate so tracing overhead doesn't skew the timings).
+
+Each run appends one JSON line per scale to benchmarks/results/history.jsonl,
+tagged with the git commit, so regressions can be compared across commits:
+
+    python benchmarks/bench_pipeline.py                       # 1k, 100k, 1M sessions
+    python benchmarks/bench_pipeline.py --scales 1000,20000
+    python benchmarks/bench_pipeline.py --scenario adversarial --scales 100000
+    python benchmarks/bench_pipeline.py --scales 1000 --compare HEAD~1 --threshold 1.25
+    python benchmarks/bench_pipeline.py --scales 100000 --backend polars
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+CACHE_DIR = os.path.join(ROOT_DIR, 'benchmarks', '.cache')
+HISTORY_FILE = os.path.join(ROOT_DIR, 'benchmarks', 'results', 'history.jsonl')
+
+sys.path.insert(0, SRC_DIR)
+import data_generator
+import data_cleaning
+import analytics_gold_stats
+import analytics_gold_nlp
+import analytics_gold_terms
+import analytics_gold_correlations
+import analytics_gold_trajectories
+import analytics_gold_reliability
+import analytics_gold_rolling
+import distress_alerts
+import silver_dedup
+import resampling
+from instrumentation import RunLogger
+
+DEFAULT_SCALES = [1_000, 100_000, 1_000_000]
+DEFAULT_SCENARIO = 'realistic'
+SEED = 42
+
+
+# --- STAND-IN SENTIMENT MODEL ---
+
+class TinySentimentModel:
+    """
+    Hashed bag-of-words x fixed random weights + softmax.
+    Same call contract and output shape as the HF sentiment pipeline, so
+    analytics_gold_nlp runs unchanged; the numbers are meaningless, the cost profile
+    (per-text tokenize + small matrix work) is what we benchmark.
+    encode() also returns a mean-pooled hashed embedding per text, like the
+    multi-task RoBERTa pass (sentiment + embedding + strategy tags).
+    """
+
+    def __init__(self, n_features=4096, n_labels=3, n_dims=64, seed=0):
+        self.n_features = n_features
+        rng = np.random.default_rng(seed)
+        self.weights = rng.normal(size=(n_features, n_labels))
+        self.embedding = rng.normal(size=(n_features, n_dims))
+
+    def __call__(self, texts, truncation=True, max_length=512):
+        return self.predict(self.tokenize(texts, truncation, max_length))
+
+    def tokenize(self, texts, truncation=True, max_length=512):
+        """ Feature ids per text (the streaming engine runs this in its tokenizer threads). """
+        encoded = []
+        for text in texts:
+            tokens = text.lower().split()
+            if truncation:
+                tokens = tokens[:max_length]
+            encoded.append([zlib.crc32(t.encode()) % self.n_features for t in tokens])
+        return encoded
+
+    def predict(self, encoded):
+        predictions = []
+        for idx in encoded:
+            logits = self.weights[idx].sum(axis=0)
+            probs = np.exp(logits - logits.max())
+            probs /= probs.sum()
+            best = int(probs.argmax())
+            predictions.append({'label': f"LABEL_{best}", 'score': float(probs[best])})
+        return predictions
+
+    def encode(self, encoded):
+        embeddings = np.array([self.embedding[idx].mean(axis=0) for idx in encoded])
+        return self.predict(encoded), embeddings
+
+
+# --- COHORTS ---
+
+def generator_version():
+    """ Cached cohorts are invalidated when the generator code changes. """
+    with open(data_generator.__file__, 'rb') as f:
+        return f"{zlib.crc32(f.read()):08x}"
+
+
+def load_cohort(n_sessions, scenario=DEFAULT_SCENARIO, seed=SEED):
+    """ Bronze-layout cohort of n_sessions rows, generated once and cached as Feather. """
+    path = os.path.join(CACHE_DIR, f"bronze_{scenario}_{n_sessions}_s{seed}_{generator_version()}.feather")
+    if os.path.exists(path):
+        return pd.read_feather(path)
+
+    print(f"   🏭 Generating {n_sessions:,} '{scenario}' sessions (cached for next time)...")
+    started = time.perf_counter()
+    df = data_generator.generate_bronze(n_sessions, scenario, seed=seed)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    df.to_feather(path)
+    print(f"      done in {time.perf_counter() - started:.1f}s")
+    return df
+
+
+# --- STAGES ---
+
+def run_clean(bronze, run):
+    return data_cleaning.clean_bronze_frame(bronze.copy(), run)
+
+
+def run_stats(silver, run, n_resamples=None):
+    return analytics_gold_stats.compute_statistical_answers(silver, run, n_resamples)
+
+
+def run_correlations(silver, run):
+    return analytics_gold_correlations.compute_correlations(silver, run)
+
+
+def run_reliability(silver, run):
+    pairs = silver_dedup.build_session_tables(silver, run)[3]
+    return analytics_gold_reliability.compute_reliability(pairs, run)
+
+
+def run_trajectories(silver, run, max_workers=None):
+    return analytics_gold_trajectories.compute_trajectories(silver, run, max_workers)
+
+
+def run_rolling(silver, run, nlp=None):
+    sessions = silver_dedup.build_session_tables(silver, run)[2]
+    return analytics_gold_rolling.compute_rolling(analytics_gold_rolling.metric_frame(sessions, nlp), run=run)
+
+
+def run_alerts(silver, run):
+    """ Backtest replay of the streaming distress engine over all of silver (no files written). """
+    with run.span('replay', rows=len(silver)) as span:
+        alerts = distress_alerts.DistressAlertEngine().process(silver.sort_values(silver_dedup.SESSION_KEY, kind='stable'))
+        span.rows = len(alerts)
+    return alerts
+
+
+def run_nlp(silver, run, model):
+    """
+    The production streaming engine end to end (read -> narrative -> tokenize -> inference -> write)
+    into a temp directory, read back the way the terms and rolling engines read the sentiment file.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sentiment.csv')
+        analytics_gold_nlp.stream_sessions(model, silver, run, path=path,
+                                           embeddings_path=os.path.join(tmp, 'embeddings.feather'))
+        with run.span('read_back') as span:
+            nlp = pd.read_csv(path)
+            span.rows = len(nlp)
+    return nlp
+
+
+def run_terms(nlp, run):
+    return analytics_gold_terms.compute_distinctive_terms(nlp, run)
+
+
+def time_stages(bronze, model, n_resamples=None):
+    """
+    One timed pass; returns ({'engine.step': record}, silver frame, pass wall seconds).
+    Step records nest and overlap (a pool span and its fits, a stream and its stages),
+    so the pass total is timed end to end instead of summed from them.
+    """
+    timings = {}
+    started = time.perf_counter()
+    clean_run = RunLogger('bench_clean', log_file=False)
+    silver = run_clean(bronze, clean_run)
+
+    stats_run = RunLogger('bench_stats', log_file=False)
+    run_stats(silver, stats_run, n_resamples)
+
+    corr_run = RunLogger('bench_correlations', log_file=False)
+    run_correlations(silver, corr_run)
+
+    rel_run = RunLogger('bench_reliability', log_file=False)
+    run_reliability(silver, rel_run)
+
+    traj_run = RunLogger('bench_trajectories', log_file=False)
+    run_trajectories(silver, traj_run)
+
+    alerts_run = RunLogger('bench_alerts', log_file=False)
+    run_alerts(silver, alerts_run)
+
+    nlp_run = RunLogger('bench_nlp', log_file=False)
+    nlp = run_nlp(silver, nlp_run, model)
+
+    terms_run = RunLogger('bench_terms', log_file=False)
+    run_terms(nlp, terms_run)
+
+    rolling_run = RunLogger('bench_rolling', log_file=False)
+    run_rolling(silver, rolling_run, nlp)
+    wall_s = time.perf_counter() - started
+
+    engines = (('clean', clean_run), ('stats', stats_run), ('corr', corr_run), ('rel', rel_run),
+               ('traj', traj_run), ('alerts', alerts_run), ('nlp', nlp_run), ('terms', terms_run),
+               ('rolling', rolling_run))
+    for engine, run in engines:
+        for r in run.records:
+            timings[f"{engine}.{r['stage']}"] = {'wall_s': r['wall_s'], 'cpu_s': r['cpu_s'], 'rows': r['rows']}
+    return timings, silver, round(wall_s, 3)
+
+
+def traced_peak_mb(fn, *args):
+    """ Peak traced allocation (MB) while fn runs. numpy buffers are traced too. """
+    tracemalloc.start()
+    try:
+        fn(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / (1024 * 1024), 1)
+
+
+def memory_pass(bronze, silver, model, n_resamples=None):
+    quiet = lambda name: RunLogger(name, log_file=False)
+    nlp = run_nlp(silver, quiet('nlp'), model)
+    return {
+        'clean': traced_peak_mb(lambda: run_clean(bronze, quiet('clean'))),
+        'stats': traced_peak_mb(lambda: run_stats(silver, quiet('stats'), n_resamples)),
+        'corr': traced_peak_mb(lambda: run_correlations(silver, quiet('correlations'))),
+        'rel': traced_peak_mb(lambda: run_reliability(silver, quiet('reliability'))),
+        # In-process so tracemalloc sees the fits
+        'traj': traced_peak_mb(lambda: run_trajectories(silver, quiet('trajectories'), max_workers=1)),
+        'alerts': traced_peak_mb(lambda: run_alerts(silver, quiet('alerts'))),
+        'nlp': traced_peak_mb(lambda: run_nlp(silver, quiet('nlp'), model)),
+        'terms': traced_peak_mb(lambda: run_terms(nlp, quiet('terms'))),
+        'rolling': traced_peak_mb(lambda: run_rolling(silver, quiet('rolling'), nlp))
+    }
+
+
+# --- HISTORY ---
+
+def git_commit():
+    """ (sha, dirty) of the working tree, or (None, None) outside git. """
+    try:
+        sha = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT_DIR, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT_DIR,
+                                capture_output=True, text=True, check=True).stdout
+        return sha, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def resolve_commit(ref):
+    try:
+        return subprocess.run(['git', 'rev-parse', ref], cwd=ROOT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ref  # Maybe already a (short) sha from another clone
+
+
+def load_history():
+    if not os.path.exists(HISTORY_FILE):
+        return []
+    with open(HISTORY_FILE) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(entries):
+    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+    with open(HISTORY_FILE, 'a') as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+
+def compare(entry, history, ref, threshold):
+    """ Prints wall-time ratios vs the latest history entry for ref at the same scale. Returns regressions. """
+    sha = resolve_commit(ref)
+    # Entries from before scenarios existed were generated with the clean profile
+    baseline = next((h for h in reversed(history)
+                     if h['n_sessions'] == entry['n_sessions'] and h.get('scenario', 'clean') == entry['scenario']
+                     and h.get('backend', 'pandas') == entry['backend'] and h['commit'] and h['commit'].startswith(sha[:7])), None)
+    if baseline is None:
+        print(f"   ⚠️ No '{entry['scenario']}' history for {ref} at {entry['n_sessions']:,} sessions to compare against.")
+        return []
+
+    regressions = []
+    print(f"   📈 vs {baseline['commit'][:8]} ({baseline['timestamp']}), flagging > {threshold:.2f}x:")
+    for stage, now in entry['stages'].items():
+        before = baseline['stages'].get(stage)
+        if not before or before['wall_s'] <= 0:
+            continue
+        ratio = now['wall_s'] / before['wall_s']
+        # Sub-millisecond steps are noise, not regressions
+        flag = ratio > threshold and now['wall_s'] - before['wall_s'] > 0.005
+        if flag:
+            regressions.append(stage)
+        print(f"      {'❌' if flag else '  '} {stage:<28} {before['wall_s']:9.3f}s -> {now['wall_s']:9.3f}s  ({ratio:.2f}x)")
+    return regressions
+
+
+# --- MAIN ---
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', default=",".join(str(s) for s in DEFAULT_SCALES),
+                        help="Comma separated cohort sizes (sessions)")
+    parser.add_argument('--scenario', default=DEFAULT_SCENARIO, choices=list(data_generator.SCENARIOS),
+                        help="Workload profile for the generated cohorts")
+    parser.add_argument('--resamples', type=int, default=None,
+                        help="Bootstrap/permutation resamples per stats query (default: the engine's)")
+    parser.add_argument('--backend', default='pandas', choices=['pandas', 'polars'],
+                        help="Dataframe backend for the cleaning transforms (see frame_backend.py)")
+    parser.add_argument('--skip-memory', action='store_true', help="Skip the tracemalloc pass")
+    parser.add_argument('--no-record', action='store_true', help="Don't append to history.jsonl")
+    parser.add_argument('--compare', metavar='REF', help="Commit to compare against (from history.jsonl)")
+    parser.add_argument('--threshold', type=float, default=1.2, help="Wall-time ratio that counts as a regression")
+    args = parser.parse_args()
+    os.environ['FRAME_BACKEND'] = args.backend
+
+    scales = [int(s) for s in args.scales.split(',') if s]
+    model = TinySentimentModel()
+    sha, dirty = git_commit()
+    history = load_history()
+    entries, regressions = [], []
+
+    for n in scales:
+        print(f"🏁 Benchmarking {n:,} '{args.scenario}' sessions ({args.backend} backend)")
+        bronze = load_cohort(n, args.scenario)
+        timings, silver, wall_s = time_stages(bronze, model, args.resamples)
+        entry = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': sha,
+            'dirty': dirty,
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'scenario': args.scenario,
+            'backend': args.backend,
+            'resamples': args.resamples or resampling.N_RESAMPLES,
+            'n_sessions': n,
+            'stages': timings,
+            'total_wall_s': wall_s,
+            'peak_traced_mb': None if args.skip_memory else memory_pass(bronze, silver, model, args.resamples)
+        }
+        entries.append(entry)
+
+        for stage, t in sorted(timings.items(), key=lambda kv: kv[1]['wall_s'], reverse=True)[:8]:
+            print(f"   - {stage:<28} {t['wall_s']:9.3f}s wall  {t['cpu_s']:9.3f}s cpu")
+        print(f"   = {entry['total_wall_s']:.2f}s total | peak traced MB: {entry['peak_traced_mb']}")
+        if args.compare:
+            regressions += [f"{n}:{s}" for s in compare(entry, history, args.compare, args.threshold)]
+
+    if not args.no_record:
+        append_history(entries)
+        print(f"📝 Appended {len(entries)} entries to {HISTORY_FILE}")
+
+    if regressions:
+        print(f"❌ {len(regressions)} stage(s) regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
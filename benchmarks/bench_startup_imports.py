@@ -0,0 +1,77 @@
+"""
+Import-time profile of the dashboard cold start (python -X importtime).
+
+'startup' is everything app.py imports before the first page renders; each
+page row is what that page adds on first navigation. The report is written to
+benchmarks/results/startup_importtime.txt and checked in, so a regression
+shows up in the diff.
+
+    python benchmarks/bench_startup_imports.py [--budget-ms 1500]
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+REPORT_FILE = os.path.join(ROOT_DIR, 'benchmarks', 'results', 'startup_importtime.txt')
+
+sys.path.insert(0, SRC_DIR)
+from modules import PAGES
+
+STARTUP_IMPORTS = "import streamlit, pandas, data_store, modules"
+
+
+def profile_imports(code):
+    """ Runs code under -X importtime and returns [(cumulative_us, module, depth)]. """
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                         capture_output=True, text=True, env=env, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(cumulative), name.strip(), depth))
+    return rows
+
+
+def top_level_ms(rows):
+    return sum(us for us, _, depth in rows if depth == 0) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--budget-ms', type=float, default=None, help="Fail if startup imports exceed this")
+    parser.add_argument('--top', type=int, default=15, help="Slowest startup imports to list")
+    args = parser.parse_args()
+
+    startup = profile_imports(STARTUP_IMPORTS)
+    lines = [f"Dashboard startup imports: {top_level_ms(startup):.0f} ms", ""]
+    lines.append(f"Slowest top-level packages at startup (cumulative ms):")
+    for us, name, _ in sorted((r for r in startup if r[2] == 0), reverse=True)[:args.top]:
+        lines.append(f"  {us / 1000:8.1f}  {name}")
+
+    lines.append("")
+    lines.append("Extra cost of each page on first navigation (ms):")
+    for label, module_name in PAGES.items():
+        rows = profile_imports(f"{STARTUP_IMPORTS}; import modules.{module_name}")
+        page_us = next((us for us, name, _ in rows if name == f"modules.{module_name}"), 0)
+        lines.append(f"  {page_us / 1000:8.1f}  {label}")
+
+    report = "\n".join(lines)
+    print(report)
+    os.makedirs(os.path.dirname(REPORT_FILE), exist_ok=True)
+    with open(REPORT_FILE, 'w') as f:
+        f.write(report + "\n")
+
+    total = top_level_ms(startup)
+    if args.budget_ms is not None and total > args.budget_ms:
+        print(f"❌ Startup imports took {total:.0f} ms (budget {args.budget_ms:.0f} ms)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
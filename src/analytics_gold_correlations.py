@@ -0,0 +1,170 @@
+import pandas as pd
+import numpy as np
+import os
+import re
+from scipy.special import stdtr
+from instrumentation import RunLogger
+
+# --- CONFIGURATION ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+INPUT_FILE = os.path.join(PROJECT_ROOT, 'data', 'silver', 'After_transformation_Data', 'silver_cleaned.csv')
+OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'data', 'gold', 'statistical_results')
+OUTPUT_FILE = os.path.join(OUTPUT_DIR, 'gold_correlations.csv')
+
+# Q15 is stored as text in bronze; its parsed numeric column stands in for it
+DERIVED_QUESTION_COLUMNS = {'Q15': 'Q15_Response_Time_Seconds'}
+
+
+def question_columns(df):
+    """
+    First numeric column per question number, in question order -> {'Q1': column, ...}.
+    Silver keeps the raw bronze score columns (NaN where blank) ahead of the
+    standardised *_Numeric copies (NaN filled with 0), so raw scores win.
+    """
+    found = {}
+    for col in df.columns:
+        match = re.search(r'(?:^|_)Q(\d+)(?:_|$)', col)
+        if not match or col.lower().startswith('comment') or not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        found.setdefault(f"Q{match.group(1)}", col)
+    for qid, col in DERIVED_QUESTION_COLUMNS.items():
+        if col in df.columns:
+            found[qid] = col
+    return dict(sorted(found.items(), key=lambda kv: int(kv[0][1:])))
+
+
+def question_label(qid, col):
+    """ 'Q1', 'engagement_score_Q1' -> 'Q1 engagement score' """
+    text = re.sub(r'(?:^|_)Q\d+(?:_|$)', ' ', col).replace('_', ' ').replace('&', ' & ')
+    text = re.sub(r'\s+', ' ', text).strip()
+    return f"{qid} {text[:40]}".strip()
+
+
+def pairwise_pearson(X):
+    """
+    Pearson r and pair counts for every column pair of X (n x k, NaN = missing),
+    using only the rows where both columns are present.
+    Five k x k matrix products replace k^2 separate passes:
+        n_ij, sum x_i, sum x_i^2 (over rows where j is present), sum x_i x_j
+    """
+    # Centre on the column means first; correlation is shift-invariant and this avoids cancellation.
+    # Means from sum / count, so an all-NaN column (count 0) just gets NaN correlations
+    present = (~np.isnan(X)).astype(float)
+    counts = present.sum(axis=0)
+    X = X - np.where(present > 0, X, 0.0).sum(axis=0) / np.maximum(counts, 1)
+    X0 = np.where(present > 0, X, 0.0)
+
+    n = present.T @ present                 # rows with both i and j
+    s = X0.T @ present                      # sum of x_i where j present
+    ss = (X0 ** 2).T @ present              # sum of x_i^2 where j present
+    sxy = X0.T @ X0                         # sum of x_i * x_j (zeros drop missing rows)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - s * s.T / n
+        var_i = ss - s ** 2 / n
+        r = cov / np.sqrt(var_i * var_i.T)
+    r[(n < 3) | ~np.isfinite(r)] = np.nan
+    return np.clip(r, -1.0, 1.0), n
+
+
+def rank_columns(X):
+    """ Average ranks per column (ties share a rank), NaN stays NaN. """
+    return pd.DataFrame(X).rank(method='average').to_numpy()
+
+
+def pairwise_spearman(X, n):
+    """
+    Spearman rho = Pearson on ranks. Ranking each column once is exact when both
+    columns are present on exactly the pair's rows; a pair that is missing rows
+    either column has (even if only one column has gaps) is re-ranked on its
+    common rows (usually none).
+    """
+    rho, _ = pairwise_pearson(rank_columns(X))
+    counts = (~np.isnan(X)).sum(axis=0)
+    partial = np.argwhere(np.triu(n < np.maximum.outer(counts, counts), k=1))
+    for i, j in partial:
+        both = ~np.isnan(X[:, i]) & ~np.isnan(X[:, j])
+        if both.sum() < 3:
+            continue
+        sub, _ = pairwise_pearson(rank_columns(X[both][:, [i, j]]))
+        rho[i, j] = rho[j, i] = sub[0, 1]
+    return rho
+
+
+def correlation_p_values(r, n):
+    """ Two-sided p-value of r with n pairs (t-test, n - 2 degrees of freedom). """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dof = n - 2
+        t = r * np.sqrt(dof / np.maximum(1 - r ** 2, 1e-300))
+        p = 2 * stdtr(dof, -np.abs(t))
+    p[np.isnan(r)] = np.nan
+    return p
+
+
+def compute_correlations(df, run=None):
+    """
+    Full Pearson + Spearman matrices (with p-values) across all question columns.
+    Returns a long table: one row per ordered pair, diagonal included.
+    """
+    run = run or RunLogger('gold_correlations', log_file=False)
+    columns = question_columns(df)
+    qids = list(columns)
+    X = df[list(columns.values())].to_numpy(dtype=float)
+
+    with run.span('pearson', rows=len(df)):
+        r, n = pairwise_pearson(X)
+        r_p = correlation_p_values(r, n)
+
+    with run.span('spearman', rows=len(df)):
+        rho = pairwise_spearman(X, n)
+        rho_p = correlation_p_values(rho, n)
+
+    k = len(qids)
+    i, j = np.divmod(np.arange(k * k), k)
+    labels = [question_label(q, columns[q]) for q in qids]
+    return pd.DataFrame({
+        'Var_X': np.array(qids)[i],
+        'Var_Y': np.array(qids)[j],
+        'Label_X': np.array(labels)[i],
+        'Label_Y': np.array(labels)[j],
+        'Column_X': np.array(list(columns.values()))[i],
+        'Column_Y': np.array(list(columns.values()))[j],
+        'N': n.ravel().astype(int),
+        'Pearson_r': np.round(r.ravel(), 4),
+        'Pearson_p': r_p.ravel(),
+        'Spearman_rho': np.round(rho.ravel(), 4),
+        'Spearman_p': rho_p.ravel()
+    })
+
+
+def run_correlation_engine(df=None):
+    """
+    Computes the question-by-question correlation matrices and writes gold_correlations.csv.
+    Pass an in-memory silver frame as df to skip re-reading the CSV.
+    """
+    print("🔗 Starting Correlation Engine...")
+    run = RunLogger('gold_correlations')
+
+    if df is None:
+        if not os.path.exists(INPUT_FILE):
+            print(f"❌ Error: {INPUT_FILE} not found.")
+            return
+
+        with run.span('load') as span:
+            df = pd.read_csv(INPUT_FILE)
+            span.rows = len(df)
+
+    results_df = compute_correlations(df, run)
+    print(f"   - {results_df['Var_X'].nunique()} question columns, {len(results_df)} pairs.")
+
+    with run.span('save', rows=len(results_df)):
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        results_df.to_csv(OUTPUT_FILE, index=False)
+
+    print(f"✅ DONE! Correlations saved to: {OUTPUT_FILE}")
+    run.finish()
+    return results_df
+
+if __name__ == "__main__":
+    run_correlation_engine()
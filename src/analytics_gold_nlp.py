@@ -2,8 +2,13 @@ import pandas as pd
 import numpy as np
 import os
 import re
+import copy
+import argparse
+import threading
 from collections import Counter
-from transformers import pipeline
+import pyarrow as pa
+from instrumentation import RunLogger
+from stream_pipeline import StreamPipeline, StreamStage
 
 # --- CONFIGURATION ---
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -14,83 +19,434 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 STOPWORDS = set(['the', 'and', 'to', 'of', 'a', 'in', 'is', 'that', 'was', 'he', 'his', 'she', 'her', 'it', 'for', 'on', 'with', 'as', 'at', 'this', 'by', 'an', 'nan', 'none', 'story', 'session', 'child'])
 
-def run_nlp_engine():
-    print("🧠 Starting Result-Oriented NLP Engine...")
-    
-    if not os.path.exists(INPUT_FILE):
-        print(f"❌ Error: {INPUT_FILE} not found.")
-        return
+# Narrative building blocks
+THEME_COL = 'Theme_specific_situation'
+ENG_COL = 'Q1_Engagement_Numeric'
+SUCC_COL = 'Success_Rate_Numeric'
+INTERVENTION_COL = 'notes_intervention'
+NOTES_COL = 'additional_notes_observations'
+LABEL_MAP = {'LABEL_0': 'Negative', 'LABEL_1': 'Neutral', 'LABEL_2': 'Positive'}
+
+SENTIMENT_FILE = os.path.join(OUTPUT_DIR, 'gold_nlp_full_session_sentiment.csv')
+KEYWORDS_FILE = os.path.join(OUTPUT_DIR, 'gold_nlp_keyword_trends.csv')
+EMBEDDINGS_FILE = os.path.join(OUTPUT_DIR, 'gold_nlp_embeddings.feather')
+SENTIMENT_COLUMNS = ['participant_id', 'session_number', THEME_COL, 'Engagement_Band', 'Success_Band',
+                     'Sentiment_Label', 'Sentiment_Score', 'Master_Text']
+TAG_COLUMNS = ['Top_Strategy', 'Top_Strategy_Score', 'Strategy_Tags']
+TOP_KEYWORDS = 20
+
+# Strategy tags: centred cosine similarity of a narrative to a strategy's prototype embedding
+TAG_THRESHOLD = 0.35
+
+# Outcome bands written with every scored session (slices for the distinctive-terms stage).
+# Bins are closed on the left: [lower edge, next edge)
+ENGAGEMENT_BANDS = ([-np.inf, 2, 3, np.inf], ['Low (0-1)', 'Medium (2)', 'High (3-4)'])
+SUCCESS_BANDS = ([-np.inf, 50, 80, np.inf], ['Low (<50%)', 'Medium (50-79%)', 'High (80%+)'])
+NO_BAND = 'Not recorded'
+
+# Streaming engine: silver rows read per chunk, texts per model call, tokenizer threads
+CHUNK_ROWS = 2048
+BATCH_SIZE = 32
+TOKENIZER_WORKERS = 2
+MAX_LENGTH = 512
+
+
+def comment_columns(df):
+    """ Every available comment column, in a fixed order. """
+    return sorted([c for c in df.columns if 'comment' in c.lower()])
+
+
+def build_narratives(df, verbose=True):
+    """ Theme + Engagement + Success header followed by the intervention / observation notes and every Comment_* column, one string per row. """
+    comment_cols = comment_columns(df)
+    if verbose:
+        print(f"   - Orchestrating narrative: Theme + Engagement + Success + {len(comment_cols)} Comments.")
 
-    df = pd.read_csv(INPUT_FILE)
-
-    # 1. DEFINE CONTEXT & RESULT COLUMNS
-    theme_col = 'Theme_specific_situation'
-    eng_col = 'Q1_Engagement_Numeric'
-    succ_col = 'Success_Rate_Numeric'
-    notes_col = 'additional_notes_observations'
-    
-    # Dynamically find all available comment columns
-    comment_cols = sorted([c for c in df.columns if 'comment' in c.lower()])
-
-    print(f"   - Orchestrating narrative: Theme + Engagement + Success + {len(comment_cols)} Comments.")
-
-    # 2. CONTEXT-AWARE NARRATIVE AGGREGATION
-    def build_narrative(row):
-        # Create the Header: Theme, Engagement, and Success
-        header = f"Theme: {row.get(theme_col, 'N/A')}. Result: Engagement Score {row.get(eng_col, 0)}, Success Rate {row.get(succ_col, 0)}%."
-        
-        # Collect all comments and notes
-        body_parts = []
-        if pd.notna(row.get(notes_col)):
-            body_parts.append(str(row[notes_col]))
-        
-        for col in comment_cols:
-            if pd.notna(row.get(col)) and str(row[col]).strip() != "":
-                body_parts.append(f"{col.replace('_', ' ')}: {row[col]}")
-        
-        # Combine Header and Body
-        full_text = f"{header} Details: {' '.join(body_parts)}"
-        return full_text
-
-    df['Master_Text'] = df.apply(build_narrative, axis=1)
-    
-    # Filter for rows with actual content
-    df_nlp = df[df['Master_Text'].str.strip() != ""].copy()
-
-    # 3. SENTIMENT ANALYSIS (RoBERTa)
-    print("   - Initializing RoBERTa Sentiment Model...")
-    sentiment_task = pipeline("sentiment-analysis", model="cardiffnlp/twitter-roberta-base-sentiment")
-    
-    texts = df_nlp['Master_Text'].tolist()
-    predictions = sentiment_task(texts, truncation=True, max_length=512)
-
-    # 4. MAPPING
-    label_map = {'LABEL_0': 'Negative', 'LABEL_1': 'Neutral', 'LABEL_2': 'Positive'}
-    df_nlp['Sentiment_Label'] = [label_map[p['label']] for p in predictions]
-    df_nlp['Sentiment_Score'] = [p['score'] for p in predictions]
-
-    # 5. KEYWORD TRENDS
-    def get_top_keywords(text_series):
-        all_words = " ".join(text_series).lower().split()
-        clean_words = [re.sub(r'\W+', '', w) for w in all_words if w not in STOPWORDS and len(w) > 3]
-        return Counter(clean_words).most_common(20)
-
-    pos_keywords = get_top_keywords(df_nlp[df_nlp['Sentiment_Label'] == 'Positive']['Master_Text'])
-    neg_keywords = get_top_keywords(df_nlp[df_nlp['Sentiment_Label'] == 'Negative']['Master_Text'])
-
-    # 6. SAVE OUTPUTS
-    sentiment_path = os.path.join(OUTPUT_DIR, 'gold_nlp_full_session_sentiment.csv')
-    df_nlp[['participant_id', 'session_number', 'Theme_specific_situation', 'Sentiment_Label', 'Sentiment_Score', 'Master_Text']].to_csv(sentiment_path, index=False)
-    
-    keywords_df = pd.DataFrame({
+    def text(col, default):
+        # str() of each value, as an f-string would print it (NaN -> 'nan')
+        if col not in df.columns:
+            return np.full(len(df), str(default), dtype=object)
+        return np.array([str(v) for v in df[col].tolist()], dtype=object)
+
+    # Create the Header: Theme, Engagement, and Success (column-wise, not row by row)
+    header = "Theme: " + text(THEME_COL, 'N/A') + ". Result: Engagement Score " + text(ENG_COL, 0) \
+        + ", Success Rate " + text(SUCC_COL, 0) + "%."
+
+    # Collect all comments and notes ('' where a row has none)
+    body = np.full(len(df), '', dtype=object)
+    parts = [(INTERVENTION_COL, ''), (NOTES_COL, '')] + [(col, f"{col.replace('_', ' ')}: ") for col in comment_cols]
+    for col, prefix in parts:
+        if col not in df.columns:
+            continue
+        values = df[col]
+        present = values.notna().to_numpy()
+        if col not in (INTERVENTION_COL, NOTES_COL):
+            present = present & values.astype(object).map(lambda v: str(v).strip() != "").to_numpy()
+        part = np.where(present, prefix + text(col, ''), '')
+        body = np.where(present & (body != ''), body + ' ' + part, body + part)
+
+    # Combine Header and Body
+    return pd.Series(header + " Details: " + body, index=df.index, dtype=object)
+
+
+def outcome_bands(df):
+    """ Engagement_Band / Success_Band labels for each row ('Not recorded' where the score is missing). """
+    bands = {}
+    for name, col, (edges, labels) in (('Engagement_Band', ENG_COL, ENGAGEMENT_BANDS),
+                                       ('Success_Band', SUCC_COL, SUCCESS_BANDS)):
+        values = pd.to_numeric(df[col], errors='coerce') if col in df.columns else pd.Series(np.nan, index=df.index)
+        bands[name] = pd.cut(values, edges, labels=labels, right=False).astype(object).where(values.notna(), NO_BAND)
+    return pd.DataFrame(bands, index=df.index)
+
+
+def count_keywords(texts, counter=None):
+    """ Adds the keyword counts of texts to counter (a new Counter if None). """
+    counter = Counter() if counter is None else counter
+    all_words = " ".join(texts).lower().split()
+    counter.update(re.sub(r'\W+', '', w) for w in all_words if w not in STOPWORDS and len(w) > 3)
+    return counter
+
+
+def keywords_table(pos_keywords, neg_keywords):
+    return pd.DataFrame({
         'Positive_Behaviors': [k[0] for k in pos_keywords],
         'Positive_Freq': [k[1] for k in pos_keywords],
         'Negative_Behaviors': [k[0] for k in neg_keywords] if neg_keywords else ["N/A"]*len(pos_keywords),
         'Negative_Freq': [k[1] for k in neg_keywords] if neg_keywords else [0]*len(pos_keywords)
     })
-    keywords_df.to_csv(os.path.join(OUTPUT_DIR, 'gold_nlp_keyword_trends.csv'), index=False)
+
+
+def load_sentiment_model():
+    # Imported here so the (heavy) transformers/torch import is timed as part of model load
+    from transformers import pipeline
+    return pipeline("sentiment-analysis", model="cardiffnlp/twitter-roberta-base-sentiment")
+
+
+# --- SPLIT MODELS (tokenize and predict as separate pipeline stages) ---
+# encode(encoded) -> (predictions, embeddings or None) is the multi-task step:
+# one encoder pass gives the sentiment and a pooled embedding per text.
+
+class HFSentimentModel:
+    """
+    A HF text-classification pipeline split into tokenize (fast Rust tokenizer,
+    runs in the tokenizer threads) and encode (one forward pass per batch).
+    Same labels / scores as calling the pipeline itself (softmax, top label),
+    plus the attention-masked mean of the last hidden layer as an embedding.
+    """
+
+    def __init__(self, task, max_length=MAX_LENGTH):
+        self.tokenizer = task.tokenizer
+        self.model = task.model
+        self.device = getattr(task, 'device', None)
+        self.id2label = task.model.config.id2label
+        self.max_length = max_length
+        self._local = threading.local()
+
+    def _thread_tokenizer(self):
+        # A fast tokenizer is not safe to call from several threads at once
+        # (truncation/padding state lives on the Rust object), so each thread gets a copy
+        if not hasattr(self._local, 'tokenizer'):
+            self._local.tokenizer = copy.deepcopy(self.tokenizer)
+        return self._local.tokenizer
+
+    def tokenize(self, texts):
+        return self._thread_tokenizer()(texts, truncation=True, max_length=self.max_length,
+                                         padding=True, return_tensors='pt')
+
+    def encode(self, encoded):
+        import torch
+        if self.device is not None:
+            encoded = encoded.to(self.device)
+        with torch.inference_mode():
+            # RoBERTa's classification head reads the <s> token of the sequence output,
+            # so body + head is exactly model(**encoded) and the hidden states come for free
+            hidden = self.model.base_model(**encoded).last_hidden_state
+            probs = self.model.classifier(hidden).softmax(dim=-1)
+            mask = encoded['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        scores, labels = probs.max(dim=-1)
+        predictions = [{'label': self.id2label[i], 'score': s} for i, s in zip(labels.tolist(), scores.tolist())]
+        return predictions, pooled.float().cpu().numpy()
+
+    def predict(self, encoded):
+        return self.encode(encoded)[0]
+
+
+class CallableSentimentModel:
+    """ Any texts -> [{'label', 'score'}] callable; tokenizing is part of its predict step. """
+
+    def __init__(self, task, max_length=MAX_LENGTH):
+        self.task = task
+        self.max_length = max_length
+
+    def tokenize(self, texts):
+        return texts
+
+    def predict(self, texts):
+        return self.task(texts, truncation=True, max_length=self.max_length)
+
+    def encode(self, texts):
+        return self.predict(texts), None
+
+
+def split_model(sentiment_task):
+    """ Object with tokenize(texts) / encode(encoded) for the streaming engine. """
+    if hasattr(sentiment_task, 'tokenize') and hasattr(sentiment_task, 'encode'):
+        return sentiment_task
+    if hasattr(sentiment_task, 'tokenizer') and hasattr(sentiment_task, 'model'):
+        return HFSentimentModel(sentiment_task)
+    return CallableSentimentModel(sentiment_task)
+
+
+# --- STRATEGY TAGS (prototype matching on the shared embedding) ---
+
+def strategy_vocabulary():
+    """ {tag: prototype phrase} from the generator's intervention strategies ('a digital visual timer' -> 'digital visual timer'). """
+    from data_generator import STRATEGIES, DEFAULT_STRATEGY
+    phrases = [p for theme in STRATEGIES.values() for p in theme] + [DEFAULT_STRATEGY]
+    return {re.sub(r"^(a|an) ", "", p.replace("'", "")): p for p in phrases}
+
+
+class StrategyTagger:
+    """
+    Tags a batch of narrative embeddings against the strategy prototypes with one
+    matrix product. Embeddings are centred on the prototype mean first: raw
+    transformer embeddings all point roughly the same way, which would make
+    every cosine similarity high.
+    """
+
+    def __init__(self, tags, prototypes, threshold=TAG_THRESHOLD):
+        self.tags = np.array(tags, dtype=object)
+        self.threshold = threshold
+        self.center = prototypes.mean(axis=0)
+        self.prototypes = self._normalise(prototypes)
+
+    def _normalise(self, X):
+        X = X - self.center
+        return X / np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-12)
+
+    def __call__(self, embeddings):
+        """ (top tag, its similarity, '; '-joined tags over the threshold) per row. """
+        sims = self._normalise(embeddings) @ self.prototypes.T
+        best = sims.argmax(axis=1)
+        top_score = sims[np.arange(len(sims)), best]
+        above = sims >= self.threshold
+        tags = ['; '.join(self.tags[row]) for row in above]
+        return self.tags[best], np.round(top_score, 4), tags
+
+
+def strategy_tagger(model, vocabulary=None):
+    """ Embeds each strategy phrase once with the same model; None if the model gives no embeddings. """
+    vocabulary = vocabulary or strategy_vocabulary()
+    _, prototypes = model.encode(model.tokenize(list(vocabulary.values())))
+    return StrategyTagger(list(vocabulary), prototypes) if prototypes is not None else None
+
+
+# --- STREAMING ENGINE ---
+# reader -> narrative builder -> tokenizer (thread pool) -> model -> writer,
+# joined by bounded queues (stream_pipeline.py). Reading and narrative
+# building for the next chunks overlap with inference on the current batch,
+# rows are appended to the sentiment file as their batch finishes, and
+# keywords are counted as rows go by, so memory stays at a few batches.
+# The model stage is a single encoder pass per batch; sentiment, the pooled
+# embedding and the strategy tags are all derived from it.
+
+class TextBatch:
+    """ One model batch: the rows it came from, their narratives, then encodings, predictions and embeddings. """
+
+    def __init__(self, keys, texts):
+        self.keys = keys
+        self.texts = texts
+        self.encoded = None
+        self.predictions = None
+        self.embeddings = None
+
+    def __len__(self):
+        return len(self.texts)
+
+
+def iter_silver_chunks(df=None, chunk_rows=CHUNK_ROWS):
+    """ Silver rows chunk by chunk, from an in-memory frame or streamed from the CSV. """
+    if df is not None:
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+        return
+    yield from pd.read_csv(INPUT_FILE, chunksize=chunk_rows)
+
+
+def narrative_batches(chunk, batch_size=BATCH_SIZE):
+    """ Narrative builder stage: one silver chunk -> model-sized TextBatches. """
+    texts = build_narratives(chunk, verbose=False)
+    keep = texts.str.strip() != ""
+    keys = chunk.loc[keep, [c for c in SENTIMENT_COLUMNS[:3] if c in chunk.columns]].join(outcome_bands(chunk[keep]))
+    texts = texts[keep].tolist()
+    for start in range(0, len(texts), batch_size):
+        yield TextBatch(keys.iloc[start:start + batch_size], texts[start:start + batch_size])
+
+
+class SentimentWriter:
+    """
+    Writer stage: appends scored batches to the sentiment CSV and counts keywords per label.
+    Batches are buffered up to flush_rows so each to_csv call writes a chunk, not 32 rows.
+    When the model gives embeddings, rows are also tagged (tagger) and the embeddings
+    are appended to an Arrow IPC (Feather v2) file at embeddings_path.
+    """
+
+    def __init__(self, path, flush_rows=CHUNK_ROWS, tagger=None, embeddings_path=None):
+        self.path = path
+        self.tmp_path = f"{path}.{os.getpid()}.tmp"
+        self.file = open(self.tmp_path, 'w', newline='')
+        self.tagger = tagger
+        self.embeddings_path = embeddings_path
+        self.embeddings_writer = None
+        self.flush_rows = flush_rows
+        self.pending = []
+        self.pending_rows = 0
+        self.header = True
+        self.rows = 0
+        self.labels = Counter()
+        self.keywords = {'Positive': Counter(), 'Negative': Counter()}
+
+    def __call__(self, batch):
+        self.pending.append(batch)
+        self.pending_rows += len(batch)
+        if self.pending_rows >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        texts = [t for b in self.pending for t in b.texts]
+        labels = [LABEL_MAP[p['label']] for b in self.pending for p in b.predictions]
+        keys = pd.concat([b.keys for b in self.pending])
+        frame = keys.assign(
+            Sentiment_Label=labels, Sentiment_Score=[p['score'] for b in self.pending for p in b.predictions],
+            Master_Text=texts)
+        if self.pending[0].embeddings is not None:
+            embeddings = np.vstack([b.embeddings for b in self.pending]).astype(np.float32)
+            if self.tagger is not None:
+                top, score, tags = self.tagger(embeddings)
+                frame = frame.assign(Top_Strategy=top, Top_Strategy_Score=score, Strategy_Tags=tags)
+            if self.embeddings_path:
+                self._write_embeddings(keys, embeddings)
+        frame.to_csv(self.file, header=self.header, index=False)
+        self.header = False
+        self.rows += len(frame)
+        self.labels.update(labels)
+        for label, counter in self.keywords.items():
+            count_keywords([t for t, l in zip(texts, labels) if l == label], counter)
+        self.pending, self.pending_rows = [], 0
+
+    def _write_embeddings(self, keys, embeddings):
+        vectors = pa.FixedSizeListArray.from_arrays(pa.array(embeddings.ravel()), embeddings.shape[1])
+        table = pa.table({'participant_id': pa.array(keys['participant_id'].astype(str).to_numpy()),
+                          'session_number': pa.array(keys['session_number'].to_numpy(dtype=np.int64)),
+                          'Embedding': vectors})
+        if self.embeddings_writer is None:
+            self.embeddings_tmp = f"{self.embeddings_path}.{os.getpid()}.tmp"
+            self.embeddings_writer = pa.ipc.new_file(self.embeddings_tmp, table.schema)
+        self.embeddings_writer.write_table(table)
+
+    def close(self, keep):
+        """ Publishes the files in one rename each (readers never see a half-written file), or discards them. """
+        if keep and self.header:
+            # No batch arrived: still publish the header, so readers get an empty table instead of an empty file
+            columns = SENTIMENT_COLUMNS + (TAG_COLUMNS if self.tagger is not None else [])
+            pd.DataFrame(columns=columns).to_csv(self.file, index=False)
+            self.header = False
+        self.file.close()
+        files = [(self.tmp_path, self.path)]
+        if self.embeddings_writer is not None:
+            self.embeddings_writer.close()
+            files.append((self.embeddings_tmp, self.embeddings_path))
+        for tmp_path, path in files:
+            if keep:
+                os.replace(tmp_path, path)
+            elif os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def stream_sessions(sentiment_task, df=None, run=None, path=SENTIMENT_FILE, batch_size=BATCH_SIZE,
+                    tokenizer_workers=TOKENIZER_WORKERS, chunk_rows=CHUNK_ROWS, embeddings_path=EMBEDDINGS_FILE):
+    """
+    Streams silver through narrative -> tokenize -> encode into the sentiment CSV at path
+    (plus strategy tags and the embeddings file when the model gives embeddings).
+    Returns the SentimentWriter (rows written, label counts, keyword counters).
+    """
+    run = run or RunLogger('gold_nlp', log_file=False)
+    model = split_model(sentiment_task)
+
+    def tokenize(batch):
+        batch.encoded = model.tokenize(batch.texts)
+        return batch
+
+    def predict(batch):
+        batch.predictions, batch.embeddings = model.encode(batch.encoded)
+        batch.encoded = None
+        return batch
+
+    with run.span('strategy_prototypes') as span:
+        tagger = strategy_tagger(model)
+        span.rows = len(tagger.tags) if tagger else 0
+
+    pipeline = StreamPipeline([
+        StreamStage('narrative_build', lambda chunk: narrative_batches(chunk, batch_size), expand=True),
+        StreamStage('tokenize', tokenize, workers=tokenizer_workers),
+        StreamStage('inference', predict)
+    ])
+    writer = SentimentWriter(path, tagger=tagger, embeddings_path=embeddings_path)
+    try:
+        with run.span('stream') as span:
+            pipeline.run(iter_silver_chunks(df, chunk_rows), writer, run, source_name='read', sink_name='write')
+            writer.flush()
+            span.rows = writer.rows
+    except BaseException:
+        writer.close(keep=False)
+        raise
+    writer.close(keep=True)
+    return writer
+
+
+def run_nlp_engine(df=None, sentiment_task=None, batch_size=BATCH_SIZE, tokenizer_workers=TOKENIZER_WORKERS):
+    """
+    Scores every session narrative with RoBERTa and writes the NLP gold files.
+    Pass an in-memory silver frame as df to skip re-reading the CSV, and a
+    loaded sentiment_task to reuse a model (default: load RoBERTa).
+    Returns the path of the sentiment file.
+    """
+    print("🧠 Starting Result-Oriented NLP Engine...")
+    run = RunLogger('gold_nlp')
+
+    if df is None and not os.path.exists(INPUT_FILE):
+        print(f"❌ Error: {INPUT_FILE} not found.")
+        return
+
+    if sentiment_task is None:
+        print("   - Initializing RoBERTa Sentiment Model...")
+        with run.span('model_load'):
+            sentiment_task = load_sentiment_model()
+
+    print(f"   - Streaming narratives: batches of {batch_size}, {tokenizer_workers} tokenizer threads.")
+    writer = stream_sessions(sentiment_task, df, run, batch_size=batch_size, tokenizer_workers=tokenizer_workers)
+    print(f"   - {writer.rows} sessions scored: "
+          + ", ".join(f"{label} x {n}" for label, n in sorted(writer.labels.items())))
+    if writer.embeddings_writer is not None:
+        print(f"   - Embeddings + strategy tags from the same pass: {EMBEDDINGS_FILE}")
+
+    # 6. SAVE KEYWORD TRENDS
+    with run.span('save_keywords'):
+        pos_keywords = writer.keywords['Positive'].most_common(TOP_KEYWORDS)
+        neg_keywords = writer.keywords['Negative'].most_common(TOP_KEYWORDS)
+        keywords_table(pos_keywords, neg_keywords).to_csv(KEYWORDS_FILE, index=False)
 
     print(f"✅ NLP Success! Results grouped by Theme and Performance.")
+    run.finish()
+    return SENTIMENT_FILE
+
 
 if __name__ == "__main__":
-    run_nlp_engine()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Score every session narrative and write the NLP gold files.")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Texts per model call")
+    parser.add_argument('--tokenizer-workers', type=int, default=TOKENIZER_WORKERS, help="Tokenizer threads")
+    args = parser.parse_args()
+    run_nlp_engine(batch_size=args.batch_size, tokenizer_workers=args.tokenizer_workers)
@@ -0,0 +1,199 @@
+import os
+import re
+import argparse
+import numpy as np
+import pandas as pd
+import silver_dedup
+import silver_schema
+from instrumentation import RunLogger
+
+# =========================================================
+# INTER-RATER RELIABILITY (Parent vs Therapist)
+# Reads the P/T pairs table (one row per session, <score>_P / <score>_T,
+# see silver_dedup.py) and computes, for every score column at once:
+#   - ICC(2,1): two-way random effects, absolute agreement, single rater
+#   - quadratic weighted Cohen's kappa (ordinal 0..max scores only)
+#   - Bland-Altman bias and 95% limits of agreement, exact agreement rate
+# for the whole cohort, per therapist and per session.
+# All of these are functions of six sums per (group, column) pair, so one
+# group-indicator matrix product per sum (groups x pairs @ pairs x columns)
+# gives every group and every column in the same pass; no per-group loop.
+# =========================================================
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'data', 'gold', 'statistical_results')
+OUTPUT_FILE = os.path.join(OUTPUT_DIR, 'gold_reliability.csv')
+
+# Grouping of the pairs table: scope name -> column (None = whole cohort)
+SCOPES = {'Overall': None, 'Therapist': 'Therapist', 'Session': 'session_number'}
+
+# ICC and kappa need at least this many rated pairs in a group
+MIN_PAIRS = 2
+
+# Koo & Li (2016) bands for ICC
+ICC_BANDS = [(0.5, 'Poor'), (0.75, 'Moderate'), (0.9, 'Good'), (np.inf, 'Excellent')]
+
+
+def question_id(column):
+    """ 'Q1_Engagement_Numeric' -> 'Q1'; columns without a question number keep their name. """
+    match = re.search(r'(?:^|_)Q(\d+)(?:_|$)', column)
+    return f"Q{match.group(1)}" if match else column.replace('_Numeric', '')
+
+
+def ordinal_columns(schema=None):
+    """ Score columns on a whole-number 0..max scale (where weighted kappa applies). """
+    schema = schema or silver_schema.SILVER_SCHEMA
+    return {c for c, spec in schema.items() if spec['dtype'] == 'int' and spec.get('min') == 0}
+
+
+def group_matrix(pairs):
+    """
+    Indicator matrix (groups x pairs) for every scope, stacked, plus the
+    (Scope, Group) label of each row. A pair with no therapist only counts
+    towards 'Overall' and its session.
+    """
+    labels, blocks = [], []
+    for scope, column in SCOPES.items():
+        if column is None:
+            labels.append((scope, 'All'))
+            blocks.append(np.ones((1, len(pairs))))
+            continue
+        if column not in pairs.columns:
+            continue
+        codes, groups = pd.factorize(pairs[column], sort=True)
+        block = np.zeros((len(groups), len(pairs)))
+        rows = np.flatnonzero(codes >= 0)
+        block[codes[rows], rows] = 1.0
+        labels += [(scope, g) for g in groups]
+        blocks.append(block)
+    return labels, np.vstack(blocks)
+
+
+def reliability_metrics(P, T, G):
+    """
+    P, T: pairs x columns scores (NaN = not rated), G: groups x pairs indicators.
+    Returns {metric: groups x columns array}. Only pairs where both raters scored count.
+    """
+    both = ~np.isnan(P) & ~np.isnan(T)
+    P0, T0 = np.where(both, P, 0.0), np.where(both, T, 0.0)
+
+    n = G @ both
+    sp, st = G @ P0, G @ T0
+    spp, stt, spt = G @ (P0 * P0), G @ (T0 * T0), G @ (P0 * T0)
+    exact = G @ (both & (P0 == T0))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_p, mean_t = sp / n, st / n
+        grand = (sp + st) / (2 * n)
+        sdd = spp + stt - 2 * spt                       # sum of squared P - T differences
+
+        # Two-way ANOVA with 2 raters: subjects (rows), raters (columns), residual
+        ss_total = spp + stt - 2 * n * grand ** 2
+        ss_rows = (spp + stt + 2 * spt) / 2 - 2 * n * grand ** 2
+        ss_raters = n * (mean_p - mean_t) ** 2 / 2
+        ms_rows = ss_rows / (n - 1)
+        ms_error = (ss_total - ss_rows - ss_raters) / (n - 1)
+        icc = (ms_rows - ms_error) / (ms_rows + ms_error + 2 * (ss_raters - ms_error) / n)
+
+        # Quadratic weights: observed disagreement = mean (P - T)^2; expected under
+        # independent marginals = var_P + var_T + (mean_P - mean_T)^2 (population variances)
+        expected = (spp / n - mean_p ** 2) + (stt / n - mean_t ** 2) + (mean_p - mean_t) ** 2
+        kappa = 1 - (sdd / n) / expected
+
+        bias = mean_p - mean_t
+        sd_diff = np.sqrt(np.maximum(sdd - n * bias ** 2, 0) / (n - 1))
+
+    few = n < MIN_PAIRS
+    for metric in (icc, kappa, sd_diff):
+        metric[few | ~np.isfinite(metric)] = np.nan
+    bias[n == 0] = np.nan
+    return {
+        'N_Pairs': n, 'Parent_Mean': mean_p, 'Therapist_Mean': mean_t,
+        'ICC': icc, 'Kappa_Quadratic': kappa,
+        'Exact_Agreement': np.where(n > 0, exact / np.maximum(n, 1), np.nan),
+        'Bias': bias, 'SD_Diff': sd_diff,
+        'LoA_Low': bias - 1.96 * sd_diff, 'LoA_High': bias + 1.96 * sd_diff
+    }
+
+
+def icc_band(icc):
+    bands = np.array([label for _, label in ICC_BANDS], dtype=object)
+    band = bands[np.searchsorted([cut for cut, _ in ICC_BANDS], np.nan_to_num(icc, nan=0), side='right')]
+    return np.where(np.isnan(icc), '', band)
+
+
+def compute_reliability(pairs, run=None):
+    """
+    Long table: one row per (Scope, Group, Question) with N_Pairs, rater means,
+    ICC, quadratic kappa, exact agreement and Bland-Altman bias / limits.
+    """
+    run = run or RunLogger('gold_reliability', log_file=False)
+    columns = [c for c in silver_dedup.SCORE_COLUMNS if f"{c}_P" in pairs.columns and f"{c}_T" in pairs.columns]
+
+    with run.span('align', rows=len(pairs)):
+        P = pairs[[f"{c}_P" for c in columns]].to_numpy(dtype=float)
+        T = pairs[[f"{c}_T" for c in columns]].to_numpy(dtype=float)
+        labels, G = group_matrix(pairs)
+
+    with run.span('metrics', rows=len(pairs)) as span:
+        metrics = reliability_metrics(P, T, G)
+        # Kappa is for ordinal scales; continuous columns (seconds, %) get ICC / Bland-Altman only
+        ordinal = np.array([c in ordinal_columns() for c in columns])
+        metrics['Kappa_Quadratic'][:, ~ordinal] = np.nan
+        span.rows = G.shape[0] * len(columns)
+
+    g, j = np.divmod(np.arange(G.shape[0] * len(columns)), len(columns))
+    results = pd.DataFrame({
+        'Scope': [labels[i][0] for i in g],
+        'Group': [str(labels[i][1]) for i in g],
+        'Question': [question_id(columns[i]) for i in j],
+        'Column': np.array(columns)[j]
+    })
+    for name, values in metrics.items():
+        flat = values.ravel()
+        results[name] = flat.astype(int) if name == 'N_Pairs' else np.round(flat, 4)
+    results['ICC_Band'] = icc_band(results['ICC'].to_numpy())
+    return results
+
+
+def run_reliability_engine(df=None):
+    """
+    Computes P vs T reliability and writes gold_reliability.csv.
+    Pass an in-memory silver frame as df to pair it here instead of reading silver_pairs.csv.
+    """
+    print("🤝 Starting Inter-rater Reliability Engine...")
+    run = RunLogger('gold_reliability')
+
+    if df is not None:
+        pairs = silver_dedup.build_session_tables(df, run)[3]
+    else:
+        if not os.path.exists(silver_dedup.PAIRS_FILE):
+            print(f"❌ Error: {silver_dedup.PAIRS_FILE} not found. Run data_cleaning.py first.")
+            return
+        with run.span('load') as span:
+            pairs = pd.read_csv(silver_dedup.PAIRS_FILE)
+            span.rows = len(pairs)
+
+    results_df = compute_reliability(pairs, run)
+    overall = results_df[results_df['Scope'] == 'Overall']
+    print(f"   - {int(pairs['Paired'].sum()) if 'Paired' in pairs.columns else len(pairs)} paired sessions, "
+          f"{overall['Question'].nunique()} questions, {results_df['Group'].nunique()} groups.")
+    q26 = overall[overall['Question'] == 'Q26']
+    if len(q26):
+        row = q26.iloc[0]
+        print(f"   - Q26 overall: ICC={row['ICC']:.2f} ({row['ICC_Band'] or 'n/a'}), "
+              f"kappa={row['Kappa_Quadratic']:.2f}, bias={row['Bias']:+.2f} [{row['LoA_Low']:.2f}, {row['LoA_High']:.2f}]")
+
+    with run.span('save', rows=len(results_df)):
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        results_df.to_csv(OUTPUT_FILE, index=False)
+
+    print(f"✅ DONE! Reliability saved to: {OUTPUT_FILE}")
+    run.finish()
+    return results_df
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description="Parent vs Therapist inter-rater reliability (ICC, weighted kappa, Bland-Altman).").parse_args()
+    run_reliability_engine()
@@ -0,0 +1,204 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+import silver_dedup
+import analytics_gold_nlp
+from instrumentation import RunLogger
+
+# =========================================================
+# PER-PARTICIPANT ROLLING METRICS & CHANGE ALERTS
+# One row per (participant, session) with, for the core scores and the
+# session sentiment:
+#   - rolling mean and OLS slope over each window (last N sessions)
+#   - a mean-shift alert: last N sessions vs the N before them, scaled by
+#     the participant's SD so far (no look-ahead), flagged past ALERT_Z
+# Every window statistic is a difference of cumulative sums taken over the
+# whole participant-sorted table at once (all participants and all scores in
+# one 2D pass), so there is no per-participant loop or groupby().rolling().
+# =========================================================
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'data', 'gold', 'trajectory_results')
+OUTPUT_FILE = os.path.join(OUTPUT_DIR, 'gold_participant_timeseries.csv')
+
+# Metric ID -> session table column. Sentiment comes from the NLP gold table.
+METRICS = {
+    'Q26': 'Q26_Social_Impact_Numeric',
+    'Q1': 'Q1_Engagement_Numeric',
+    'Success': 'Success_Rate_Numeric',
+    'Distress': 'distress_boredom_frustration_score_Q8'
+}
+SENTIMENT = 'Sentiment'
+# A rise in these is a regression, not an improvement
+HIGHER_IS_WORSE = {'Distress'}
+
+WINDOWS = (3, 5)
+MIN_PERIODS = 2     # observed sessions needed in a window for a mean / slope
+ALERT_Z = 2.0       # |shift z| at or above this raises an alert
+
+
+# --- INPUTS ---
+
+def signed_sentiment(nlp):
+    """ Mean signed sentiment per session: +score for Positive, -score for Negative, 0 for Neutral. """
+    if nlp is None or nlp.empty or 'Sentiment_Label' not in nlp.columns:
+        return None
+    sign = nlp['Sentiment_Label'].map({'Positive': 1.0, 'Negative': -1.0, 'Neutral': 0.0})
+    signed = sign * pd.to_numeric(nlp['Sentiment_Score'], errors='coerce')
+    return signed.groupby([nlp[c] for c in silver_dedup.SESSION_KEY]).mean().rename(SENTIMENT)
+
+
+def metric_frame(sessions, nlp=None):
+    """ participant_id, session_number and one column per metric, sorted by participant then session. """
+    frame = sessions[silver_dedup.SESSION_KEY].copy()
+    for metric, column in METRICS.items():
+        if column in sessions.columns:
+            frame[metric] = pd.to_numeric(sessions[column], errors='coerce')
+    sentiment = signed_sentiment(nlp)
+    if sentiment is not None:
+        frame = frame.join(sentiment, on=silver_dedup.SESSION_KEY)
+    return frame.sort_values(silver_dedup.SESSION_KEY, kind='stable').reset_index(drop=True)
+
+
+# --- WINDOWED SUMS ---
+
+class WindowSums:
+    """
+    Cumulative sums of n, x, y, x^2, xy, y^2 (rows x metrics) over the participant-sorted
+    table; any window of rows within a participant is then two lookups.
+    """
+
+    def __init__(self, x, Y, starts):
+        observed = ~np.isnan(Y)
+        Y0 = np.where(observed, Y, 0.0)
+        X0 = np.where(observed, x[:, None], 0.0)
+        self.starts = starts
+        self.position = np.arange(len(x))
+        self.sums = {name: np.vstack([np.zeros((1, Y.shape[1])), np.cumsum(values, axis=0)])
+                     for name, values in (('n', observed.astype(float)), ('x', X0), ('y', Y0),
+                                          ('xx', X0 * X0), ('xy', X0 * Y0), ('yy', Y0 * Y0))}
+
+    def window(self, end_offset, length):
+        """ {stat: rows x metrics} over the `length` rows ending `end_offset` rows before each row (clipped to its participant). """
+        hi = np.maximum(self.position + 1 - end_offset, self.starts)
+        lo = np.maximum(hi - length, self.starts)
+        return {name: cs[hi] - cs[lo] for name, cs in self.sums.items()}
+
+    def expanding(self):
+        return self.window(0, len(self.position))
+
+
+def window_mean(w):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(w['n'] >= MIN_PERIODS, w['y'] / w['n'], np.nan)
+
+
+def window_slope(w):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sxx = w['n'] * w['xx'] - w['x'] ** 2
+        slope = (w['n'] * w['xy'] - w['x'] * w['y']) / sxx
+    return np.where((w['n'] >= MIN_PERIODS) & (sxx > 0), slope, np.nan)
+
+
+def window_sd(w):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = (w['yy'] - w['y'] ** 2 / w['n']) / (w['n'] - 1)
+    return np.where(w['n'] >= 2, np.sqrt(np.maximum(var, 0)), np.nan)
+
+
+# --- ENGINE ---
+
+def compute_rolling(frame, windows=WINDOWS, run=None):
+    """
+    frame: metric_frame() output. Adds <metric>_Mean_<w>, <metric>_Slope_<w> for every window and
+    <metric>_Shift_Z / <metric>_Alert ('Regression' / 'Improvement' / '') for the shortest window.
+    """
+    run = run or RunLogger('gold_rolling', log_file=False)
+    metrics = [c for c in frame.columns if c not in silver_dedup.SESSION_KEY]
+    out = frame.copy()
+    if frame.empty or not metrics:
+        return out
+
+    with run.span('cumulative_sums', rows=len(frame)):
+        codes = pd.factorize(frame['participant_id'])[0]
+        first = np.r_[True, codes[1:] != codes[:-1]]
+        starts = np.maximum.accumulate(np.where(first, np.arange(len(frame)), 0))
+        sums = WindowSums(frame['session_number'].to_numpy(dtype=float), frame[metrics].to_numpy(dtype=float), starts)
+
+    with run.span('windows', rows=len(frame)) as span:
+        columns = {}
+        for w in windows:
+            recent = sums.window(0, w)
+            for stat, values in (('Mean', window_mean(recent)), ('Slope', window_slope(recent))):
+                for j, metric in enumerate(metrics):
+                    columns[f"{metric}_{stat}_{w}"] = values[:, j]
+
+        # Mean shift: last w sessions vs the w before them, in units of the participant's SD so far
+        w = min(windows)
+        recent, prior = sums.window(0, w), sums.window(w, w)
+        sd = window_sd(sums.expanding())
+        with np.errstate(invalid='ignore', divide='ignore'):
+            z = (window_mean(recent) - window_mean(prior)) / (sd * np.sqrt(1 / recent['n'] + 1 / prior['n']))
+        z[~np.isfinite(z)] = np.nan
+        worse = np.array([-1.0 if m not in HIGHER_IS_WORSE else 1.0 for m in metrics])
+        for j, metric in enumerate(metrics):
+            columns[f"{metric}_Shift_Z"] = np.round(z[:, j], 3)
+            columns[f"{metric}_Alert"] = np.select([z[:, j] * worse[j] >= ALERT_Z, z[:, j] * -worse[j] >= ALERT_Z],
+                                                   ['Regression', 'Improvement'], '')
+        span.rows = len(frame) * len(metrics)
+
+    rolled = pd.DataFrame(columns, index=frame.index)
+    numeric = [c for c in rolled.columns if not c.endswith('_Alert')]
+    rolled[numeric] = rolled[numeric].round(4)
+    return pd.concat([out, rolled], axis=1)
+
+
+def run_rolling_engine(df=None, windows=WINDOWS):
+    """
+    Computes rolling means / slopes and change alerts per participant and writes gold_participant_timeseries.csv.
+    Pass an in-memory silver frame as df to build the sessions table here instead of reading silver_sessions.csv.
+    """
+    print("📉 Starting Rolling Metrics Engine...")
+    run = RunLogger('gold_rolling')
+
+    if df is not None:
+        sessions = silver_dedup.build_session_tables(df, run)[2]
+    else:
+        if not os.path.exists(silver_dedup.SESSIONS_FILE):
+            print(f"❌ Error: {silver_dedup.SESSIONS_FILE} not found. Run data_cleaning.py first.")
+            return
+        with run.span('load') as span:
+            sessions = pd.read_csv(silver_dedup.SESSIONS_FILE)
+            span.rows = len(sessions)
+
+    nlp = None
+    if os.path.exists(analytics_gold_nlp.SENTIMENT_FILE):
+        with run.span('load_nlp') as span:
+            nlp = pd.read_csv(analytics_gold_nlp.SENTIMENT_FILE, usecols=lambda c: c != 'Master_Text')
+            span.rows = len(nlp)
+    else:
+        print("   ⚠️ NLP gold output not found; rolling sentiment skipped.")
+
+    results_df = compute_rolling(metric_frame(sessions, nlp), windows, run)
+    alerts = results_df[[c for c in results_df.columns if c.endswith('_Alert')]]
+    print(f"   - {results_df['participant_id'].nunique()} participants, {len(results_df)} sessions, "
+          f"windows {', '.join(map(str, windows))}.")
+    print(f"   - {int((alerts == 'Regression').any(axis=1).sum())} sessions with a regression alert.")
+
+    with run.span('save', rows=len(results_df)):
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        results_df.to_csv(OUTPUT_FILE, index=False)
+
+    print(f"✅ DONE! Participant time series saved to: {OUTPUT_FILE}")
+    run.finish()
+    return results_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-participant rolling means, slopes and change alerts.")
+    parser.add_argument('--windows', default=','.join(map(str, WINDOWS)),
+                        help="Comma separated window lengths in sessions, e.g. 3,5")
+    args = parser.parse_args()
+    run_rolling_engine(windows=tuple(sorted(int(w) for w in args.windows.split(','))))
@@ -2,71 +2,94 @@ import pandas as pd
 import numpy as np
 import scipy.stats as stats
 import os
+import argparse
+import resampling as rs
+import silver_dedup
+import frame_backend
+from instrumentation import RunLogger
 
-def run_statistical_engine():
-    # --- SETUP PATHS INSIDE FUNCTION TO PREVENT ERRORS ---
-    CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-    PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
-    
-    # Target Input Path (Silver Layer)
-    file_path = os.path.join(PROJECT_ROOT, 'data', 'silver', 'After_transformation_Data', 'silver_cleaned.csv')
-    
-    # Output Path (Gold Layer)
-    output_dir = os.path.join(PROJECT_ROOT, 'data', 'gold', 'statistical_results')
-    os.makedirs(output_dir, exist_ok=True)
-
-    print("📊 Starting Statistical Engine...")
-
-    # --- 1. LOAD DATA ---
-    if not os.path.exists(file_path):
-        # Fallback Check
-        fallback = os.path.join(PROJECT_ROOT, 'data', 'silver', 'silver_cleaned.csv')
-        if os.path.exists(fallback):
-            print(f"   ⚠️ Primary path not found. Using fallback: {fallback}")
-            file_path = fallback
-        else:
-            print(f"❌ Error: Could not find 'silver_cleaned.csv'.")
-            print(f"   Checked: {file_path}")
-            return
+# Silver columns the research queries read (everything else is skipped at load time)
+STATS_COLUMNS = [
+    'participant_id', 'session_number', 'age', 'gender',
+    'Q1_Engagement_Numeric', 'Q2_Personalization_Numeric', 'emotional_connection_Q3', 'verbal_participation_score_Q4',
+    'enjoyment_Q7', 'distress_boredom_frustration_score_Q8', 'initiation_Q9', 'creativity_Q11', 'relationship_impact_Q13',
+    'Q15_Response_Time_Seconds', 'theme_understand_Q18', 'applied_learning_Q20', 'confidence_Q21', 'generalisation_Q22',
+    'real_life_link_Q25', 'Q26_Social_Impact_Numeric', 'Success_Rate_Numeric'
+]
 
-    print(f"   - Input: {file_path}")
-    df = pd.read_csv(file_path)
-    print(f"   - Loaded {len(df)} rows.")
-    
+def compute_statistical_answers(df, run=None, n_resamples=None, seed=None, sessions=None):
+    """
+    Runs the research queries (Q1-Q15) on a silver frame and returns the answers table.
+    sessions is the canonical one-row-per-session table (silver_dedup); built from df if not given.
+    Each query is timed as its own span on run.
+    Every answer also gets a 95% bootstrap CI (CI_Low/CI_High, resampling participants,
+    or sessions when there are too few participants - see CI_Unit) and, where the
+    query tests an effect, a permutation p-value (Perm_p); see resampling.py.
+    """
+    run = run or RunLogger('gold_stats', log_file=False)
+    B = n_resamples or rs.N_RESAMPLES
+    seed = rs.SEED if seed is None else seed
     results = []
 
+    # Participants are the resampling unit (sessions of one child are not independent)
+    with run.span('resampling_setup', rows=len(df)):
+        boot = rs.ClusterBootstrap(df['participant_id'], B, seed)
+
     # ==========================================
     # GROUP 1: EFFICIENCY (Does it work?)
     # ==========================================
     print("   - Processing Group 1 (Efficiency)...")
 
     # Q1: Social Impact Trend (Scale 0-10)
-    if len(df) > 1:
-        corr, p_val = stats.pearsonr(df['session_number'], df['Q26_Social_Impact_Numeric'])
-        res_text = 'Significant' if p_val < 0.05 else 'Not Significant'
-        results.append({'ID': 'Q1', 'Group': 'Efficiency', 'Query': 'Social Impact Trend', 'Stat': round(corr, 3), 'Result': res_text})
+    with run.span('Q1', rows=len(df)):
+        if len(df) > 1:
+            corr, p_val = stats.pearsonr(df['session_number'], df['Q26_Social_Impact_Numeric'])
+            res_text = 'Significant' if p_val < 0.05 else 'Not Significant'
+            ci = rs.pearson_summary(boot, df['session_number'], df['Q26_Social_Impact_Numeric'], B, seed)
+            results.append({'ID': 'Q1', 'Group': 'Efficiency', 'Query': 'Social Impact Trend', 'Stat': round(corr, 3), 'Result': res_text, **ci})
 
     # Q2: Response Time Reduction
-    first_sess = df['session_number'].min()
-    last_sess = df['session_number'].max()
-    t1 = df[df['session_number'] == first_sess]['Q15_Response_Time_Seconds'].mean()
-    t2 = df[df['session_number'] == last_sess]['Q15_Response_Time_Seconds'].mean()
-    pct_decrease = ((t1 - t2) / t1) * 100 if t1 > 0 else 0
-    results.append({'ID': 'Q2', 'Group': 'Efficiency', 'Query': 'Response Time Reduction %', 'Stat': round(pct_decrease, 1), 'Result': f"{pct_decrease:.1f}% Improvement"})
+    with run.span('Q2', rows=len(df)):
+        first_sess = df['session_number'].min()
+        last_sess = df['session_number'].max()
+        t1 = df.loc[df['session_number'] == first_sess, 'Q15_Response_Time_Seconds'].mean()
+        t2 = df.loc[df['session_number'] == last_sess, 'Q15_Response_Time_Seconds'].mean()
+        pct_decrease = ((t1 - t2) / t1) * 100 if t1 > 0 else 0
+
+        # Resampled first/last means -> % change; null = first/last labels shuffled between those sessions
+        times = df['Q15_Response_Time_Seconds']
+        is_first = (df['session_number'] == first_sess).to_numpy()
+        edge = is_first | (df['session_number'] == last_sess).to_numpy()
+        m_first, m_last = boot.group_means(times, is_first, rows=edge)
+        edge_times = times[edge & times.notna().to_numpy()].to_numpy(dtype=float)
+        null_first, null_last = rs.permutation_group_means(edge_times, np.ones_like(edge_times), is_first[edge & times.notna().to_numpy()], B, seed)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ci = rs.summarise((m_first - m_last) / m_first * 100, (null_first - null_last) / null_first * 100,
+                              pct_decrease if first_sess != last_sess else np.nan, digits=1, unit=boot.unit)
+        results.append({'ID': 'Q2', 'Group': 'Efficiency', 'Query': 'Response Time Reduction %', 'Stat': round(pct_decrease, 1), 'Result': f"{pct_decrease:.1f}% Improvement", **ci})
 
     # Q3: Distress Frequency (Scale 0-4, >3 is Severe)
-    severe_distress = len(df[df['distress_boredom_frustration_score_Q8'] > 3])
-    results.append({'ID': 'Q3', 'Group': 'Efficiency', 'Query': 'Severe Distress Incidents', 'Stat': severe_distress, 'Result': f"{severe_distress} Incidents"})
+    with run.span('Q3', rows=len(df)):
+        severe_distress = int((df['distress_boredom_frustration_score_Q8'] > 3).sum())
+        # A count has no null hypothesis here: CI only
+        ci = rs.summarise(boot.totals(df['distress_boredom_frustration_score_Q8'] > 3)[0], digits=1, unit=boot.unit)
+        results.append({'ID': 'Q3', 'Group': 'Efficiency', 'Query': 'Severe Distress Incidents', 'Stat': severe_distress, 'Result': f"{severe_distress} Incidents", **ci})
 
     # Q4: Verbal Engagement Growth (Scale 0-10, <6 is Low)
-    low_starters = df[(df['session_number'] == first_sess) & (df['verbal_participation_score_Q4'] < 6)]['participant_id'].unique()
-    low_data = df[df['participant_id'].isin(low_starters)]
+    with run.span('Q4', rows=len(df)):
+        low_starters = df.loc[(df['session_number'] == first_sess) & (df['verbal_participation_score_Q4'] < 6), 'participant_id'].unique()
+        low_data = df[df['participant_id'].isin(low_starters)]
     
-    if len(low_data) > 1:
-        slope, _, _, _, _ = stats.linregress(low_data['session_number'], low_data['verbal_participation_score_Q4'])
-        results.append({'ID': 'Q4', 'Group': 'Efficiency', 'Query': 'Verbal Growth (Low Starters)', 'Stat': round(slope, 2), 'Result': f"+{slope:.2f} pts/session"})
-    else:
-        results.append({'ID': 'Q4', 'Group': 'Efficiency', 'Query': 'Verbal Growth (Low Starters)', 'Stat': 0, 'Result': "Insufficient Data (None < 6)"})
+        if len(low_data) > 1:
+            slope, _, r_low, _, _ = stats.linregress(low_data['session_number'], low_data['verbal_participation_score_Q4'])
+            # Slope CI over the low starters only; the permutation null of a slope is that of r
+            low_boot = rs.ClusterBootstrap(low_data['participant_id'], B, seed)
+            ci = rs.summarise(low_boot.slope(low_data['session_number'], low_data['verbal_participation_score_Q4']),
+                              rs.permutation_pearson(low_data['session_number'], low_data['verbal_participation_score_Q4'], B, seed),
+                              r_low, unit=low_boot.unit)
+            results.append({'ID': 'Q4', 'Group': 'Efficiency', 'Query': 'Verbal Growth (Low Starters)', 'Stat': round(slope, 2), 'Result': f"+{slope:.2f} pts/session", **ci})
+        else:
+            results.append({'ID': 'Q4', 'Group': 'Efficiency', 'Query': 'Verbal Growth (Low Starters)', 'Stat': 0, 'Result': "Insufficient Data (None < 6)"})
 
     # ==========================================
     # GROUP 2: KEY DRIVERS (Why?)
@@ -74,34 +97,46 @@ def run_statistical_engine():
     print("   - Processing Group 2 (Drivers)...")
 
     # Q5: Home vs Clinic
-    corr_home, _ = stats.pearsonr(df['applied_learning_Q20'], df['Q26_Social_Impact_Numeric'])
-    corr_clinic, _ = stats.pearsonr(df['Q1_Engagement_Numeric'], df['Q26_Social_Impact_Numeric'])
-    winner = 'Home' if abs(corr_home) > abs(corr_clinic) else 'Clinic'
-    results.append({'ID': 'Q5', 'Group': 'Drivers', 'Query': 'Stronger Driver', 'Stat': round(max(abs(corr_home), abs(corr_clinic)), 2), 'Result': winner})
+    with run.span('Q5', rows=len(df)):
+        corr_home, _ = stats.pearsonr(df['applied_learning_Q20'], df['Q26_Social_Impact_Numeric'])
+        corr_clinic, _ = stats.pearsonr(df['Q1_Engagement_Numeric'], df['Q26_Social_Impact_Numeric'])
+        winner = 'Home' if abs(corr_home) > abs(corr_clinic) else 'Clinic'
+        # CI of the winning |r|, both correlations from the same resamples
+        ci = rs.summarise(np.maximum(np.abs(boot.pearson(df['applied_learning_Q20'], df['Q26_Social_Impact_Numeric'])),
+                                     np.abs(boot.pearson(df['Q1_Engagement_Numeric'], df['Q26_Social_Impact_Numeric']))), unit=boot.unit)
+        results.append({'ID': 'Q5', 'Group': 'Drivers', 'Query': 'Stronger Driver', 'Stat': round(max(abs(corr_home), abs(corr_clinic)), 2), 'Result': winner, **ci})
 
     # Q6: Personalization Effect
-    # Scale 0-4: We treat >=3 as High
-    high_pers = df[df['Q2_Personalization_Numeric'] >= 3]['enjoyment_Q7']
-    low_pers = df[df['Q2_Personalization_Numeric'] < 3]['enjoyment_Q7']
+    with run.span('Q6', rows=len(df)):
+        # Scale 0-4: We treat >=3 as High
+        high_pers = df.loc[df['Q2_Personalization_Numeric'] >= 3, 'enjoyment_Q7']
+        low_pers = df.loc[df['Q2_Personalization_Numeric'] < 3, 'enjoyment_Q7']
     
-    if len(high_pers) > 0 and len(low_pers) > 0:
-        _, p_val_t = stats.ttest_ind(high_pers, low_pers)
-        results.append({'ID': 'Q6', 'Group': 'Drivers', 'Query': 'Personalization Impact', 'Stat': 0, 'Result': 'Significant' if p_val_t < 0.05 else 'Not Significant'})
-    else:
-        results.append({'ID': 'Q6', 'Group': 'Drivers', 'Query': 'Personalization Impact', 'Stat': 0, 'Result': 'Insufficient Data'})
+        if len(high_pers) > 0 and len(low_pers) > 0:
+            _, p_val_t = stats.ttest_ind(high_pers, low_pers)
+            # CI/Perm_p are for the enjoyment difference (high - low personalization)
+            ci = rs.mean_difference_summary(boot, df['enjoyment_Q7'], df['Q2_Personalization_Numeric'] >= 3, n_resamples=B, seed=seed)
+            results.append({'ID': 'Q6', 'Group': 'Drivers', 'Query': 'Personalization Impact', 'Stat': 0, 'Result': 'Significant' if p_val_t < 0.05 else 'Not Significant', **ci})
+        else:
+            results.append({'ID': 'Q6', 'Group': 'Drivers', 'Query': 'Personalization Impact', 'Stat': 0, 'Result': 'Insufficient Data'})
 
     # Q7: Understanding vs Generalization
-    corr_theme, _ = stats.pearsonr(df['theme_understand_Q18'], df['generalisation_Q22'])
-    results.append({'ID': 'Q7', 'Group': 'Drivers', 'Query': 'Understanding-Generalization', 'Stat': round(corr_theme, 2), 'Result': 'Strong' if corr_theme > 0.6 else 'Moderate'})
+    with run.span('Q7', rows=len(df)):
+        corr_theme, _ = stats.pearsonr(df['theme_understand_Q18'], df['generalisation_Q22'])
+        ci = rs.pearson_summary(boot, df['theme_understand_Q18'], df['generalisation_Q22'], B, seed)
+        results.append({'ID': 'Q7', 'Group': 'Drivers', 'Query': 'Understanding-Generalization', 'Stat': round(corr_theme, 2), 'Result': 'Strong' if corr_theme > 0.6 else 'Moderate', **ci})
 
     # Q8: Real Life Link
-    high_link = df[df['real_life_link_Q25'] >= 3]['Success_Rate_Numeric']
-    low_link = df[df['real_life_link_Q25'] < 3]['Success_Rate_Numeric']
-    if len(high_link) > 0 and len(low_link) > 0:
-        diff = high_link.mean() - low_link.mean()
-        results.append({'ID': 'Q8', 'Group': 'Drivers', 'Query': 'Success Boost (Real Life Link)', 'Stat': round(diff, 1), 'Result': f"+{diff:.1f}% Success"})
-    else:
-        results.append({'ID': 'Q8', 'Group': 'Drivers', 'Query': 'Success Boost (Real Life Link)', 'Stat': 0, 'Result': "Insufficient Data"})
+    with run.span('Q8', rows=len(df)):
+        high_link = df.loc[df['real_life_link_Q25'] >= 3, 'Success_Rate_Numeric']
+        low_link = df.loc[df['real_life_link_Q25'] < 3, 'Success_Rate_Numeric']
+        if len(high_link) > 0 and len(low_link) > 0:
+            diff = high_link.mean() - low_link.mean()
+            ci = rs.mean_difference_summary(boot, df['Success_Rate_Numeric'], df['real_life_link_Q25'] >= 3, n_resamples=B, seed=seed)
+            ci.update(CI_Low=round(ci['CI_Low'], 1), CI_High=round(ci['CI_High'], 1))
+            results.append({'ID': 'Q8', 'Group': 'Drivers', 'Query': 'Success Boost (Real Life Link)', 'Stat': round(diff, 1), 'Result': f"+{diff:.1f}% Success", **ci})
+        else:
+            results.append({'ID': 'Q8', 'Group': 'Drivers', 'Query': 'Success Boost (Real Life Link)', 'Stat': 0, 'Result': "Insufficient Data"})
 
     # ==========================================
     # GROUP 3: MECHANISMS (How?)
@@ -109,35 +144,47 @@ def run_statistical_engine():
     print("   - Processing Group 3 (Mechanisms)...")
 
     # Q9: Personalization -> Initiation
-    corr_pi, _ = stats.pearsonr(df['Q2_Personalization_Numeric'], df['initiation_Q9'])
-    results.append({'ID': 'Q9', 'Group': 'Mechanisms', 'Query': 'Personalization -> Initiation', 'Stat': round(corr_pi, 2), 'Result': 'Positive Driver' if corr_pi > 0.5 else 'Weak Link'})
+    with run.span('Q9', rows=len(df)):
+        corr_pi, _ = stats.pearsonr(df['Q2_Personalization_Numeric'], df['initiation_Q9'])
+        ci = rs.pearson_summary(boot, df['Q2_Personalization_Numeric'], df['initiation_Q9'], B, seed)
+        results.append({'ID': 'Q9', 'Group': 'Mechanisms', 'Query': 'Personalization -> Initiation', 'Stat': round(corr_pi, 2), 'Result': 'Positive Driver' if corr_pi > 0.5 else 'Weak Link', **ci})
 
     # Q10: Creativity -> Confidence
-    corr_ac, p_val_ac = stats.pearsonr(df['creativity_Q11'], df['confidence_Q21'])
-    results.append({'ID': 'Q10', 'Group': 'Mechanisms', 'Query': 'Creativity -> Confidence', 'Stat': round(corr_ac, 2), 'Result': 'Predictive' if p_val_ac < 0.05 else 'Not Predictive'})
+    with run.span('Q10', rows=len(df)):
+        corr_ac, p_val_ac = stats.pearsonr(df['creativity_Q11'], df['confidence_Q21'])
+        ci = rs.pearson_summary(boot, df['creativity_Q11'], df['confidence_Q21'], B, seed)
+        results.append({'ID': 'Q10', 'Group': 'Mechanisms', 'Query': 'Creativity -> Confidence', 'Stat': round(corr_ac, 2), 'Result': 'Predictive' if p_val_ac < 0.05 else 'Not Predictive', **ci})
 
     # Q11: Age vs Improvement Slope
-    slopes, ages = [], []
-    for pid in df['participant_id'].unique():
-        p_data = df[df['participant_id'] == pid]
-        if len(p_data) > 1 and p_data['session_number'].nunique() > 1:
-            s, _, _, _, _ = stats.linregress(p_data['session_number'], p_data['Q15_Response_Time_Seconds'])
-            slopes.append(s)
-            ages.append(p_data['age'].iloc[0])
-    if len(ages) > 1:
-        corr_age, _ = stats.pearsonr(ages, slopes)
-        results.append({'ID': 'Q11', 'Group': 'Mechanisms', 'Query': 'Age vs Improvement', 'Stat': round(corr_age, 2), 'Result': 'Older improves faster' if corr_age < 0 else 'Younger improves faster'})
-    else:
-        results.append({'ID': 'Q11', 'Group': 'Mechanisms', 'Query': 'Age vs Improvement', 'Stat': 0, 'Result': 'Insufficient Data'})
+    with run.span('Q11', rows=len(df)):
+        slopes, ages = [], []
+        for pid in df['participant_id'].unique():
+            p_data = df[df['participant_id'] == pid]
+            if len(p_data) > 1 and p_data['session_number'].nunique() > 1:
+                s, _, _, _, _ = stats.linregress(p_data['session_number'], p_data['Q15_Response_Time_Seconds'])
+                slopes.append(s)
+                ages.append(p_data['age'].iloc[0])
+        if len(ages) > 1:
+            corr_age, _ = stats.pearsonr(ages, slopes)
+            # One row per participant already, so each participant is its own cluster
+            ci = rs.pearson_summary(rs.ClusterBootstrap(np.arange(len(ages)), B, seed, row_unit='participant'), ages, slopes, B, seed)
+            results.append({'ID': 'Q11', 'Group': 'Mechanisms', 'Query': 'Age vs Improvement', 'Stat': round(corr_age, 2), 'Result': 'Older improves faster' if corr_age < 0 else 'Younger improves faster', **ci})
+        else:
+            results.append({'ID': 'Q11', 'Group': 'Mechanisms', 'Query': 'Age vs Improvement', 'Stat': 0, 'Result': 'Insufficient Data'})
 
     # Q12: Gender Differences
-    m_scores = df[df['gender'] == 'Male']['emotional_connection_Q3']
-    f_scores = df[df['gender'] == 'Female']['emotional_connection_Q3']
-    if len(m_scores) > 0 and len(f_scores) > 0:
-        _, p_gen = stats.ttest_ind(m_scores, f_scores)
-        results.append({'ID': 'Q12', 'Group': 'Mechanisms', 'Query': 'Gender Difference', 'Stat': 0, 'Result': 'Significant' if p_gen < 0.05 else 'No Diff'})
-    else:
-        results.append({'ID': 'Q12', 'Group': 'Mechanisms', 'Query': 'Gender Difference', 'Stat': 0, 'Result': 'One Gender Dominant'})
+    with run.span('Q12', rows=len(df)):
+        m_scores = df.loc[df['gender'] == 'Male', 'emotional_connection_Q3']
+        f_scores = df.loc[df['gender'] == 'Female', 'emotional_connection_Q3']
+        if len(m_scores) > 0 and len(f_scores) > 0:
+            _, p_gen = stats.ttest_ind(m_scores, f_scores)
+            # Gender is a participant attribute: labels are permuted between participants
+            ci = rs.mean_difference_summary(boot, df['emotional_connection_Q3'], df['gender'] == 'Male',
+                                            rows=df['gender'].isin(['Male', 'Female']), clusters=df['participant_id'],
+                                            n_resamples=B, seed=seed)
+            results.append({'ID': 'Q12', 'Group': 'Mechanisms', 'Query': 'Gender Difference', 'Stat': 0, 'Result': 'Significant' if p_gen < 0.05 else 'No Diff', **ci})
+        else:
+            results.append({'ID': 'Q12', 'Group': 'Mechanisms', 'Query': 'Gender Difference', 'Stat': 0, 'Result': 'One Gender Dominant'})
 
     # ==========================================
     # GROUP 4: PREDICTIVE INSIGHTS
@@ -145,29 +192,98 @@ def run_statistical_engine():
     print("   - Processing Group 4 (Predictions)...")
 
     # Q13: Early Predictors
-    # Grouping by ID to handle potential duplicates (Therapist/Parent) in sessions
-    early_eng = df[df['session_number'] <= 3].groupby('participant_id')['Q1_Engagement_Numeric'].mean()
-    final_impact = df[df['session_number'] == last_sess].groupby('participant_id')['Q26_Social_Impact_Numeric'].mean()
+    with run.span('Q13', rows=len(df)):
+        # One row per session (Therapist/Parent submissions already reconciled by silver_dedup)
+        if sessions is None:
+            sessions = silver_dedup.canonical_sessions(df)
+        early_eng = sessions[sessions['session_number'] <= 3].groupby('participant_id')['Q1_Engagement_Numeric'].mean()
+        final_impact = sessions[sessions['session_number'] == last_sess].set_index('participant_id')['Q26_Social_Impact_Numeric']
     
-    aligned = pd.concat([early_eng, final_impact], axis=1).dropna()
+        aligned = pd.concat([early_eng, final_impact], axis=1).dropna()
     
-    if len(aligned) > 2:
-        corr_pred, p_pred = stats.pearsonr(aligned['Q1_Engagement_Numeric'], aligned['Q26_Social_Impact_Numeric'])
-        results.append({'ID': 'Q13', 'Group': 'Predictions', 'Query': 'Early Engagement Predicts Outcome', 'Stat': round(corr_pred, 2), 'Result': 'Strong' if corr_pred > 0.7 else 'Weak'})
-    else:
-        results.append({'ID': 'Q13', 'Group': 'Predictions', 'Query': 'Early Engagement Predicts Outcome', 'Stat': 0, 'Result': 'Insufficient Data'})
+        if len(aligned) > 2:
+            corr_pred, p_pred = stats.pearsonr(aligned['Q1_Engagement_Numeric'], aligned['Q26_Social_Impact_Numeric'])
+            ci = rs.pearson_summary(rs.ClusterBootstrap(aligned.index, B, seed, row_unit='participant'),
+                                    aligned['Q1_Engagement_Numeric'], aligned['Q26_Social_Impact_Numeric'], B, seed)
+            results.append({'ID': 'Q13', 'Group': 'Predictions', 'Query': 'Early Engagement Predicts Outcome', 'Stat': round(corr_pred, 2), 'Result': 'Strong' if corr_pred > 0.7 else 'Weak', **ci})
+        else:
+            results.append({'ID': 'Q13', 'Group': 'Predictions', 'Query': 'Early Engagement Predicts Outcome', 'Stat': 0, 'Result': 'Insufficient Data'})
 
     # Q15: Relationship Impact
-    corr_rel, p_rel = stats.pearsonr(df['initiation_Q9'], df['relationship_impact_Q13'])
-    results.append({'ID': 'Q15', 'Group': 'Predictions', 'Query': 'Initiation -> Relationship', 'Stat': round(corr_rel, 2), 'Result': 'Correlated' if p_rel < 0.05 else 'Unrelated'})
+    with run.span('Q15', rows=len(df)):
+        corr_rel, p_rel = stats.pearsonr(df['initiation_Q9'], df['relationship_impact_Q13'])
+        ci = rs.pearson_summary(boot, df['initiation_Q9'], df['relationship_impact_Q13'], B, seed)
+        results.append({'ID': 'Q15', 'Group': 'Predictions', 'Query': 'Initiation -> Relationship', 'Stat': round(corr_rel, 2), 'Result': 'Correlated' if p_rel < 0.05 else 'Unrelated', **ci})
+
+    return pd.DataFrame(results, columns=['ID', 'Group', 'Query', 'Stat', 'Result', 'CI_Low', 'CI_High', 'CI_Unit', 'Perm_p'])
+
+def run_statistical_engine(df=None, n_resamples=None, seed=None, backend=None):
+    """
+    Answers the research queries (Q1-Q15) and writes gold_statistical_answers.csv.
+    Pass an in-memory silver frame as df to skip re-reading the CSV.
+    n_resamples / seed default to resampling.N_RESAMPLES / SEED (env STATS_RESAMPLES / STATS_SEED).
+    backend scans only STATS_COLUMNS from silver (see frame_backend.py).
+    """
+    # --- SETUP PATHS INSIDE FUNCTION TO PREVENT ERRORS ---
+    CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+    PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+    
+    # Target Input Path (Silver Layer)
+    file_path = os.path.join(PROJECT_ROOT, 'data', 'silver', 'After_transformation_Data', 'silver_cleaned.csv')
+    
+    # Output Path (Gold Layer)
+    output_dir = os.path.join(PROJECT_ROOT, 'data', 'gold', 'statistical_results')
+    os.makedirs(output_dir, exist_ok=True)
+
+    print("📊 Starting Statistical Engine...")
+    run = RunLogger('gold_stats')
+
+    # --- 1. LOAD DATA ---
+    sessions = None
+    if df is None:
+        if not os.path.exists(file_path):
+            # Fallback Check
+            fallback = os.path.join(PROJECT_ROOT, 'data', 'silver', 'silver_cleaned.csv')
+            if os.path.exists(fallback):
+                print(f"   ⚠️ Primary path not found. Using fallback: {fallback}")
+                file_path = fallback
+            else:
+                print(f"❌ Error: Could not find 'silver_cleaned.csv'.")
+                print(f"   Checked: {file_path}")
+                return
+
+        print(f"   - Input: {file_path}")
+        with run.span('load') as span:
+            # Canonical sessions are precomputed by the cleaning stage (silver_dedup);
+            # without them Q13 rebuilds them from silver, which needs every column
+            if os.path.exists(silver_dedup.SESSIONS_FILE):
+                sessions = pd.read_csv(silver_dedup.SESSIONS_FILE)
+                df = frame_backend.scan_silver(file_path, STATS_COLUMNS, backend=backend)
+            else:
+                df = frame_backend.scan_silver(file_path, backend=backend)
+            span.rows = len(df)
+    else:
+        print(f"   - Input: in-memory silver frame")
+    print(f"   - Loaded {len(df)} rows.")
+    
+    results_df = compute_statistical_answers(df, run, n_resamples, seed, sessions)
 
     # --- SAVE ---
     save_path = os.path.join(output_dir, 'gold_statistical_answers.csv')
     try:
-        pd.DataFrame(results).to_csv(save_path, index=False)
+        with run.span('save', rows=len(results_df)):
+            results_df.to_csv(save_path, index=False)
         print(f"✅ DONE! Results saved to: {save_path}")
     except PermissionError:
         print(f"❌ ERROR: Permission Denied. Please close 'gold_statistical_answers.csv' in Excel and try again.")
+    run.finish()
+    return results_df
 
 if __name__ == "__main__":
-    run_statistical_engine()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Answer the research queries (Q1-Q15) on the silver layer.")
+    parser.add_argument('--resamples', type=int, default=None, help=f"Bootstrap/permutation resamples (default {rs.N_RESAMPLES})")
+    parser.add_argument('--seed', type=int, default=None, help=f"Resampling seed (default {rs.SEED})")
+    parser.add_argument('--backend', choices=frame_backend.BACKENDS, default=None,
+                        help="Dataframe backend for the silver scan (default $FRAME_BACKEND or pandas)")
+    args = parser.parse_args()
+    run_statistical_engine(n_resamples=args.resamples, seed=args.seed, backend=args.backend)
\ No newline at end of file
@@ -0,0 +1,220 @@
+import os
+import re
+import argparse
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import analytics_gold_nlp
+from instrumentation import RunLogger
+
+# =========================================================
+# DISTINCTIVE TERMS BY SLICE
+# Builds one sparse document-term matrix (unigrams + bigrams) over the
+# narrative text of every scored session, then scores what each slice says
+# differently from the rest of its dimension:
+#   - sentiment label, theme, engagement band, success band
+#   - TF-IDF of the slice's pooled term counts
+#   - log-odds ratio with an informative Dirichlet prior, as a z-score
+#     (Monroe, Colaresi & Quinn 2008), which discounts template words that
+#     every note shares instead of ranking them first like raw counts do
+# Slice counts are one sparse product (slices x docs @ docs x terms) and the
+# scores are computed on its non-zero entries only.
+# =========================================================
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+INPUT_FILE = analytics_gold_nlp.SENTIMENT_FILE
+OUTPUT_FILE = os.path.join(analytics_gold_nlp.OUTPUT_DIR, 'gold_nlp_distinctive_terms.csv')
+
+# Slice dimension -> column of the NLP sentiment table
+DIMENSIONS = {
+    'Sentiment': 'Sentiment_Label',
+    'Theme': analytics_gold_nlp.THEME_COL,
+    'Engagement': 'Engagement_Band',
+    'Success': 'Success_Band'
+}
+
+TOP_TERMS = 25      # kept per slice and metric
+MIN_DOCS = 2        # a term must appear in this many sessions
+PRIOR_SCALE = 0.1   # prior counts = PRIOR_SCALE x corpus counts
+
+TOKEN_RE = re.compile(r"[a-z][a-z'-]+")
+# The narrative header ("Theme: ... Result: ... Details:") and "Comment Qn:" labels are template, not content
+HEADER_RE = re.compile(r"^.*? Details: ", re.S)
+COMMENT_LABEL_RE = re.compile(r"comment q\d+:")
+TERM_STOPWORDS = analytics_gold_nlp.STOPWORDS | {
+    'are', 'be', 'been', 'but', 'can', 'did', 'do', 'from', 'had', 'has', 'have', 'him', 'if', 'into',
+    'not', 'or', 'so', 'than', 'their', 'them', 'then', 'there', 'they', 'were', 'when', 'which', 'who',
+    'will', 'would', 'you', 'about', 'after', 'also', 'all', 'any', 'more', 'out', 'up', 'very', 'what',
+    'null', 'through'
+}
+
+
+# --- DOCUMENT-TERM MATRIX ---
+
+def note_text(master_text):
+    """ The content part of a narrative: header and comment labels stripped, lower case. """
+    return COMMENT_LABEL_RE.sub(' ', HEADER_RE.sub('', str(master_text), count=1).lower())
+
+
+def document_terms(texts, min_docs=MIN_DOCS):
+    """
+    Sparse counts (docs x terms, CSR) of unigrams and bigrams of non-stopword tokens.
+    Terms in fewer than min_docs documents are dropped. Returns (matrix, terms).
+    Each distinct text is tokenised once; repeated notes reuse its row.
+    """
+    doc_codes, unique_texts = pd.factorize(pd.Series(texts, dtype=object).fillna(''))
+    flat, lengths = [], []
+    for text in unique_texts:
+        tokens = [t.strip("'-") for t in TOKEN_RE.findall(note_text(text))]
+        tokens = [t for t in tokens if len(t) > 2 and t not in TERM_STOPWORDS]
+        terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        flat += terms
+        lengths.append(len(terms))
+
+    cols, vocabulary = pd.factorize(pd.Series(flat, dtype=object))
+    rows = np.repeat(np.arange(len(unique_texts)), lengths)
+    X = sp.csr_matrix((np.ones(len(cols)), (rows, cols)), shape=(len(unique_texts), len(vocabulary)))
+    X.sum_duplicates()
+    X = X[doc_codes]
+
+    doc_freq = np.diff(X.tocsc().indptr)
+    keep = np.flatnonzero(doc_freq >= min_docs)
+    return X[:, keep].tocsr(), np.asarray(vocabulary, dtype=object)[keep]
+
+
+def slice_matrix(nlp):
+    """
+    Stacked indicator matrix (slices x docs, CSR) over every dimension present,
+    plus (dimension, group) labels and the dimension index of each slice row.
+    """
+    labels, dim_of, blocks = [], [], []
+    for d, (dimension, column) in enumerate(DIMENSIONS.items()):
+        if column not in nlp.columns:
+            continue
+        codes, groups = pd.factorize(nlp[column], sort=True)
+        docs = np.flatnonzero(codes >= 0)
+        blocks.append(sp.csr_matrix((np.ones(len(docs)), (codes[docs], docs)), shape=(len(groups), len(nlp))))
+        labels += [(dimension, str(g)) for g in groups]
+        dim_of += [d] * len(groups)
+    return sp.vstack(blocks).tocsr(), labels, np.array(dim_of)
+
+
+# --- SCORING (on the non-zero slice x term counts) ---
+
+def distinctive_terms(X, S, dim_of, top=TOP_TERMS, prior_scale=PRIOR_SCALE):
+    """
+    X: docs x terms counts, S: slices x docs indicators, dim_of: dimension of each slice.
+    Returns a COO-style dict (slice, term, count, docs, tf_idf, z) of every non-zero slice/term
+    pair kept in the top `top` of its slice by log-odds z or by TF-IDF, plus per-metric ranks.
+    """
+    C = (S @ X).tocoo()                                   # slice x term counts
+    D = (S @ (X > 0).astype(float)).tocsr()               # slice x term document counts
+    g, w, y = C.row, C.col, C.data
+    n_slice = np.asarray(S @ X.sum(axis=1)).ravel()       # tokens per slice
+
+    # Per dimension totals: the "rest" of a slice is its dimension minus itself
+    dims = np.unique(dim_of)
+    dim_pos = np.searchsorted(dims, dim_of)
+    totals = np.vstack([np.asarray(S[dim_of == d].sum(axis=0) @ X).ravel() for d in dims])
+    y_dim = totals[dim_pos[g], w]
+    n_dim = totals.sum(axis=1)[dim_pos[g]]
+
+    # Informative Dirichlet prior from the whole corpus
+    alpha = prior_scale * np.asarray(X.sum(axis=0)).ravel()
+    a_w, a_0 = alpha[w], alpha.sum()
+    y_rest, n_i = y_dim - y, n_slice[g]
+    n_rest = n_dim - n_i
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = (np.log((y + a_w) / (n_i + a_0 - y - a_w))
+                 - np.log((y_rest + a_w) / (n_rest + a_0 - y_rest - a_w)))
+        z = delta / np.sqrt(1 / (y + a_w) + 1 / (y_rest + a_w))
+
+    # TF-IDF of the slice's pooled counts (smoothed idf over sessions)
+    n_docs = X.shape[0]
+    doc_freq = np.diff(X.tocsc().indptr)
+    idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1
+    tf_idf = y / n_slice[g] * idf[w]
+
+    ranks = {}
+    for name, score in (('z', z), ('tf_idf', tf_idf)):
+        order = np.lexsort((-np.nan_to_num(score, nan=-np.inf), g))
+        starts = np.searchsorted(g[order], g[order])       # first position of each slice in the order
+        rank = np.empty(len(g), dtype=np.int64)
+        rank[order] = np.arange(len(g)) - starts + 1
+        ranks[name] = rank
+    keep = (ranks['z'] <= top) | (ranks['tf_idf'] <= top)
+
+    docs = np.asarray(D[g[keep], w[keep]]).ravel()
+    return {
+        'slice': g[keep], 'term': w[keep], 'count': y[keep], 'docs': docs,
+        'tf_idf': tf_idf[keep], 'z': z[keep],
+        'rank_z': np.where(ranks['z'][keep] <= top, ranks['z'][keep], 0),
+        'rank_tf_idf': np.where(ranks['tf_idf'][keep] <= top, ranks['tf_idf'][keep], 0)
+    }
+
+
+def compute_distinctive_terms(nlp, run=None):
+    """ Long table: Dimension, Group, Term, Count, Docs, Group_Docs, TF_IDF, Log_Odds_Z and per-metric ranks (0 = not in top). """
+    run = run or RunLogger('gold_terms', log_file=False)
+
+    with run.span('document_terms', rows=len(nlp)) as span:
+        X, terms = document_terms(nlp['Master_Text'].fillna('').tolist())
+        span.rows = X.nnz
+
+    with run.span('slice_scores', rows=len(nlp)) as span:
+        S, labels, dim_of = slice_matrix(nlp)
+        scores = distinctive_terms(X, S, dim_of)
+        span.rows = len(scores['term'])
+
+    group_docs = np.asarray(S.sum(axis=1)).ravel()
+    s = scores['slice']
+    results = pd.DataFrame({
+        'Dimension': [labels[i][0] for i in s],
+        'Group': [labels[i][1] for i in s],
+        'Term': terms[scores['term']],
+        'Count': scores['count'].astype(int),
+        'Docs': scores['docs'].astype(int),
+        'Group_Docs': group_docs[s].astype(int),
+        'TF_IDF': np.round(scores['tf_idf'], 5),
+        'Log_Odds_Z': np.round(scores['z'], 3),
+        'Rank_Log_Odds': scores['rank_z'],
+        'Rank_TF_IDF': scores['rank_tf_idf']
+    })
+    return results.sort_values(['Dimension', 'Group', 'Log_Odds_Z'], ascending=[True, True, False]).reset_index(drop=True)
+
+
+def run_terms_engine(nlp=None):
+    """
+    Computes distinctive terms for every slice of the NLP sentiment table and writes gold_nlp_distinctive_terms.csv.
+    Pass the scored sessions as nlp to skip re-reading the CSV.
+    """
+    print("🔎 Starting Distinctive Terms Engine...")
+    run = RunLogger('gold_terms')
+
+    if nlp is None:
+        if not os.path.exists(INPUT_FILE):
+            print(f"❌ Error: {INPUT_FILE} not found. Run analytics_gold_nlp.py first.")
+            return
+        with run.span('load') as span:
+            nlp = pd.read_csv(INPUT_FILE)
+            span.rows = len(nlp)
+
+    missing = [d for d, c in DIMENSIONS.items() if c not in nlp.columns]
+    if missing:
+        print(f"   ⚠️ No column for {', '.join(missing)} slices (re-run the NLP stage to add outcome bands).")
+
+    results_df = compute_distinctive_terms(nlp, run)
+    print(f"   - {results_df.groupby(['Dimension', 'Group']).ngroups} slices, {results_df['Term'].nunique()} distinct terms kept.")
+
+    with run.span('save', rows=len(results_df)):
+        results_df.to_csv(OUTPUT_FILE, index=False)
+
+    print(f"✅ DONE! Distinctive terms saved to: {OUTPUT_FILE}")
+    run.finish()
+    return results_df
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description="Distinctive terms (TF-IDF, log-odds) by sentiment, theme and outcome band.").parse_args()
+    run_terms_engine()
@@ -0,0 +1,215 @@
+import pandas as pd
+import numpy as np
+import os
+import time
+import hashlib
+import argparse
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from instrumentation import RunLogger, peak_rss_mb
+
+# --- CONFIGURATION ---
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+INPUT_FILE = os.path.join(PROJECT_ROOT, 'data', 'silver', 'After_transformation_Data', 'silver_cleaned.csv')
+OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'data', 'gold', 'trajectory_results')
+MODELS_FILE = os.path.join(OUTPUT_DIR, 'gold_trajectory_models.csv')
+PARTICIPANTS_FILE = os.path.join(OUTPUT_DIR, 'gold_trajectory_participants.csv')
+
+# Outcome ID -> silver column. Each gets: outcome ~ session_number + (1 + session_number | participant)
+OUTCOMES = {
+    'Q26': 'Q26_Social_Impact_Numeric',
+    'Q1': 'Q1_Engagement_Numeric',
+    'Q15': 'Q15_Response_Time_Seconds'
+}
+
+# Tried in order; the first that converges is kept
+RANDOM_EFFECTS = [
+    ("~session_number", "Random intercept + slope"),
+    ("1", "Random intercept")
+]
+
+# Bump when the model spec changes so cached fits are invalidated
+MODEL_VERSION = 'mixedlm-v1'
+
+
+def outcome_frame(df, column):
+    """ participant_id, session_number, y for one outcome (rows with a missing outcome dropped). """
+    data = pd.DataFrame({
+        'participant_id': df['participant_id'].to_numpy(),
+        'session_number': pd.to_numeric(df['session_number'], errors='coerce').to_numpy(dtype=float),
+        'y': pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+    })
+    return data.dropna().reset_index(drop=True)
+
+
+def data_version(data):
+    """ Content hash of one outcome's model input (+ the model spec). """
+    digest = hashlib.sha256(MODEL_VERSION.encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def fit_trajectory(task):
+    """
+    Fits one outcome's mixed model (runs in a worker process).
+    Returns (model row, participant rows, timing).
+    """
+    # Imported in the worker (and before the clock starts): statsmodels is slow to import
+    import statsmodels.formula.api as smf
+    qid, column, data, version = task
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+
+    row = {'Outcome': qid, 'Column': column, 'Structure': 'Insufficient Data', 'N_Obs': len(data),
+           'N_Participants': data['participant_id'].nunique(), 'Converged': False, 'Data_Version': version}
+    participants = []
+    result, structure = None, None
+
+    if row['N_Participants'] >= 2 and len(data) > 3 and data['session_number'].nunique() > 1:
+        for re_formula, label in RANDOM_EFFECTS:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                try:
+                    fit = smf.mixedlm("y ~ session_number", data, groups=data['participant_id'],
+                                      re_formula=re_formula).fit(reml=True)
+                except (np.linalg.LinAlgError, ValueError):
+                    continue
+            if result is None or fit.converged:
+                result, structure = fit, label
+            if fit.converged:
+                break
+
+    if result is not None:
+        ci = result.conf_int().loc['session_number']
+        cov_re = result.cov_re
+        has_slope = 'session_number' in cov_re.columns
+        row.update({
+            'Structure': structure,
+            'Intercept': result.fe_params['Intercept'],
+            'Slope': result.fe_params['session_number'],
+            'Slope_SE': result.bse_fe['session_number'],
+            'Slope_CI_Low': ci[0],
+            'Slope_CI_High': ci[1],
+            'Slope_p': result.pvalues['session_number'],
+            'Var_Intercept': cov_re.iloc[0, 0],
+            'Var_Slope': cov_re.loc['session_number', 'session_number'] if has_slope else 0.0,
+            'Cov_Intercept_Slope': cov_re.iloc[0, 1] if has_slope else 0.0,
+            'Residual_Var': result.scale,
+            'Converged': bool(result.converged),
+            'Log_Likelihood': result.llf
+        })
+        sessions = data.groupby('participant_id')['session_number'].agg(['count', 'min', 'max'])
+        for pid, effects in result.random_effects.items():
+            participants.append({
+                'Outcome': qid, 'participant_id': pid,
+                # Participant's own line = fixed effect + their random deviation (BLUP)
+                'Intercept': row['Intercept'] + effects.iloc[0],
+                'Slope': row['Slope'] + (effects['session_number'] if has_slope else 0.0),
+                'N_Sessions': int(sessions.loc[pid, 'count']),
+                'First_Session': sessions.loc[pid, 'min'],
+                'Last_Session': sessions.loc[pid, 'max']
+            })
+
+    timing = {'wall_s': time.perf_counter() - wall0, 'cpu_s': time.process_time() - cpu0, 'peak_mb': peak_rss_mb()}
+    row['Fit_Seconds'] = round(timing['wall_s'], 3)
+    return row, participants, timing
+
+
+def load_cached_fits():
+    """ Previous models/participants tables keyed by outcome, if any. """
+    if not (os.path.exists(MODELS_FILE) and os.path.exists(PARTICIPANTS_FILE)):
+        return {}, pd.DataFrame()
+    models = pd.read_csv(MODELS_FILE, dtype={'Data_Version': str})
+    if 'Data_Version' not in models.columns:
+        return {}, pd.DataFrame()
+    return {row['Outcome']: row for row in models.to_dict('records')}, pd.read_csv(PARTICIPANTS_FILE)
+
+
+def compute_trajectories(df, run=None, max_workers=None, cached=None):
+    """
+    Fits the outcome models in parallel -> (models, participants) DataFrames.
+    cached is load_cached_fits() output; outcomes whose Data_Version matches reuse it.
+    """
+    run = run or RunLogger('gold_trajectories', log_file=False)
+    cached_models, cached_participants = cached or ({}, pd.DataFrame())
+
+    # 1. BUILD ONE TASK PER OUTCOME, SKIPPING UNCHANGED ONES
+    tasks, models, participants = [], [], []
+    with run.span('prepare', rows=len(df)):
+        for qid, column in OUTCOMES.items():
+            if column not in df.columns:
+                print(f"   ⚠️ '{column}' missing - skipping {qid}.")
+                continue
+            data = outcome_frame(df, column)
+            version = data_version(data)
+            if qid in cached_models and cached_models[qid]['Data_Version'] == version:
+                print(f"   - {qid}: unchanged (version {version}), reusing stored fit.")
+                models.append(cached_models[qid])
+                participants.extend(cached_participants[cached_participants['Outcome'] == qid].to_dict('records'))
+            else:
+                tasks.append((qid, column, data, version))
+
+    # 2. FIT IN PARALLEL (one process per outcome model)
+    if tasks:
+        workers = min(len(tasks), max_workers or os.cpu_count() or 1)
+        print(f"   - Fitting {len(tasks)} model(s) on {workers} worker(s)...")
+        with run.span('fit_pool', rows=sum(len(t[2]) for t in tasks)):
+            if workers == 1:
+                fitted = [fit_trajectory(t) for t in tasks]
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    fitted = list(pool.map(fit_trajectory, tasks))
+
+        for (qid, _, data, _), (row, rows, timing) in zip(tasks, fitted):
+            # Per-model fit time as measured inside the worker
+            run.record(f"fit_{qid}", timing['wall_s'], timing['cpu_s'], rows=len(data), peak_mb=timing['peak_mb'])
+            print(f"   - {qid}: {row['Structure']}, slope {row.get('Slope', np.nan):.3f}/session "
+                  f"({'converged' if row['Converged'] else 'NOT converged'}, {row['Fit_Seconds']:.2f}s)")
+            models.append(row)
+            participants.extend(rows)
+
+    order = {qid: i for i, qid in enumerate(OUTCOMES)}
+    models_df = pd.DataFrame(models)
+    if not models_df.empty:
+        models_df = models_df.sort_values('Outcome', key=lambda s: s.map(order)).reset_index(drop=True)
+    participants_df = pd.DataFrame(participants, columns=['Outcome', 'participant_id', 'Intercept', 'Slope',
+                                                          'N_Sessions', 'First_Session', 'Last_Session'])
+    return models_df, participants_df
+
+
+def run_trajectory_engine(df=None, max_workers=None, force=False):
+    """
+    Fits mixed-effects trajectories for the key outcomes and writes the trajectory gold files.
+    Outcomes whose input data (and model spec) are unchanged reuse the stored fit.
+    Pass an in-memory silver frame as df to skip re-reading the CSV.
+    """
+    print("📈 Starting Trajectory (Mixed-Effects) Engine...")
+    run = RunLogger('gold_trajectories')
+
+    if df is None:
+        if not os.path.exists(INPUT_FILE):
+            print(f"❌ Error: {INPUT_FILE} not found.")
+            return
+
+        with run.span('load') as span:
+            df = pd.read_csv(INPUT_FILE)
+            span.rows = len(df)
+
+    models_df, participants_df = compute_trajectories(df, run, max_workers, None if force else load_cached_fits())
+
+    # --- SAVE ---
+    with run.span('save', rows=len(models_df) + len(participants_df)):
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        models_df.to_csv(MODELS_FILE, index=False)
+        participants_df.to_csv(PARTICIPANTS_FILE, index=False)
+
+    print(f"✅ DONE! Trajectory models saved to: {OUTPUT_DIR}")
+    run.finish()
+    return models_df
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit mixed-effects trajectories for Q26, Q1 and Q15.")
+    parser.add_argument('--workers', type=int, default=None, help="Max worker processes (default: CPU count)")
+    parser.add_argument('--force', action='store_true', help="Refit even if the data is unchanged")
+    args = parser.parse_args()
+    run_trajectory_engine(max_workers=args.workers, force=args.force)
@@ -0,0 +1,421 @@
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from scipy.special import stdtr
+
+# =========================================================
+# SHARED ANALYTICS LAYER
+# Pure functions that compute page metrics from a Dataset.
+# Both dashboards (app.py, app_dashboard.py) render from these, and
+# results are memoized per data version, so a fix or speed-up here
+# applies everywhere at once.
+# NOTE: memoized results are shared between sessions - never mutate them.
+# =========================================================
+
+CACHE_SIZE = 64
+
+
+class Dataset:
+    """
+    Read-only handle over the silver + gold tables.
+    Two handles with the same version compare equal, which is what the
+    per-version memoization below keys on.
+    """
+
+    def __init__(self, tables, version):
+        self.df = tables['df']
+        self.sessions = tables.get('sessions', pd.DataFrame())
+        self.pairs = tables.get('pairs', pd.DataFrame())
+        self.stats = tables.get('stats', pd.DataFrame())
+        self.nlp = tables.get('nlp', pd.DataFrame())
+        self.keywords = tables.get('keywords', pd.DataFrame())
+        self.terms = tables.get('terms', pd.DataFrame())
+        self.correlations = tables.get('correlations', pd.DataFrame())
+        self.reliability = tables.get('reliability', pd.DataFrame())
+        self.trajectories = tables.get('trajectories', pd.DataFrame())
+        self.trajectory_participants = tables.get('trajectory_participants', pd.DataFrame())
+        self.timeseries = tables.get('timeseries', pd.DataFrame())
+        self.alerts = tables.get('alerts', pd.DataFrame())
+        self.version = version
+
+    def __hash__(self):
+        return hash(self.version)
+
+    def __eq__(self, other):
+        return isinstance(other, Dataset) and self.version == other.version
+
+
+# --- STATISTICAL HELPERS (numpy only; scipy.stats/statsmodels are slow to import) ---
+
+def pearson_with_p(x, y):
+    """Pearson r and two-sided p-value (same maths as scipy.stats.pearsonr)"""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    n = len(x)
+    if n < 2 or x.std() == 0 or y.std() == 0:
+        return 0.0, 1.0
+    r = float(np.clip(np.corrcoef(x, y)[0, 1], -1.0, 1.0))
+    if n < 3:
+        # Two points always lie on a line: no evidence of a trend (scipy gives p = 1 too)
+        return r, 1.0
+    if abs(r) == 1.0:
+        return r, 0.0
+    t = r * np.sqrt((n - 2) / (1 - r ** 2))
+    return r, float(2 * stdtr(n - 2, -abs(t)))
+
+
+def ols_line(x, y):
+    """Slope, intercept and the two end points of the least-squares line"""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    if len(x) < 2 or x.std() == 0:
+        return 0.0, float(y.mean()) if len(y) else 0.0, np.array([]), np.array([])
+    slope, intercept = np.polyfit(x, y, 1)
+    x_line = np.array([x.min(), x.max()])
+    return float(slope), float(intercept), x_line, intercept + slope * x_line
+
+
+def cohens_d(before, after):
+    """Effect size of (after - before) using the pooled SD of both groups"""
+    if len(before) == 0 or len(after) == 0:
+        return 0.0
+    pooled_sd = np.sqrt((before.std() ** 2 + after.std() ** 2) / 2)
+    return float((after.mean() - before.mean()) / pooled_sd) if pooled_sd > 0 else 0.0
+
+
+def effect_label(d):
+    return "Large" if abs(d) > 0.8 else ("Medium" if abs(d) > 0.5 else "Small")
+
+
+# --- GOLD LOOKUPS ---
+
+@lru_cache(maxsize=CACHE_SIZE)
+def stat_lookup(ds):
+    """Gold statistical answers indexed by query ID"""
+    if ds.stats.empty or 'ID' not in ds.stats.columns:
+        return {}
+    return {row['ID']: row for row in ds.stats.to_dict('records')}
+
+
+def stat_text(ds, qid):
+    """Helper to fetch stat result safely"""
+    row = stat_lookup(ds).get(qid)
+    if row is not None:
+        ci = ""
+        if pd.notna(row.get('CI_Low')) and pd.notna(row.get('CI_High')):
+            ci = f", 95% CI {row['CI_Low']} to {row['CI_High']}"
+        if pd.notna(row.get('Perm_p')):
+            ci += f", permutation p={row['Perm_p']}"
+        return f"**💡 Research Verdict:** {row['Result']} (Stat: {row['Stat']}{ci})"
+    return "💡 Calculation pending..."
+
+
+# --- PAGE METRICS ---
+
+@lru_cache(maxsize=CACHE_SIZE)
+def executive_metrics(ds):
+    """Social impact trend (r, p, slope), Cohen's d first vs last session, response time gain"""
+    df = ds.df
+    first_num, last_num = df['session_number'].min(), df['session_number'].max()
+    first = df[df['session_number'] == first_num]
+    last = df[df['session_number'] == last_num]
+
+    if len(df) > 1:
+        corr_val, p_val = pearson_with_p(df['session_number'], df['Q26_Social_Impact_Numeric'])
+        slope, intercept, x_line, y_line = ols_line(df['session_number'], df['Q26_Social_Impact_Numeric'])
+        d = cohens_d(first['Q26_Social_Impact_Numeric'], last['Q26_Social_Impact_Numeric'])
+    else:
+        corr_val, p_val, slope, intercept, d = 0.0, 1.0, 0.0, 0.0, 0.0
+        x_line, y_line = np.array([]), np.array([])
+
+    t1 = first['Q15_Response_Time_Seconds'].mean()
+    t2 = last['Q15_Response_Time_Seconds'].mean()
+    return {
+        'corr': corr_val, 'p_val': p_val, 'slope': slope, 'intercept': intercept,
+        'x_line': x_line, 'y_line': y_line, 'cohens_d': d,
+        'avg_impact': df['Q26_Social_Impact_Numeric'].mean(),
+        'imp_pct': ((t1 - t2) / t1) * 100 if t1 > 0 else 0
+    }
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def efficacy_metrics(ds):
+    """Response time learning curve (first 3 vs last 3 sessions) and distress safety rate"""
+    df = ds.df
+    all_sessions = sorted(df['session_number'].unique())
+    if len(all_sessions) >= 2:
+        split_idx = min(3, len(all_sessions) // 2)
+        first_block = df[df['session_number'].isin(all_sessions[:split_idx])]['Q15_Response_Time_Seconds']
+        last_block = df[df['session_number'].isin(all_sessions[-split_idx:])]['Q15_Response_Time_Seconds']
+        avg_start, avg_end = first_block.mean(), last_block.mean()
+        pct_drop = ((avg_start - avg_end) / avg_start) * 100 if avg_start > 0 else 0
+        # Positive d = faster responses at the end
+        d = -cohens_d(first_block, last_block)
+        label = effect_label(d)
+    else:
+        pct_drop, d, label, avg_end = 0.0, 0.0, "N/A", np.nan
+
+    # 0=Not at all .. 4=Very Frequently. "Often" (3) and above is high distress.
+    high_distress_count = int((df['distress_boredom_frustration_score_Q8'] >= 3).sum())
+    total_sessions = len(df)
+    return {
+        'pct_drop': pct_drop, 'cohens_d': d, 'effect_label': label, 'avg_end': avg_end,
+        'time_trend': df.groupby('session_number')['Q15_Response_Time_Seconds'].mean().reset_index(),
+        'high_distress_count': high_distress_count,
+        'safety_rate': ((total_sessions - high_distress_count) / total_sessions) * 100 if total_sessions > 0 else 0
+    }
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def driver_metrics(ds):
+    """Home application (Q20) vs story engagement (Q1) as predictors of social impact (Q26)"""
+    df = ds.df
+    target = df['Q26_Social_Impact_Numeric']
+    r_home, p_home = pearson_with_p(df['applied_learning_Q20'], target) if 'applied_learning_Q20' in df.columns else (0.0, 1.0)
+    r_engage, p_engage = pearson_with_p(df['Q1_Engagement_Numeric'], target) if 'Q1_Engagement_Numeric' in df.columns else (0.0, 1.0)
+    return {
+        'r_home': r_home, 'p_home': p_home, 'r_engage': r_engage, 'p_engage': p_engage,
+        'winner': "Home Application" if abs(r_home) > abs(r_engage) else "Story Engagement",
+        'diff': abs(r_home) - abs(r_engage),
+        'home_line': ols_line(df['applied_learning_Q20'], target)[2:] if 'applied_learning_Q20' in df.columns else None,
+        'engage_line': ols_line(df['Q1_Engagement_Numeric'], target)[2:] if 'Q1_Engagement_Numeric' in df.columns else None
+    }
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def perspective_comparison(ds):
+    """
+    Per-session mean social impact for Parent (P) vs Therapist (T). None if either side is missing.
+    Reads the precomputed P/T pairs table (silver_dedup.py); falls back to grouping silver.
+    """
+    pairs = ds.pairs
+    if {'Q26_Social_Impact_Numeric_P', 'Q26_Social_Impact_Numeric_T'} <= set(pairs.columns):
+        means = pairs.groupby('session_number')[['Q26_Social_Impact_Numeric_P', 'Q26_Social_Impact_Numeric_T']].mean()
+        means.columns = ['P', 'T']
+    else:
+        df = ds.df
+        if 'submitted_by' not in df.columns:
+            return None
+        means = df.groupby(['session_number', 'submitted_by'])['Q26_Social_Impact_Numeric'].mean().unstack()
+    if 'P' not in means.columns or 'T' not in means.columns:
+        return None
+    parent, therapist = means['P'].dropna(), means['T'].dropna()
+    if len(parent) == 0 or len(therapist) == 0:
+        return None
+
+    comparison_df = pd.DataFrame({'Parent_Score': parent, 'Therapist_Score': therapist}).reset_index()
+    comparison_df['Gap'] = comparison_df['Parent_Score'] - comparison_df['Therapist_Score']
+    return {
+        'comparison_df': comparison_df,
+        'parent_mean': parent.mean(), 'therapist_mean': therapist.mean(),
+        'avg_gap': comparison_df['Gap'].mean()
+    }
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def rater_agreement(ds, score='Q26_Social_Impact_Numeric'):
+    """ Sessions rated by both Parent and Therapist: participant_id, session_number, Parent, Therapist. None if none. """
+    pairs = ds.pairs
+    columns = [f"{score}_P", f"{score}_T"]
+    if pairs.empty or not set(columns) <= set(pairs.columns):
+        return None
+    both = pairs[pairs['Paired'].astype(bool)] if 'Paired' in pairs.columns else pairs.dropna(subset=columns)
+    if both.empty:
+        return None
+    return both[['participant_id', 'session_number'] + columns].rename(
+        columns={columns[0]: 'Parent', columns[1]: 'Therapist'}).reset_index(drop=True)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def reliability_table(ds, scope='Overall', question=None):
+    """
+    Stored P vs T reliability rows (ICC, quadratic kappa, Bland-Altman) for one scope
+    ('Overall', 'Therapist', 'Session'), optionally for one question. None if the gold table is missing.
+    """
+    table = ds.reliability
+    if table.empty or 'ICC' not in table.columns:
+        return None
+    rows = table[table['Scope'] == scope]
+    if question is not None:
+        rows = rows[rows['Question'] == question]
+    return rows.reset_index(drop=True) if len(rows) else None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def strategy_summary(ds):
+    """
+    Sessions per detected intervention strategy (from the NLP strategy tags) with their
+    share of Positive sentiment, most frequent first. None if the NLP run had no tags.
+    """
+    nlp = ds.nlp
+    if nlp.empty or 'Strategy_Tags' not in nlp.columns:
+        return None
+    tagged = nlp.assign(Strategy=nlp['Strategy_Tags'].fillna('').str.split('; ')).explode('Strategy')
+    tagged = tagged[tagged['Strategy'] != '']
+    if tagged.empty:
+        return None
+    summary = tagged.groupby('Strategy').agg(Sessions=('Strategy', 'size'),
+                                             Positive_Share=('Sentiment_Label', lambda s: (s == 'Positive').mean()))
+    return summary.sort_values('Sessions', ascending=False).reset_index()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def early_warnings(ds):
+    """
+    Distress early-warning alerts (distress_alerts.py), most severe then latest first,
+    plus counts per alert type. None if no alerts were raised.
+    """
+    alerts = ds.alerts
+    if alerts.empty or 'Alert' not in alerts.columns:
+        return None
+    severity = alerts['Severity'].map({'High': 0, 'Medium': 1, 'Low': 2})
+    ordered = alerts.assign(_rank=severity).sort_values(['_rank', 'session_number'], ascending=[True, False])
+    return {'alerts': ordered.drop(columns='_rank').reset_index(drop=True),
+            'counts': alerts['Alert'].value_counts().to_dict()}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def term_slices(ds):
+    """ {dimension: [groups]} available in the distinctive-terms table (empty if it is missing). """
+    terms = ds.terms
+    if terms.empty or 'Dimension' not in terms.columns:
+        return {}
+    return {d: sorted(g['Group'].astype(str).unique()) for d, g in terms.groupby('Dimension', sort=False)}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def distinctive_terms(ds, dimension, group, metric='Log_Odds_Z', top=15):
+    """
+    Top terms of one slice (e.g. 'Sentiment', 'Negative') by 'Log_Odds_Z' or 'TF_IDF',
+    from the stored gold table. None if the slice is missing.
+    """
+    terms = ds.terms
+    if terms.empty or metric not in terms.columns:
+        return None
+    rank = 'Rank_Log_Odds' if metric == 'Log_Odds_Z' else 'Rank_TF_IDF'
+    rows = terms[(terms['Dimension'] == dimension) & (terms['Group'].astype(str) == group) & (terms[rank] > 0)]
+    if rows.empty:
+        return None
+    return rows.sort_values(rank).head(top).reset_index(drop=True)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def correlation_matrix(ds, method='Pearson'):
+    """
+    Square (r, p) matrices for 'Pearson' or 'Spearman' from the stored gold correlations,
+    rows/columns labelled and in question order. None if the gold table is missing.
+    """
+    corr = ds.correlations
+    value_col = 'Pearson_r' if method == 'Pearson' else 'Spearman_rho'
+    p_col = 'Pearson_p' if method == 'Pearson' else 'Spearman_p'
+    if corr.empty or value_col not in corr.columns:
+        return None
+    order = list(dict.fromkeys(corr['Label_X']))
+    r = corr.pivot(index='Label_X', columns='Label_Y', values=value_col).reindex(index=order, columns=order)
+    p = corr.pivot(index='Label_X', columns='Label_Y', values=p_col).reindex(index=order, columns=order)
+    return r, p
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def top_correlates(ds, target='Q26', n=8, method='Pearson'):
+    """Strongest stored correlates of one question, by |r|, excluding itself"""
+    corr = ds.correlations
+    value_col = 'Pearson_r' if method == 'Pearson' else 'Spearman_rho'
+    p_col = 'Pearson_p' if method == 'Pearson' else 'Spearman_p'
+    if corr.empty or value_col not in corr.columns:
+        return pd.DataFrame()
+    rows = corr[(corr['Var_X'] == target) & (corr['Var_Y'] != target)].dropna(subset=[value_col])
+    rows = rows.reindex(rows[value_col].abs().sort_values(ascending=False).index).head(n)
+    return pd.DataFrame({'Question': rows['Label_Y'], 'r': rows[value_col], 'p': rows[p_col], 'N': rows['N']})
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def trajectory_model(ds, outcome='Q26'):
+    """Stored mixed-model fit (fixed intercept/slope, CI, variances) for one outcome, or None"""
+    models = ds.trajectories
+    if models.empty or 'Slope' not in models.columns:
+        return None
+    rows = models[(models['Outcome'] == outcome) & models['Slope'].notna()]
+    return rows.iloc[0].to_dict() if len(rows) else None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def participant_trajectory(ds, pid, outcome='Q26'):
+    """A participant's model-based (fixed + random effect) intercept and slope, or None"""
+    fits = ds.trajectory_participants
+    if fits.empty:
+        return None
+    rows = fits[(fits['Outcome'] == outcome) & (fits['participant_id'].astype(str) == str(pid))]
+    return rows.iloc[0].to_dict() if len(rows) else None
+
+
+def participant_timeseries(ds, pid):
+    """
+    A participant's stored rolling means / slopes and change alerts (analytics_gold_rolling.py),
+    one row per session in order. None if the gold table is missing.
+    """
+    if ds.timeseries.empty:
+        return None
+    rows = participant_rows(ds, pid, 'timeseries')
+    return rows if len(rows) else None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def participant_ids(ds, table='df'):
+    frame = getattr(ds, table)
+    return sorted(frame['participant_id'].unique()) if 'participant_id' in frame.columns else []
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def participant_groups(ds, table='df'):
+    """Row positions per participant, built once so each pick is a cheap take()"""
+    frame = getattr(ds, table)
+    return frame.groupby('participant_id', sort=False).indices
+
+
+def participant_rows(ds, pid, table='df'):
+    frame = getattr(ds, table)
+    idx = participant_groups(ds, table).get(pid)
+    return frame.iloc[idx] if idx is not None else frame.iloc[0:0]
+
+
+def clear_caches():
+    """ Drops every memoized result, so Datasets of older data versions are no longer referenced. """
+    for fn in list(globals().values()):
+        if hasattr(fn, 'cache_clear'):
+            fn.cache_clear()
+
+
+def check_pearson(n_trials=200, seed=0):
+    """
+    Compares pearson_with_p with scipy.stats.pearsonr on small samples (2-8 points,
+    including exact lines and tied values). Returns True when every (r, p) matches.
+    """
+    from scipy.stats import pearsonr
+
+    rng = np.random.default_rng(seed)
+    cases = [([1, 2], [3, 5]), ([1, 2], [5, 3]), ([1, 2, 3], [2, 4, 6]), ([1, 2, 3], [3, 2, 1]),
+             ([1, 1, 2, 2], [1, 2, 1, 3])]
+    for _ in range(n_trials):
+        n = int(rng.integers(2, 9))
+        cases.append((rng.integers(0, 5, n), rng.normal(size=n)))
+
+    failures = 0
+    for x, y in cases:
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        if x.std() == 0 or y.std() == 0:
+            continue  # scipy warns and returns nan; the dashboard shows "no correlation"
+        expected = pearsonr(x, y)
+        got = pearson_with_p(x, y)
+        # Exact lines: scipy's rounding can leave r a hair below 1 and p ~1e-8 instead of 0
+        p_tol = 1e-6 if abs(got[0]) == 1.0 and len(x) > 2 else 1e-12
+        if not (np.isclose(got[0], expected[0], rtol=1e-9, atol=1e-12)
+                and np.isclose(got[1], expected[1], rtol=1e-9, atol=p_tol)):
+            failures += 1
+            print(f"   ❌ x={x.tolist()} y={np.round(y, 3).tolist()}: {got} vs scipy {tuple(expected)}")
+    print(f"{'✅' if not failures else '❌'} pearson_with_p vs scipy.stats.pearsonr: "
+          f"{len(cases) - failures}/{len(cases)} samples match")
+    return not failures
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(0 if check_pearson() else 1)
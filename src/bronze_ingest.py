@@ -0,0 +1,261 @@
+import os
+import re
+import json
+import glob
+import shutil
+import hashlib
+import argparse
+from datetime import datetime, date, time as dt_time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from instrumentation import RunLogger
+
+# =========================================================
+# BRONZE INGESTION (.csv / .xlsx -> bronze DataFrame)
+# Workbooks are streamed row by row (openpyxl read-only mode, or the much
+# faster calamine engine when python-calamine is installed) instead of a
+# full pd.read_excel, and every sheet is written once to an uncompressed
+# Feather file. The cache is keyed by the workbook's path and content hash,
+# so later runs memory-map the Feather files and never touch the .xlsx again.
+# =========================================================
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, 'data', 'bronze', '.cache')
+
+# Bump when the sheet -> Arrow conversion changes so old caches are rebuilt
+INGEST_VERSION = 'v1'
+EXCEL_SUFFIXES = ('.xlsx', '.xlsm')
+
+
+# --- HASHING ---
+
+def file_hash(path, chunk_size=1 << 20):
+    """ Streams the file through sha256. """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_key(path):
+    """
+    Cache name prefix for one source workbook: its path relative to the project plus a
+    short hash of that path, so same-named workbooks in different folders
+    (north/2025-W14.xlsx, south/2025-W14.xlsx) never share or evict each other's cache.
+    """
+    relative = os.path.relpath(os.path.abspath(path), BASE_DIR).replace(os.sep, '/')
+    slug = _safe_name(os.path.splitext(relative)[0])[-48:]
+    return f"{slug}-{hashlib.sha256(relative.encode()).hexdigest()[:8]}"
+
+
+def cache_dir_for(path, digest):
+    return os.path.join(CACHE_DIR, f"{source_key(path)}-{INGEST_VERSION}-{digest[:16]}")
+
+
+# --- STREAMING READERS ---
+
+def excel_engine():
+    """ 'calamine' if python-calamine is installed, else 'openpyxl'. """
+    try:
+        import python_calamine  # noqa: F401
+        return 'calamine'
+    except ImportError:
+        return 'openpyxl'
+
+
+def _iter_openpyxl(path):
+    """ Yields (sheet name, row iterator) using openpyxl's read-only (streaming) mode. """
+    import openpyxl
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            # Exports often carry a stale <dimension>; without this rows past it are dropped
+            sheet.reset_dimensions()
+            yield sheet.title, sheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _iter_calamine(path):
+    from python_calamine import CalamineWorkbook
+    workbook = CalamineWorkbook.from_path(path)
+    for name in workbook.sheet_names:
+        yield name, iter(workbook.get_sheet_by_name(name).to_python(skip_empty_area=False))
+
+
+def iter_sheets(path, engine=None):
+    engine = engine or excel_engine()
+    return _iter_calamine(path) if engine == 'calamine' else _iter_openpyxl(path)
+
+
+# --- SHEET -> ARROW ---
+
+def _is_empty(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _column_to_arrow(values):
+    """
+    One typed Arrow column from raw cell values. Numeric / date / bool columns keep
+    their type; anything mixed becomes strings. Only empty cells become missing
+    (text such as 'None' or 'NA' is kept as written).
+    """
+    present = [v for v in values if not _is_empty(v)]
+    values = [None if _is_empty(v) else v for v in values]
+    kinds = {type(v) for v in present}
+
+    if kinds and kinds <= {bool}:
+        return pa.array(values, type=pa.bool_())
+    if kinds and kinds <= {int, float}:
+        if kinds == {int} and len(present) == len(values):
+            return pa.array(values, type=pa.int64())
+        return pa.array([float('nan') if v is None else float(v) for v in values], type=pa.float64())
+    if kinds and kinds <= {datetime, date, pd.Timestamp}:
+        return pa.array([None if v is None else pd.Timestamp(v) for v in values], type=pa.timestamp('us'))
+    if kinds & {datetime, date, dt_time, pd.Timestamp}:
+        values = [v.isoformat() if isinstance(v, (datetime, date, dt_time)) else v for v in values]
+    return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def rows_to_table(rows):
+    """
+    Builds an Arrow table from a row iterator (first non-empty row = header).
+    Cells are appended straight into per-column lists, so no DataFrame of Python
+    objects is ever built for the whole sheet.
+    """
+    header = None
+    columns = []
+    for row in rows:
+        if row is None or all(_is_empty(v) for v in row):
+            continue
+        if header is None:
+            header = [str(v).strip() if not _is_empty(v) else f"Unnamed: {i}" for i, v in enumerate(row)]
+            columns = [[] for _ in header]
+            continue
+        for i, column in enumerate(columns):
+            column.append(row[i] if i < len(row) else None)
+
+    if header is None:
+        return pa.table({})
+    # Trailing header-less columns that never hold a value are just sheet formatting
+    keep = [i for i, name in enumerate(header)
+            if not name.startswith('Unnamed: ') or any(not _is_empty(v) for v in columns[i])]
+    names = [header[i] for i in keep]
+    # Repeated headers get pandas-style suffixes ('Notes', 'Notes.1')
+    seen = {}
+    for j, name in enumerate(names):
+        if name in seen:
+            seen[name] += 1
+            names[j] = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+    return pa.table({name: _column_to_arrow(columns[i]) for name, i in zip(names, keep)})
+
+
+# --- CACHE ---
+
+def _safe_name(sheet):
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", sheet).strip("_") or "sheet"
+
+
+def build_bronze_cache(path, run=None, engine=None):
+    """
+    Converts every sheet of a workbook to Feather once. Returns the cache directory.
+    Written to a temp directory and renamed, so concurrent runs can race safely.
+    """
+    run = run or RunLogger('bronze_ingest', log_file=False)
+    with run.span('hash_workbook'):
+        digest = file_hash(path)
+    target = cache_dir_for(path, digest)
+    if os.path.exists(os.path.join(target, 'manifest.json')):
+        return target
+
+    engine = engine or excel_engine()
+    tmp_dir = f"{target}.{os.getpid()}.tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+    sheets = []
+    for index, (name, rows) in enumerate(iter_sheets(path, engine)):
+        with run.span(f"stream_sheet_{index}") as span:
+            table = rows_to_table(rows)
+            file_name = f"{index:02d}_{_safe_name(name)}.feather"
+            feather.write_feather(table, os.path.join(tmp_dir, file_name), compression='uncompressed')
+            span.rows = table.num_rows
+        print(f"   - Sheet '{name}': {table.num_rows} rows x {table.num_columns} columns ({engine})")
+        sheets.append({'name': name, 'file': file_name, 'rows': table.num_rows, 'columns': table.column_names})
+
+    with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+        json.dump({'source': os.path.basename(path), 'sha256': digest, 'engine': engine,
+                   'version': INGEST_VERSION, 'sheets': sheets}, f, indent=2)
+    try:
+        os.replace(tmp_dir, target)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)  # Another process won the race
+
+    # Drop caches of older versions of the same source workbook (same path, other content or version)
+    key = source_key(path)
+    pattern = re.compile(rf"{re.escape(key)}-v\d+-[0-9a-f]{{16}}$")
+    for old in glob.glob(os.path.join(CACHE_DIR, f"{glob.escape(key)}-*")):
+        if old != target and pattern.match(os.path.basename(old)):
+            shutil.rmtree(old, ignore_errors=True)
+    return target
+
+
+def load_bronze_sheets(path, run=None):
+    """ {sheet name: DataFrame} for a workbook, read from (and if needed, building) its cache. """
+    run = run or RunLogger('bronze_ingest', log_file=False)
+    cache = build_bronze_cache(path, run)
+    with open(os.path.join(cache, 'manifest.json')) as f:
+        manifest = json.load(f)
+    with run.span('read_cache') as span:
+        sheets = {s['name']: feather.read_table(os.path.join(cache, s['file']), memory_map=True).to_pandas()
+                  for s in manifest['sheets']}
+        span.rows = sum(len(df) for df in sheets.values())
+    return sheets
+
+
+# --- LAYOUT ---
+
+def is_generator_layout(df):
+    """ True for raw data_generator output (lowercase '_qN' headers, 1-5 scales). """
+    return 'engagement_score_q1' in df.columns and 'engagement_score_Q1' not in df.columns
+
+
+def load_bronze(path, sheet=None, run=None):
+    """
+    Bronze frame for the cleaning stage from a .csv or .xlsx export.
+    For workbooks, every sheet with a participant_id column is stacked (or just
+    `sheet`). Raw generator workbooks are reshaped into the real bronze layout.
+    """
+    if not path.lower().endswith(EXCEL_SUFFIXES):
+        return pd.read_csv(path)
+
+    sheets = load_bronze_sheets(path, run)
+    if sheet is not None:
+        frames = [sheets[sheet]]
+    else:
+        frames = [df for df in sheets.values() if 'participant_id' in df.columns]
+    if not frames:
+        raise ValueError(f"No sheet with a 'participant_id' column in {os.path.basename(path)}")
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    if is_generator_layout(df):
+        import data_generator
+        print("   - Generator layout detected, reshaping to the bronze export layout.")
+        df = data_generator.to_bronze_layout(df)
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert bronze .xlsx workbooks to the columnar bronze cache.")
+    parser.add_argument('paths', nargs='+', help="Workbook(s) to ingest")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        print(f"📥 Ingesting {path}...")
+        run = RunLogger('bronze_ingest')
+        cache = build_bronze_cache(path, run)
+        print(f"✅ Cached in: {cache}")
+        run.finish()
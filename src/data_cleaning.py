@@ -2,13 +2,28 @@ import pandas as pd
 import numpy as np
 import os
 import re
+import glob
+import argparse
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import bronze_ingest
+import silver_schema
+import silver_dedup
+import frame_backend
+from instrumentation import RunLogger
 
 # --- CONFIGURATION ---
 # We use relative paths so it works on any computer
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-# INPUT: The raw file you just uploaded
+# INPUT: The raw file you just uploaded (a .csv or .xlsx export, see bronze_ingest.py)
+# A directory or glob of weekly clinic exports can be passed instead (see resolve_inputs)
 INPUT_FILE = os.path.join(BASE_DIR, 'data', 'bronze', 'data_bronze_raw.csv')
+BRONZE_SUFFIXES = ('.csv',) + bronze_ingest.EXCEL_SUFFIXES
+
+# Site of a flat file = its name up to the date/week part, e.g. 'north-clinic_2025-W14.csv' -> 'north-clinic'.
+# Files in a subfolder of the input directory take the subfolder name instead.
+SITE_PATTERN = re.compile(r"^(?P<site>.+?)[_ -]+(?:\d{4}|w(?:ee)?k|w\d)", re.IGNORECASE)
 # OUTPUT: The clean Master File
 OUTPUT_DIR = os.path.join(BASE_DIR, 'data', 'silver', 'After_transformation_Data')
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, 'silver_cleaned.csv')
@@ -41,72 +56,303 @@ def clean_percentage(val):
     except ValueError:
         return np.nan
 
-def run_cleaning_pipeline():
-    print(f" Starting Data Cleaning Pipeline...")
-    print(f"   - Input: {INPUT_FILE}")
+# --- STANDARD COLUMN NAMES ---
+# This maps your specific CSV headers to the standard names our Analytics Engine expects
+COLUMN_MAPPING = {
+    'engagement_score_Q1': 'Q1_Engagement_Numeric',
+    'story_personalised_to_participant_Q2': 'Q2_Personalization_Numeric',
+    'how_much_different_scenarios_stories_impact_overall_social_behaviour_Q26': 'Q26_Social_Impact_Numeric',
+    'distress_boredom_frustration_score_Q8': 'distress_boredom_frustration_score_Q8',
+    'verbal_participation_score_Q4': 'verbal_participation_score_Q4',
+    'applied_learning_during/immediately after session_both_P &T_Q20': 'applied_learning_Q20',
+    'what_extend_participant_understand_theme_Q18': 'theme_understand_Q18',
+    'generalise_behaviour_outside_story_Q22': 'generalisation_Q22',
+    'Link_story_to_real_life_experiences_Q25': 'real_life_link_Q25',
+    'participant_initiate_interaction_Q9': 'initiation_Q9',
+    'participant_try_creatively_changes_story_Q11': 'creativity_Q11',
+    'participant_feel_confidence&has_potential_appy_story_after_session_Q21': 'confidence_Q21',
+    'demonstrate_emotional_connection_Q3': 'emotional_connection_Q3',
+    'how_much_relationship_between_particiant& carer/parent Improved_Q13': 'relationship_impact_Q13',
+    'sign_of_enjoyment_Q7': 'enjoyment_Q7'
+}
 
-    # 1. LOAD DATA
-    if not os.path.exists(INPUT_FILE):
-        # Fallback for local testing if folder structure isn't perfect
-        if os.path.exists('data_bronze_raw.csv'):
-            df = pd.read_csv('data_bronze_raw.csv')
-        else:
-            print(f" Error: Input file not found!")
-            return None
-    else:
-        df = pd.read_csv(INPUT_FILE)
-    
-    print(f"   - Loaded {len(df)} rows.")
+def clean_bronze_frame(df, run=None, backend=None):
+    """ Cleaned silver rows of an in-memory bronze frame (quarantined rows dropped). """
+    return clean_and_validate(df, run, backend)[0]
+
+def clean_and_validate(df, run=None, backend=None):
+    """
+    Steps 2-5 of the pipeline on an in-memory bronze frame:
+    drop rows without an ID, parse time/percentage strings, map to standard numeric columns,
+    validate against the silver schema.
+    backend: 'pandas' (reference) or 'polars' for steps 3-4, default $FRAME_BACKEND (see frame_backend.py).
+    Returns (silver, quarantined rows with their broken rules, per-rule counts).
+    """
+    run = run or RunLogger('cleaning', log_file=False)
+    backend = frame_backend.resolve(backend)
 
     # 2. DROP INVALID ROWS
     # Rows without a participant ID are useless
-    df = df.dropna(subset=['participant_id'])
+    with run.span('drop_invalid') as span:
+        df = df.dropna(subset=['participant_id'])
+        span.rows = len(df)
+
+    # 3-4. PARSE + STANDARDIZE (polars: one lazy, multi-threaded query instead of per-row parsing)
+    if backend == 'polars':
+        with run.span('parse_polars', rows=len(df)):
+            df, raw = frame_backend.parse_bronze_polars(df, COLUMN_MAPPING)
+    else:
+        df, raw = parse_bronze(df, run)
 
+    # 5. VALIDATE AGAINST THE SILVER SCHEMA
+    # Garbled / out-of-range values are quarantined instead of silently becoming 0
+    with run.span('validate', rows=len(df)):
+        bad, reasons, rule_counts = silver_schema.validate(df, raw)
+        quarantine = df[bad].assign(quarantine_rules=reasons.to_numpy())
+        if bad.any():
+            df = df[~bad]
+
+    # Genuinely blank scores still count as 0
+    with run.span('fill_missing', rows=len(df)):
+        mapped = [new_name for new_name in COLUMN_MAPPING.values() if new_name in df.columns]
+        df[mapped] = df[mapped].fillna(0)
+    return df, quarantine, rule_counts
+
+def parse_bronze(df, run):
+    """ Steps 3-4 with pandas (the reference backend). Returns (df, {silver column: raw bronze Series}). """
     # 3. APPLY CLEANING FUNCTIONS
     # Clean Response Time (The most critical fix)
     # Note: Column name in your update is 'response_time_min_Q15', but data is often in seconds
-    if 'response_time_min_Q15' in df.columns:
-        df['Q15_Response_Time_Seconds'] = df['response_time_min_Q15'].apply(clean_response_time)
-    else:
-        print("⚠️ Warning: 'response_time_min_Q15' column missing!")
+    with run.span('parse_response_time', rows=len(df)):
+        if 'response_time_min_Q15' in df.columns:
+            df['Q15_Response_Time_Seconds'] = df['response_time_min_Q15'].apply(clean_response_time)
+        else:
+            print("⚠️ Warning: 'response_time_min_Q15' column missing!")
 
     # Clean Success Percentage
-    if 'success_percentage' in df.columns:
-        df['Success_Rate_Numeric'] = df['success_percentage'].apply(clean_percentage)
+    with run.span('parse_percentage', rows=len(df)):
+        if 'success_percentage' in df.columns:
+            df['Success_Rate_Numeric'] = df['success_percentage'].apply(clean_percentage)
 
     # 4. STANDARDIZE COLUMN NAMES
-    # This maps your specific CSV headers to the standard names our Analytics Engine expects
-    column_mapping = {
-        'engagement_score_Q1': 'Q1_Engagement_Numeric',
-        'story_personalised_to_participant_Q2': 'Q2_Personalization_Numeric',
-        'how_much_different_scenarios_stories_impact_overall_social_behaviour_Q26': 'Q26_Social_Impact_Numeric',
-        'distress_boredom_frustration_score_Q8': 'distress_boredom_frustration_score_Q8',
-        'verbal_participation_score_Q4': 'verbal_participation_score_Q4',
-        'applied_learning_during/immediately after session_both_P &T_Q20': 'applied_learning_Q20',
-        'what_extend_participant_understand_theme_Q18': 'theme_understand_Q18',
-        'generalise_behaviour_outside_story_Q22': 'generalisation_Q22',
-        'Link_story_to_real_life_experiences_Q25': 'real_life_link_Q25',
-        'participant_initiate_interaction_Q9': 'initiation_Q9',
-        'participant_try_creatively_changes_story_Q11': 'creativity_Q11',
-        'participant_feel_confidence&has_potential_appy_story_after_session_Q21': 'confidence_Q21',
-        'demonstrate_emotional_connection_Q3': 'emotional_connection_Q3',
-        'how_much_relationship_between_particiant& carer/parent Improved_Q13': 'relationship_impact_Q13',
-        'sign_of_enjoyment_Q7': 'enjoyment_Q7'
-    }
-
     # Perform the renaming (Create new columns, keep old ones just in case)
-    for original, new_name in column_mapping.items():
-        if original in df.columns:
-            # Force numeric (coerce errors) to handle any stray text
-            df[new_name] = pd.to_numeric(df[original], errors='coerce').fillna(0)
-
-    # 5. SAVE GOLD MASTER
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    df.to_csv(OUTPUT_FILE, index=False)
+    raw = {}
+    with run.span('column_mapping', rows=len(df)):
+        for original, new_name in COLUMN_MAPPING.items():
+            if original in df.columns:
+                # Some targets overwrite their source, so keep the raw values for validation
+                raw[new_name] = df[original]
+                # Force numeric (coerce errors) to handle any stray text
+                df[new_name] = pd.to_numeric(df[original], errors='coerce')
+    return df, raw
+
+# --- MULTI-FILE / MULTI-SITE INPUT ---
+
+def is_multi_input(spec):
+    return os.path.isdir(spec) or glob.has_magic(spec)
+
+
+def resolve_inputs(spec):
+    """ Bronze files behind a file, directory (searched recursively) or glob, sorted. """
+    if os.path.isdir(spec):
+        paths = glob.glob(os.path.join(spec, '**', '*'), recursive=True)
+    elif glob.has_magic(spec):
+        paths = glob.glob(spec, recursive=True)
+    else:
+        return [spec]
+    # Skip the ingest cache and Excel's '~$' lock files
+    return sorted(p for p in paths if os.path.isfile(p) and p.lower().endswith(BRONZE_SUFFIXES)
+                  and not os.path.basename(p).startswith(('~$', '.')) and '.cache' not in p.split(os.sep))
+
+
+def site_for(path, root):
+    """ Subfolder under root if there is one, else the file-name prefix before the date/week part. """
+    relative = os.path.relpath(path, root)
+    parts = relative.split(os.sep)
+    if len(parts) > 1:
+        return parts[0]
+    stem = os.path.splitext(parts[0])[0]
+    match = SITE_PATTERN.match(stem)
+    return match.group('site') if match else stem
+
+
+def clean_bronze_file(task):
+    """
+    Loads and cleans one bronze file (runs in a worker process).
+    Returns (silver, quarantine, rule counts, span records); both frames tagged with source_file/site.
+    """
+    path, source, site, backend = task
+    run = RunLogger('cleaning', log_file=False)
+    with run.span('load') as span:
+        df = bronze_ingest.load_bronze(path, run=run)
+        span.rows = len(df)
+    df, quarantine, rule_counts = clean_and_validate(df, run, backend)
+    for frame in (df, quarantine):
+        frame['source_file'] = source
+        frame['site'] = site
+    return df, quarantine, rule_counts, run.records
+
+
+def clean_bronze_files(paths, root, run, max_workers=None, backend=None):
+    """
+    Cleans every file in a process pool (one file per task) and stacks the results
+    -> (silver, quarantine, rule counts). Worker step timings are summed per step
+    into the parent's run log.
+    """
+    tasks = [(p, os.path.relpath(p, root), site_for(p, root), backend) for p in paths]
+    workers = min(len(tasks), max_workers or os.cpu_count() or 1)
+    print(f"   - Cleaning {len(tasks)} file(s) from {len({t[2] for t in tasks})} site(s) on {workers} worker(s)...")
+
+    with run.span('clean_files') as span:
+        if workers == 1:
+            results = [clean_bronze_file(t) for t in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # Small chunks keep all workers busy when file sizes are uneven
+                results = list(pool.map(clean_bronze_file, tasks, chunksize=max(1, len(tasks) // (workers * 8))))
+        span.rows = sum(len(r[0]) for r in results)
+
+    totals = defaultdict(lambda: [0.0, 0.0, 0])
+    for *_, records in results:
+        for r in records:
+            step = totals[r['stage']]
+            step[0] += r['wall_s']
+            step[1] += r['cpu_s']
+            step[2] += r['rows'] or 0
+    for stage, (wall_s, cpu_s, rows) in totals.items():
+        run.record(f"files.{stage}", wall_s, cpu_s, rows=rows)
+
+    with run.span('merge') as span:
+        frames = [r[0] for r in results if len(r[0])]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        quarantined = [r[1] for r in results if len(r[1])]
+        quarantine = pd.concat(quarantined, ignore_index=True) if quarantined else results[0][1]
+        rule_counts = pd.concat([r[2] for r in results], ignore_index=True)
+        rule_counts = rule_counts.groupby(['Column', 'Rule'], as_index=False, sort=False)['Count'].sum()
+        span.rows = len(df)
+    return df, quarantine, rule_counts
+
+
+def check_multi_site(n_sites=4, max_workers=4, n_sessions=300, seed=7):
+    """
+    Cleans a temporary multi-site layout where every site folder holds a workbook with
+    the same name (north/2025-W14.xlsx, south/2025-W14.xlsx, ...) on several workers,
+    twice: the second pass must reuse the first pass's workbook caches. Checks that every
+    site's rows come back and match a one-worker run. Returns True when all checks pass.
+    """
+    import shutil
+    import tempfile
+    import data_generator
+
+    print(f"🏥 Multi-site check: {n_sites} sites x '2025-W14.xlsx' on {max_workers} workers")
+    tmp = tempfile.mkdtemp(prefix='multisite_')
+    paths = []
+    try:
+        for i in range(n_sites):
+            path = os.path.join(tmp, f"site{i}", '2025-W14.xlsx')
+            os.makedirs(os.path.dirname(path))
+            data_generator.generate_bronze(n_sessions, seed=seed + i).to_excel(path, index=False)
+            paths.append(path)
+
+        run = RunLogger('cleaning', log_file=False)
+        first = clean_bronze_files(paths, tmp, run, max_workers)[0]
+        caches = {p: glob.glob(os.path.join(bronze_ingest.CACHE_DIR, f"{glob.escape(bronze_ingest.source_key(p))}-*"))
+                  for p in paths}
+        stamps = {c: os.stat(c).st_mtime_ns for found in caches.values() for c in found}
+        second = clean_bronze_files(paths, tmp, run, max_workers)[0]
+        single = clean_bronze_files(paths, tmp, run, 1)[0]
+
+        order = ['source_file', 'participant_id', 'session_number', 'submitted_by']
+        checks = {
+            'every site cleaned': sorted(first['site'].unique()) == [f"site{i}" for i in range(n_sites)],
+            'one cache per workbook': all(len(found) == 1 for found in caches.values()),
+            'caches reused': all(os.path.exists(c) and os.stat(c).st_mtime_ns == t for c, t in stamps.items()),
+            'same rows as one worker': all(
+                frame.sort_values(order).reset_index(drop=True).equals(single.sort_values(order).reset_index(drop=True))
+                for frame in (first, second))
+        }
+    finally:
+        for path in paths:
+            for cache in glob.glob(os.path.join(bronze_ingest.CACHE_DIR, f"{glob.escape(bronze_ingest.source_key(path))}-*")):
+                shutil.rmtree(cache, ignore_errors=True)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    for name, ok in checks.items():
+        print(f"   {'✅' if ok else '❌'} {name}")
+    return all(checks.values())
+
+
+def run_cleaning_pipeline(input_file=None, max_workers=None, backend=None):
+    input_file = input_file or INPUT_FILE
+    backend = frame_backend.resolve(backend)
+    print(f" Starting Data Cleaning Pipeline...")
+    print(f"   - Input: {input_file} ({backend} backend)")
+    run = RunLogger('cleaning')
+
+    if is_multi_input(input_file):
+        paths = resolve_inputs(input_file)
+        if not paths:
+            print(f" Error: No bronze files found in {input_file}!")
+            return None
+        root = input_file if os.path.isdir(input_file) else os.path.commonpath([os.path.dirname(p) or '.' for p in paths])
+        df, quarantine, rule_counts = clean_bronze_files(paths, root, run, max_workers, backend)
+        print(f"   - Merged {len(df)} rows from {len(paths)} file(s).")
+        return save_silver(df, quarantine, rule_counts, run)
+
+    # 1. LOAD DATA (workbooks are read from their columnar cache after the first run)
+    with run.span('load') as span:
+        if not os.path.exists(input_file):
+            # Fallback for local testing if folder structure isn't perfect
+            if os.path.exists('data_bronze_raw.csv'):
+                df = pd.read_csv('data_bronze_raw.csv')
+            else:
+                print(f" Error: Input file not found!")
+                return None
+        else:
+            df = bronze_ingest.load_bronze(input_file, run=run)
+        span.rows = len(df)
+    
+    print(f"   - Loaded {len(df)} rows.")
+
+    # 2-5. DROP INVALID ROWS, PARSE, STANDARDIZE & VALIDATE
+    df, quarantine, rule_counts = clean_and_validate(df, run, backend)
+    return save_silver(df, quarantine, rule_counts, run)
+
+
+def save_silver(df, quarantine, rule_counts, run):
+    if len(quarantine):
+        print(f"⚠️ Quarantined {len(quarantine)} rows that broke the silver schema:")
+        for row in rule_counts.itertuples(index=False):
+            print(f"   - {row.Column}: {row.Rule} x {row.Count}")
+    with run.span('save_quarantine', rows=len(quarantine)):
+        silver_schema.save_quarantine(quarantine, rule_counts)
+
+    # 6. RESOLVE DUPLICATE SUBMISSIONS, BUILD SESSION + P/T PAIR TABLES
+    # After merging, so a session re-sent in two weekly files is caught too
+    df, dropped, sessions, pairs = silver_dedup.build_session_tables(df, run)
+    silver_dedup.report(dropped, sessions, pairs)
+
+    # 7. SAVE GOLD MASTER
+    with run.span('save', rows=len(df)):
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        df.to_csv(OUTPUT_FILE, index=False)
+        silver_dedup.save_session_tables(dropped, sessions, pairs)
     
     print(f"SUCCESS! Clean Master File saved to:")
     print(f"   {OUTPUT_FILE}")
+    run.finish()
     return df
 
 if __name__ == "__main__":
-    run_cleaning_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Clean a bronze export into the silver master file.")
+    parser.add_argument('--input', default=None,
+                        help=f"Bronze .csv/.xlsx, a directory of them or a quoted glob (default: {INPUT_FILE})")
+    parser.add_argument('--workers', type=int, default=None, help="Max worker processes for multi-file input")
+    parser.add_argument('--backend', choices=frame_backend.BACKENDS, default=None,
+                        help="Dataframe backend for parsing (default $FRAME_BACKEND or pandas)")
+    parser.add_argument('--check-multi-site', action='store_true',
+                        help="Clean a temporary same-named multi-site layout on several workers and check the result")
+    args = parser.parse_args()
+    if args.check_multi_site:
+        raise SystemExit(0 if check_multi_site(max_workers=args.workers or 4) else 1)
+    run_cleaning_pipeline(args.input, args.workers, args.backend)
\ No newline at end of file
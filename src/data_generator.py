@@ -1,8 +1,10 @@
 import pandas as pd
 import numpy as np
 import random
+import re
 from datetime import datetime, timedelta
 import os
+import argparse
 
 # --- CONFIGURATION ---
 NUM_PARTICIPANTS = 30
@@ -36,6 +38,17 @@ THEMES = [
 
 THERAPISTS = ["A.Sharifi", "Dr. Emily Chen", "B. Johnson", "S. Patel"]
 
+# Intervention strategies per theme (also the tag vocabulary of the NLP engine)
+STRATEGIES = {
+    "Anger Management": ["deep breathing protocols", "a '5-count' grounding technique", "visual 'calm down' maps", "tactile stress-relief objects"],
+    "Taking Turns": ["a digital visual timer", "a physical 'turn-taking' baton", "musical cues for transition", "structured role-play scenarios"],
+    "Handling Change": ["social stories regarding transitions", "a 'First-Then' visual board", "predictive scheduling", "front-loading of upcoming changes"],
+    "Making Friends": ["scripted social greetings", "joint attention activities", "facial emotion recognition cards", "reciprocal play modeling"],
+    "Sensory Overload": ["auditory dampening (headphones)", "proprioceptive heavy work", "dimmed lighting environments", "a designated quiet zone"],
+    "Asking for Help": ["communication exchange cards (PECS)", "verbal sentence starters", "gestural prompting", "a 'help' button request"]
+}
+DEFAULT_STRATEGY = "standard behavioral prompting"
+
 # --- ADVANCED TEXT GENERATION LOGIC ---
 
 def get_intervention_note(theme, interest, engagement, distress):
@@ -45,17 +58,8 @@ def get_intervention_note(theme, interest, engagement, distress):
     """
     verbs = ["utilized", "employed", "integrated", "scaffolded", "introduced", "modeled", "applied"]
     
-    strategies = {
-        "Anger Management": ["deep breathing protocols", "a '5-count' grounding technique", "visual 'calm down' maps", "tactile stress-relief objects"],
-        "Taking Turns": ["a digital visual timer", "a physical 'turn-taking' baton", "musical cues for transition", "structured role-play scenarios"],
-        "Handling Change": ["social stories regarding transitions", "a 'First-Then' visual board", "predictive scheduling", "front-loading of upcoming changes"],
-        "Making Friends": ["scripted social greetings", "joint attention activities", "facial emotion recognition cards", "reciprocal play modeling"],
-        "Sensory Overload": ["auditory dampening (headphones)", "proprioceptive heavy work", "dimmed lighting environments", "a designated quiet zone"],
-        "Asking for Help": ["communication exchange cards (PECS)", "verbal sentence starters", "gestural prompting", "a 'help' button request"]
-    }
-    
     # Select specific strategy for the theme
-    strategy = random.choice(strategies.get(theme, ["standard behavioral prompting"]))
+    strategy = random.choice(STRATEGIES.get(theme, [DEFAULT_STRATEGY]))
     verb = random.choice(verbs)
 
     if engagement >= 4:
@@ -212,6 +216,259 @@ def simulate_session(profile, session_num, start_date):
         "notes_observations": note_obs
     }
 
+# --- BRONZE LAYOUT ---
+# Generator columns -> the headers of the real bronze export (data/bronze/data_bronze_raw.csv)
+BRONZE_COLUMN_MAP = {
+    "diagnosis": "Co-existing disability diagnosed details",
+    "baseline_severity": "Level of Severity",
+    "submitted_type": "submitted_by",
+    "other_information": "Theme of Today's Story",
+    "engagement_score_q1": "engagement_score_Q1",
+    "personalization_score_q2": "story_personalised_to_participant_Q2",
+    "emotional_conn_score_q3": "demonstrate_emotional_connection_Q3",
+    "verbal_partic_score_q4": "verbal_participation_score_Q4",
+    "attention_maint_q5": "participant_attention_maintain_Q5",
+    "retell_likelihood_q6": "retell_likelihood_&uses_story_conversation_Q6",
+    "enjoyment_score_q7": "sign_of_enjoyment_Q7",
+    "distress_boredom_frustration_score_q8": "distress_boredom_frustration_score_Q8",
+    "interaction_init_q9": "participant_initiate_interaction_Q9",
+    "repetition_score_q10": "repeat_story_Q10",
+    "creativity_score_q11": "participant_try_creatively_changes_story_Q11",
+    "relationship_impact_q13": "how_much_relationship_between_particiant& carer/parent Improved_Q13",
+    "feelings_express_q14": "participant_express_feelings_about_story_Q14",
+    "response_time_min_q15": "response_time_min_Q15",
+    "theme_understand_q18": "what_extend_participant_understand_theme_Q18",
+    "applied_learning_q20": "applied_learning_during/immediately after session_both_P &T_Q20",
+    "confidence_potential_q21": "participant_feel_confidence&has_potential_appy_story_after_session_Q21",
+    "generalization_q22": "generalise_behaviour_outside_story_Q22",
+    "recall_previous_story_q23": "recall_previous_story_Q23",
+    "reflect_comment_after_story_ended_q24": "reflect_comment_about_theme_after_story_ended_Q24",
+    "real_life_link_q25": "Link_story_to_real_life_experiences_Q25",
+    "social_impact_score_q26": "how_much_different_scenarios_stories_impact_overall_social_behaviour_Q26",
+    "success_count": "successful/postive response",
+    "notes_observations": "additional_notes_observations"
+}
+
+# Bronze keeps Q4 and Q26 on 0-10; every other score is 0-4 (generator uses 1-5)
+TEN_POINT_SCORES = {"verbal_partic_score_q4", "social_impact_score_q26"}
+
+# Free-text columns of the real export (there is no Q19)
+COMMENT_COLUMNS = [f"Comment_Q{i}" for i in range(1, 27) if i != 19]
+
+# Column order of data/bronze/data_bronze_raw.csv
+BRONZE_COLUMNS = [
+    "participant_id", "age", "gender", "special_interest", "Any co-existing disabiltiy diagnosis",
+    "Co-existing disability diagnosed details", "Level of Severity", "Autism Level",
+    "Stimming behaviour Identified?", "observed_stimming", "Primary_Goal",
+    "Other_information_eg_anymedicalcondtion_selective_autism", "session_number", "session_date",
+    "submitted_by", "therapist_parent_name",
+    "engagement_score_Q1", "Comment_Q1", "story_personalised_to_participant_Q2", "Comment_Q2",
+    "demonstrate_emotional_connection_Q3", "Comment_Q3", "verbal_participation_score_Q4", "Comment_Q4",
+    "participant_attention_maintain_Q5", "Comment_Q5", "retell_likelihood_&uses_story_conversation_Q6", "Comment_Q6",
+    "sign_of_enjoyment_Q7", "Comment_Q7", "distress_boredom_frustration_score_Q8", "Comment_Q8",
+    "participant_initiate_interaction_Q9", "Comment_Q9", "repeat_story_Q10", "Comment_Q10",
+    "participant_try_creatively_changes_story_Q11", "Comment_Q11",
+    "how_retelling_story_impact_carer/participant_relationship_at_home_Q12", "Comment_Q12",
+    "how_much_relationship_between_particiant& carer/parent Improved_Q13", "Comment_Q13",
+    "participant_express_feelings_about_story_Q14", "Comment_Q14", "response_time_min_Q15", "Comment_Q15",
+    "Response_time_decrease_from_last_session_Q16", "Comment_Q16",
+    "Response_time_increase_from_last_session_Q17", "Comment_Q17", "Theme of Today's Story",
+    "what_extend_participant_understand_theme_Q18", "Comment_Q18",
+    "applied_learning_during/immediately after session_both_P &T_Q20", "Comment_Q20",
+    "participant_feel_confidence&has_potential_appy_story_after_session_Q21", "Comment_Q21",
+    "generalise_behaviour_outside_story_Q22", "Comment_Q22", "recall_previous_story_Q23", "Comment_Q23",
+    "reflect_comment_about_theme_after_story_ended_Q24", "Comment_Q24",
+    "Link_story_to_real_life_experiences_Q25", "Comment_Q25",
+    "how_much_different_scenarios_stories_impact_overall_social_behaviour_Q26", "Comment_Q26",
+    "Theme_specific_situation", "engagement_opportunities_count", "successful/postive response",
+    "success_percentage", "notes_intervention", "additional_notes_observations"
+]
+
+# --- SCENARIO PROFILES ---
+# Shape the workload the cleaning/NLP code sees. Every rate is per row (or per comment cell).
+SCENARIOS = {
+    # Tidy data: fixed MAX_SESSIONS per participant, canonical strings, no comments
+    "clean": {
+        "messy_time_rate": 0.0,       # '2 Minutes', ' 90 secs ', '1.5 min' instead of '120 seconds'
+        "messy_pct_rate": 0.0,        # '60 %', '60.0%', '60' instead of '60%'
+        "garbage_rate": 0.0,          # unparseable time/percentage cells ('N/A', 'not recorded')
+        "session_tail": None,         # Pareto shape for sessions per participant (None = MAX_SESSIONS)
+        "max_sessions": MAX_SESSIONS,
+        "duplicate_pt_rate": 0.0,     # sessions submitted by both parent and therapist
+        "comment_fill_rate": 0.0,     # share of Comment_Q* cells filled
+        "comment_sentences": (1, 1),  # sentences per filled comment (min, max)
+        "missing_id_rate": 0.0        # rows with an empty participant_id
+    },
+    # Close to what the real exports look like
+    "realistic": {
+        "messy_time_rate": 0.3,
+        "messy_pct_rate": 0.2,
+        "garbage_rate": 0.01,
+        "session_tail": 1.5,
+        "max_sessions": 60,
+        "duplicate_pt_rate": 0.5,
+        "comment_fill_rate": 0.3,
+        "comment_sentences": (1, 3),
+        "missing_id_rate": 0.01
+    },
+    # Worst case for the slow paths: every string messy, long comments everywhere, long tails
+    "adversarial": {
+        "messy_time_rate": 1.0,
+        "messy_pct_rate": 1.0,
+        "garbage_rate": 0.05,
+        "session_tail": 1.1,
+        "max_sessions": 250,
+        "duplicate_pt_rate": 1.0,
+        "comment_fill_rate": 0.9,
+        "comment_sentences": (4, 12),
+        "missing_id_rate": 0.05
+    }
+}
+
+MESSY_TIME_FORMATS = [
+    lambda sec: f"{sec / 60:g} Minutes",
+    lambda sec: f"{sec / 60:g} minute",
+    lambda sec: f" {sec} secs ",
+    lambda sec: f"{sec} Seconds",
+    lambda sec: f"approx {sec / 60:.1f} min",
+    lambda sec: f"{sec}"
+]
+MESSY_PCT_FORMATS = [
+    lambda pct: f"{pct:g} %",
+    lambda pct: f"{pct:.1f}%",
+    lambda pct: f" {pct:g}% ",
+    lambda pct: f"{pct:g}"
+]
+GARBAGE_VALUES = ["N/A", "not recorded", "-", "?"]
+
+
+def get_scenario(name, **overrides):
+    """ Copy of a named scenario profile with individual rates overridden. """
+    if name not in SCENARIOS:
+        raise ValueError(f"Unknown scenario '{name}'. Choose from: {', '.join(SCENARIOS)}")
+    unknown = set(overrides) - set(SCENARIOS[name])
+    if unknown:
+        raise ValueError(f"Unknown scenario settings: {', '.join(sorted(unknown))}")
+    return {**SCENARIOS[name], **overrides}
+
+
+def sessions_for_participant(scenario):
+    if not scenario["session_tail"]:
+        return MAX_SESSIONS
+    # Pareto tail: most participants have a handful of sessions, a few have very many
+    n = 1 + int(np.random.pareto(scenario["session_tail"]) * 4)
+    return min(n, scenario["max_sessions"])
+
+
+def get_comment(theme, interest, n_sentences):
+    """ A free-text comment made of several observation/intervention sentences. """
+    parts = []
+    for _ in range(n_sentences):
+        engagement, distress = random.randint(1, 5), random.randint(1, 5)
+        if random.random() < 0.5:
+            parts.append(get_observation_note(theme, interest, engagement, 0))
+        else:
+            parts.append(get_intervention_note(theme, interest, engagement, distress))
+    return " ".join(parts)
+
+
+def other_submitter(session, profile):
+    """ The same session as reported by the other party (P <-> T), with slightly different scores. """
+    twin = dict(session)
+    twin["submitted_type"] = "T" if session["submitted_type"] == "P" else "P"
+    twin["therapist_parent_name"] = profile["therapist_name"] if twin["submitted_type"] == "T" else "Parent"
+    for col, value in session.items():
+        if re.search(r"_q\d+$", col) and col != "response_time_min_q15":
+            high = 10 if col in TEN_POINT_SCORES else 5
+            twin[col] = int(np.clip(value + random.choice([-1, 0, 0, 1]), 1, high))
+    return twin
+
+
+def to_bronze_layout(df, scenario=None):
+    """
+    Reshapes generator output into the real bronze export so it can go through data_cleaning:
+    real headers and column order, 0-4 scores, day-first dates, '120 seconds' response times
+    and '80%' strings. A scenario adds messy/garbage strings and missing IDs at its rates.
+    """
+    scenario = scenario or SCENARIOS["clean"]
+    df = df.copy()
+    n = len(df)
+    score_cols = [c for c in df.columns if re.search(r"_q\d+$", c) and c != "response_time_min_q15"]
+    for col in score_cols:
+        if col not in TEN_POINT_SCORES:
+            df[col] = df[col] - 1
+
+    dates = pd.to_datetime(df["session_date"])
+    df["session_date"] = dates.dt.day.astype(str) + "/" + dates.dt.month.astype(str) + "/" + dates.dt.year.astype(str)
+
+    # Response time (seconds) and success percentage strings, messy at the scenario's rates
+    seconds = (df["response_time_min_q15"] * 60).round().astype(int).tolist()
+    time_style = np.random.randint(len(MESSY_TIME_FORMATS), size=n)
+    messy_time = np.random.random(n) < scenario["messy_time_rate"]
+    df["response_time_min_q15"] = [MESSY_TIME_FORMATS[k](sec) if m else f"{sec} seconds"
+                                   for sec, k, m in zip(seconds, time_style, messy_time)]
+
+    pct_style = np.random.randint(len(MESSY_PCT_FORMATS), size=n)
+    messy_pct = np.random.random(n) < scenario["messy_pct_rate"]
+    df["success_percentage"] = [MESSY_PCT_FORMATS[k](pct) if m else f"{pct:g}%"
+                                for pct, k, m in zip(df["success_percentage"], pct_style, messy_pct)]
+
+    for col in ("response_time_min_q15", "success_percentage"):
+        garbage = np.random.random(n) < scenario["garbage_rate"]
+        df.loc[garbage, col] = np.random.choice(GARBAGE_VALUES, size=int(garbage.sum()))
+
+    # Fields the real export carries that the generator doesn't model directly
+    df["Any co-existing disabiltiy diagnosis"] = "Yes"
+    df["Autism Level"] = np.where(df["baseline_severity"] >= 6, 2, 1)
+    df["Stimming behaviour Identified?"] = np.where(df["observed_stimming"] == "None", "No", "Yes")
+    df["how_retelling_story_impact_carer/participant_relationship_at_home_Q12"] = np.select(
+        [df["relationship_impact_q13"] >= 4, df["relationship_impact_q13"] >= 2], ["Improved", "Stayed same"], "Not Improved")
+
+    # Empty participant IDs (nullable Int64 keeps the rest as '113', not '113.0')
+    ids = df["participant_id"].astype("Int64")
+    ids[np.random.random(n) < scenario["missing_id_rate"]] = pd.NA
+    df["participant_id"] = ids
+
+    return df.rename(columns=BRONZE_COLUMN_MAP).reindex(columns=BRONZE_COLUMNS)
+
+
+def generate_cohort(n_sessions, seed=None, start_date=None, scenario=None):
+    """
+    Generates n_sessions rows without saving.
+    scenario (a profile from get_scenario) controls sessions per participant, P+T duplicates
+    and Comment_Q* text; default is the clean profile (participants x MAX_SESSIONS, truncated).
+    A seed makes the cohort reproducible (benchmarks cache on it).
+    """
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+    start_date = start_date or datetime(2025, 1, 6)
+    scenario = scenario or SCENARIOS["clean"]
+    low, high = scenario["comment_sentences"]
+
+    all_data = []
+    p_id = 100
+    while len(all_data) < n_sessions:
+        p_id += 1
+        profile = generate_participant_profile(p_id)
+        for s in range(1, sessions_for_participant(scenario) + 1):
+            session = simulate_session(profile, s, start_date)
+            if scenario["comment_fill_rate"]:
+                for col in COMMENT_COLUMNS:
+                    if random.random() < scenario["comment_fill_rate"]:
+                        session[col] = get_comment(session["Theme_specific_situation"], profile["special_interest"],
+                                                   random.randint(low, high))
+            all_data.append(session)
+            if random.random() < scenario["duplicate_pt_rate"]:
+                all_data.append(other_submitter(session, profile))
+    return pd.DataFrame(all_data[:n_sessions])
+
+
+def generate_bronze(n_sessions, scenario="realistic", seed=None, **overrides):
+    """ Bronze-layout cohort for a named scenario (see SCENARIOS), rates overridable by keyword. """
+    profile = get_scenario(scenario, **overrides)
+    return to_bronze_layout(generate_cohort(n_sessions, seed=seed, scenario=profile), profile)
+
 def generate_dataset():
     print(f" Generating REALISTIC Clinical Data for NLP (N={NUM_PARTICIPANTS} x {MAX_SESSIONS})...")
     
@@ -232,6 +489,35 @@ def generate_dataset():
     
     print(f" Success! Generated {len(df)} rows.")
     print(f" Excel Sheet saved to: {OUTPUT_PATH}")
+    return df
+
+def parse_override(text):
+    """ 'messy_time_rate=0.5' -> ('messy_time_rate', 0.5); 'comment_sentences=2,6' -> (.., (2, 6)) """
+    key, _, value = text.partition("=")
+    if "," in value:
+        return key, tuple(int(v) for v in value.split(","))
+    if value.lower() in ("none", ""):
+        return key, None
+    return key, float(value) if "." in value else int(value)
+
 
 if __name__ == "__main__":
-    generate_dataset()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Synthetic ToyPal data. Without --scenario, writes the demo Excel workbook.")
+    parser.add_argument("--scenario", choices=list(SCENARIOS), help="Emit a bronze CSV in the real export layout")
+    parser.add_argument("--sessions", type=int, default=10_000, help="Rows to generate (with --scenario)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="Override a scenario setting, e.g. --set missing_id_rate=0.2")
+    parser.add_argument("--out", help="Output CSV (default data/bronze/synthetic_<scenario>_<sessions>.csv)")
+    args = parser.parse_args()
+
+    if args.scenario is None:
+        generate_dataset()
+    else:
+        overrides = dict(parse_override(o) for o in args.set)
+        print(f" Generating '{args.scenario}' bronze data ({args.sessions:,} sessions)...")
+        df = generate_bronze(args.sessions, args.scenario, seed=args.seed, **overrides)
+        out = args.out or os.path.join(BASE_DIR, "data", "bronze", f"synthetic_{args.scenario}_{args.sessions}.csv")
+        os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+        df.to_csv(out, index=False)
+        print(f" Success! {len(df)} rows, {df['participant_id'].nunique()} participants -> {out}")
\ No newline at end of file
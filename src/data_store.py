@@ -0,0 +1,134 @@
+import os
+import glob
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SILVER_FILE = os.path.join(BASE_DIR, 'data', 'silver', 'After_transformation_Data', 'silver_cleaned.csv')
+SILVER_FALLBACK = os.path.join(BASE_DIR, 'data', 'silver', 'silver_cleaned.csv')
+
+# Every table the dashboard reads. 'df' (silver) is required, the session/pair and gold tables are optional.
+TABLES = {
+    'df': SILVER_FILE,
+    'sessions': os.path.join(BASE_DIR, 'data', 'silver', 'After_transformation_Data', 'silver_sessions.csv'),
+    'pairs': os.path.join(BASE_DIR, 'data', 'silver', 'After_transformation_Data', 'silver_pairs.csv'),
+    'stats': os.path.join(BASE_DIR, 'data', 'gold', 'statistical_results', 'gold_statistical_answers.csv'),
+    'nlp': os.path.join(BASE_DIR, 'data', 'gold', 'nlp_results', 'gold_nlp_full_session_sentiment.csv'),
+    'keywords': os.path.join(BASE_DIR, 'data', 'gold', 'nlp_results', 'gold_nlp_keyword_trends.csv'),
+    'terms': os.path.join(BASE_DIR, 'data', 'gold', 'nlp_results', 'gold_nlp_distinctive_terms.csv'),
+    'correlations': os.path.join(BASE_DIR, 'data', 'gold', 'statistical_results', 'gold_correlations.csv'),
+    'reliability': os.path.join(BASE_DIR, 'data', 'gold', 'statistical_results', 'gold_reliability.csv'),
+    'trajectories': os.path.join(BASE_DIR, 'data', 'gold', 'trajectory_results', 'gold_trajectory_models.csv'),
+    'trajectory_participants': os.path.join(BASE_DIR, 'data', 'gold', 'trajectory_results', 'gold_trajectory_participants.csv'),
+    'timeseries': os.path.join(BASE_DIR, 'data', 'gold', 'trajectory_results', 'gold_participant_timeseries.csv'),
+    'alerts': os.path.join(BASE_DIR, 'data', 'gold', 'alert_results', 'gold_distress_alerts.csv')
+}
+
+# Bumped by writers that update tables in place (ingest_service.py) once all their files are written
+VERSION_FILE = os.path.join(BASE_DIR, 'data', '.data_version')
+
+# Memory-mapped Arrow copies of the CSVs live here (one file per CSV version)
+CACHE_DIR = os.path.join(BASE_DIR, 'data', '.arrow_cache')
+
+
+def _column_to_arrow(series):
+    """
+    Converts one pandas column to Arrow.
+    Float columns keep NaN as a value (not as a null) so they can later be
+    handed back to pandas without a copy.
+    """
+    if pd.api.types.is_float_dtype(series.dtype):
+        return pa.array(series.to_numpy(dtype='float64'), from_pandas=False)
+    if pd.api.types.is_integer_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        return pa.array(series.to_numpy())
+    return pa.array(series.astype(object).where(series.notna(), None).tolist(), type=pa.string())
+
+
+def _cache_path(csv_path):
+    """ Cache file name encodes the CSV size + mtime, so an edited CSV gets a fresh cache. """
+    stat = os.stat(csv_path)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(CACHE_DIR, f"{stem}_{stat.st_size}_{stat.st_mtime_ns}.feather")
+
+
+def build_arrow_cache(csv_path):
+    """
+    Converts a CSV to an uncompressed Feather (Arrow IPC) file once.
+    Written to a temp file and renamed, so several server processes can race safely.
+    """
+    target = _cache_path(csv_path)
+    if os.path.exists(target):
+        return target
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    df = pd.read_csv(csv_path)
+    table = pa.table({col: _column_to_arrow(df[col]) for col in df.columns})
+
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, target)
+
+    # Drop caches of older versions of the same CSV
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    for old in glob.glob(os.path.join(CACHE_DIR, f"{stem}_*.feather")):
+        if old != target:
+            try:
+                os.remove(old)
+            except OSError:
+                pass  # Another process may still have it mapped (Windows)
+    return target
+
+
+def load_table(csv_path):
+    """
+    Returns a read-only DataFrame backed by a memory-mapped Arrow file.
+    Numeric columns are zero-copy views and strings stay in Arrow memory,
+    so every process reading the same file shares the OS page cache.
+    """
+    table = feather.read_table(build_arrow_cache(csv_path), memory_map=True)
+    return table.to_pandas(split_blocks=True, types_mapper={pa.string(): pd.StringDtype('pyarrow')}.get)
+
+
+def data_version():
+    """ Cheap token that changes whenever any dashboard input file changes (or the version file is bumped). """
+    parts = []
+    if os.path.exists(VERSION_FILE):
+        with open(VERSION_FILE) as f:
+            parts.append(f"token:{f.read().strip()}")
+    for name, path in sorted(TABLES.items()):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return "|".join(parts)
+
+
+def bump_version():
+    """ Increments the shared version token so running dashboards reload. Returns the new token. """
+    token = 0
+    if os.path.exists(VERSION_FILE):
+        with open(VERSION_FILE) as f:
+            token = int(f.read().strip() or 0)
+    tmp_path = f"{VERSION_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(str(token + 1))
+    os.replace(tmp_path, VERSION_FILE)
+    return token + 1
+
+
+def load_dashboard_data():
+    """
+    Loads silver + gold tables for the dashboard.
+    Returns None when the silver layer is missing.
+    """
+    silver = SILVER_FILE if os.path.exists(SILVER_FILE) else SILVER_FALLBACK
+    if not os.path.exists(silver):
+        return None
+
+    data = {'df': load_table(silver)}
+    for name, path in TABLES.items():
+        if name != 'df' and os.path.exists(path):
+            data[name] = load_table(path)
+    return data
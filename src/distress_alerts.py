@@ -0,0 +1,330 @@
+import io
+import os
+import time
+import argparse
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import data_store
+from silver_dedup import SESSION_KEY
+from instrumentation import RunLogger
+
+# =========================================================
+# STREAMING DISTRESS EARLY WARNING
+# Consumes cleaned session rows as they arrive and keeps a fixed amount of
+# state per rater stream in flat numpy arrays. Silver holds one row per rater
+# (P / T) per session, so each (participant, rater) pair gets its own slot and
+# a streak counts that rater's sessions, not submissions:
+#   - ring buffer of the last RECENT distress scores
+#   - consecutive high-distress sessions
+#   - EWMA of engagement (Q1)
+#   - last session seen (a re-sent session does not count twice)
+# Each incoming batch is applied in "waves": wave k holds the k-th row of
+# every slot in the batch, so a wave touches each slot once and is a
+# handful of vectorized array updates. Rows never need the rest of silver.
+#
+#   python distress_alerts.py --replay     # backtest over all of silver, rebuild state
+#   python distress_alerts.py --follow     # tail rows appended to silver, alert on arrival
+# =========================================================
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'data', 'gold', 'alert_results')
+ALERTS_FILE = os.path.join(OUTPUT_DIR, 'gold_distress_alerts.csv')
+STATE_FILE = os.path.join(PROJECT_ROOT, 'data', '.distress_state.npz')
+
+DISTRESS_COL = 'distress_boredom_frustration_score_Q8'
+ENGAGEMENT_COL = 'Q1_Engagement_Numeric'
+INPUT_COLUMNS = SESSION_KEY + ['session_date', 'submitted_by', DISTRESS_COL, ENGAGEMENT_COL]
+
+# 0=Not at all .. 4=Very Frequently; "Often" (3) and above is high distress (same as efficacy.show)
+HIGH_DISTRESS = 3
+RECENT = 4               # distress scores kept per participant
+CONSECUTIVE_ALERT = 2    # high-distress sessions in a row that escalate
+EWMA_ALPHA = 0.3
+ENGAGEMENT_DROP = 1.0    # points below the engagement EWMA that raise an alert
+MIN_HISTORY = 3          # sessions seen before engagement drops are judged
+
+POLL_S = 0.5
+INITIAL_SLOTS = 64
+STATE_FORMAT = 2         # checkpoints of another format are ignored (and silver replayed)
+
+ALERT_COLUMNS = SESSION_KEY + ['session_date', 'submitted_by', 'Alert', 'Severity', 'Distress', 'Consecutive_High',
+                               'Recent_Distress_Mean', 'Engagement', 'Engagement_EWMA', 'Detected_At']
+
+
+class DistressState:
+    """
+    Per-(participant, rater) state in flat arrays; slots are assigned on first sight
+    and the arrays double when full. Saved / loaded as one .npz checkpoint.
+    """
+
+    def __init__(self, capacity=INITIAL_SLOTS):
+        self.slots = {}
+        self.keys = []           # (participant_id, submitted_by) per slot
+        self.recent = np.full((capacity, RECENT), np.nan)
+        self.recent_pos = np.zeros(capacity, dtype=np.int64)
+        self.consecutive = np.zeros(capacity, dtype=np.int64)
+        self.ewma = np.full(capacity, np.nan)
+        self.sessions = np.zeros(capacity, dtype=np.int64)
+        self.last_session = np.full(capacity, -1, dtype=np.int64)
+        self.source_offset = 0   # bytes of silver consumed (--follow)
+
+    def _grow(self, needed):
+        capacity = len(self.ewma)
+        if needed <= capacity:
+            return
+        new = max(needed, 2 * capacity)
+        pad = new - capacity
+        self.recent = np.vstack([self.recent, np.full((pad, RECENT), np.nan)])
+        self.recent_pos = np.r_[self.recent_pos, np.zeros(pad, dtype=np.int64)]
+        self.consecutive = np.r_[self.consecutive, np.zeros(pad, dtype=np.int64)]
+        self.ewma = np.r_[self.ewma, np.full(pad, np.nan)]
+        self.sessions = np.r_[self.sessions, np.zeros(pad, dtype=np.int64)]
+        self.last_session = np.r_[self.last_session, np.full(pad, -1, dtype=np.int64)]
+
+    @property
+    def participants(self):
+        return sorted({pid for pid, _ in self.keys}, key=str)
+
+    def slot_of(self, participant_ids, raters):
+        """ Slot index for every (participant, rater) row (new pairs get fresh slots). """
+        codes, unique_keys = pd.factorize(pd.Series(list(zip(participant_ids, raters))))
+        for key in unique_keys:
+            if key not in self.slots:
+                self.slots[key] = len(self.keys)
+                self.keys.append(key)
+        self._grow(len(self.keys))
+        return np.array([self.slots[key] for key in unique_keys], dtype=np.int64)[codes]
+
+    def save(self, path=STATE_FILE):
+        tmp_path = f"{path}.tmp.npz"
+        n = len(self.keys)
+        pids, raters = np.empty(n, dtype=object), np.empty(n, dtype=object)
+        pids[:], raters[:] = [k[0] for k in self.keys], [k[1] for k in self.keys]
+        np.savez(tmp_path, format=STATE_FORMAT, participants=pids, raters=raters, recent=self.recent[:n],
+                 recent_pos=self.recent_pos[:n], consecutive=self.consecutive[:n], ewma=self.ewma[:n],
+                 sessions=self.sessions[:n], last_session=self.last_session[:n], source_offset=self.source_offset)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=STATE_FILE):
+        """ The checkpointed state, or a fresh one (source_offset 0) if there is none in this format. """
+        state = cls()
+        if not os.path.exists(path):
+            return state
+        with np.load(path, allow_pickle=True) as saved:
+            if 'format' not in saved or int(saved['format']) != STATE_FORMAT:
+                return state
+            state.keys = list(zip(saved['participants'].tolist(), saved['raters'].tolist()))
+            state.slots = {key: i for i, key in enumerate(state.keys)}
+            state._grow(len(state.keys))
+            n = len(state.keys)
+            for name in ('recent', 'recent_pos', 'consecutive', 'ewma', 'sessions', 'last_session'):
+                getattr(state, name)[:n] = saved[name]
+            state.source_offset = int(saved['source_offset'])
+        return state
+
+
+class DistressAlertEngine:
+    """
+        engine = DistressAlertEngine()
+        alerts = engine.process(new_rows)     # DataFrame of alerts raised by these rows
+    """
+
+    def __init__(self, state=None):
+        self.state = state or DistressState()
+
+    def process(self, rows):
+        """ Applies rows (in arrival order) to the state and returns the alerts they raise. """
+        if len(rows) == 0:
+            return pd.DataFrame(columns=ALERT_COLUMNS)
+        st = self.state
+        raters = (rows['submitted_by'].fillna('').astype(str).to_numpy() if 'submitted_by' in rows.columns
+                  else np.full(len(rows), ''))
+        slots = st.slot_of(rows['participant_id'].to_numpy(), raters)
+        session = pd.to_numeric(rows['session_number'], errors='coerce').fillna(-1).to_numpy(dtype=np.int64)
+        distress = pd.to_numeric(rows[DISTRESS_COL], errors='coerce').to_numpy(dtype=float)
+        engagement = (pd.to_numeric(rows[ENGAGEMENT_COL], errors='coerce').to_numpy(dtype=float)
+                      if ENGAGEMENT_COL in rows.columns else np.full(len(rows), np.nan))
+
+        # Wave k = the k-th row of each slot in this batch
+        wave = pd.Series(slots).groupby(slots).cumcount().to_numpy()
+        consecutive = np.zeros(len(rows), dtype=np.int64)
+        recent_mean = np.full(len(rows), np.nan)
+        ewma_before = np.full(len(rows), np.nan)
+        history = np.zeros(len(rows), dtype=np.int64)
+
+        order = np.argsort(wave, kind='stable')
+        bounds = np.searchsorted(wave[order], np.arange(wave.max() + 2))
+        for k in range(wave.max() + 1):
+            idx = order[bounds[k]:bounds[k + 1]]
+            s, d, e = slots[idx], distress[idx], engagement[idx]
+            # A session this rater already submitted (a re-send) reads the state but does not advance it
+            fresh = session[idx] != st.last_session[s]
+            seen = fresh & ~np.isnan(d)
+
+            st.consecutive[s] = np.where(seen, np.where(d >= HIGH_DISTRESS, st.consecutive[s] + 1, 0), st.consecutive[s])
+            st.recent[s[seen], st.recent_pos[s[seen]] % RECENT] = d[seen]
+            st.recent_pos[s[seen]] += 1
+
+            ewma_before[idx] = st.ewma[s]
+            history[idx] = st.sessions[s]
+            has_e = fresh & ~np.isnan(e)
+            st.ewma[s] = np.where(has_e, np.where(np.isnan(st.ewma[s]), e, EWMA_ALPHA * e + (1 - EWMA_ALPHA) * st.ewma[s]),
+                                  st.ewma[s])
+            st.sessions[s] += fresh
+            st.last_session[s] = session[idx]
+
+            consecutive[idx] = st.consecutive[s]
+            recent = st.recent[s]
+            counts = (~np.isnan(recent)).sum(axis=1)
+            recent_mean[idx] = np.where(counts > 0, np.nansum(recent, axis=1) / np.maximum(counts, 1), np.nan)
+
+        return self._alerts(rows, distress, engagement, consecutive, recent_mean, ewma_before, history)
+
+    def _alerts(self, rows, distress, engagement, consecutive, recent_mean, ewma_before, history):
+        high = distress >= HIGH_DISTRESS
+        repeated = consecutive >= CONSECUTIVE_ALERT
+        with np.errstate(invalid='ignore'):
+            dropped = (history >= MIN_HISTORY) & (engagement < ewma_before - ENGAGEMENT_DROP)
+
+        kinds = [(repeated, 'Repeated high distress', 'High'),
+                 (high & ~repeated, 'High distress', 'Medium'),
+                 (dropped, 'Engagement drop', 'Low')]
+        frames = []
+        for mask, alert, severity in kinds:
+            idx = np.flatnonzero(mask)
+            if len(idx) == 0:
+                continue
+            picked = rows.iloc[idx]
+            frames.append(pd.DataFrame({
+                'participant_id': picked['participant_id'].to_numpy(),
+                'session_number': picked['session_number'].to_numpy(),
+                'session_date': picked['session_date'].to_numpy() if 'session_date' in rows.columns else None,
+                'submitted_by': picked['submitted_by'].to_numpy() if 'submitted_by' in rows.columns else None,
+                'Alert': alert, 'Severity': severity,
+                'Distress': distress[idx], 'Consecutive_High': consecutive[idx],
+                'Recent_Distress_Mean': np.round(recent_mean[idx], 2),
+                'Engagement': engagement[idx], 'Engagement_EWMA': np.round(ewma_before[idx], 2),
+                '_order': idx
+            }))
+        if not frames:
+            return pd.DataFrame(columns=ALERT_COLUMNS)
+        alerts = pd.concat(frames, ignore_index=True).sort_values('_order', kind='stable').drop(columns='_order')
+        alerts['Detected_At'] = datetime.now().isoformat(timespec='seconds')
+        return alerts[ALERT_COLUMNS].reset_index(drop=True)
+
+
+# --- SOURCES ---
+
+def read_appended(path, offset):
+    """
+    Rows appended to a CSV since byte offset (header re-read from the top).
+    Only whole records are consumed; returns (rows, new offset).
+    """
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(max(offset, len(header)))
+        chunk = f.read()
+    # Cut at the last newline outside a quoted field so a half-written record waits for the next poll
+    end = len(chunk)
+    while end > 0:
+        end = chunk.rfind(b'\n', 0, end)
+        if end < 0 or chunk[:end].count(b'"') % 2 == 0:
+            break
+    if end <= 0:
+        return pd.DataFrame(columns=INPUT_COLUMNS), max(offset, len(header))
+    rows = pd.read_csv(io.BytesIO(header + chunk[:end + 1]), usecols=lambda c: c in INPUT_COLUMNS)
+    return rows, max(offset, len(header)) + end + 1
+
+
+def append_alerts(alerts, path=ALERTS_FILE):
+    if alerts.empty:
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    alerts.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+
+
+def print_alerts(alerts):
+    icons = {'High': '🚨', 'Medium': '⚠️', 'Low': '🔻'}
+    for row in alerts.itertuples(index=False):
+        print(f"   {icons[row.Severity]} {row.Alert}: participant {row.participant_id}, session {row.session_number}, "
+              f"rater {row.submitted_by} (distress {row.Distress:g}, {row.Consecutive_High} high in a row)")
+
+
+# --- MODES ---
+
+def replay(df=None, path=data_store.SILVER_FILE):
+    """
+    Backtest: runs every silver row through a fresh engine in session order, rewrites the
+    alerts file and checkpoints the state (so --follow carries on from the end of silver).
+    """
+    print("🚨 Replaying silver through the distress early-warning engine...")
+    run = RunLogger('distress_alerts')
+    if df is None:
+        with run.span('load') as span:
+            df = pd.read_csv(path, usecols=lambda c: c in INPUT_COLUMNS)
+            span.rows = len(df)
+
+    engine = DistressAlertEngine()
+    with run.span('replay', rows=len(df)) as span:
+        ordered = df.sort_values(SESSION_KEY, kind='stable')
+        alerts = engine.process(ordered)
+        span.rows = len(alerts)
+    engine.state.source_offset = os.path.getsize(path) if os.path.exists(path) else 0
+
+    with run.span('save', rows=len(alerts)):
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        alerts.to_csv(ALERTS_FILE, index=False)
+        engine.state.save()
+
+    counts = alerts['Alert'].value_counts()
+    print(f"   - {len(engine.state.participants)} participants, {len(df)} rows, "
+          + (", ".join(f"{n} {a.lower()}" for a, n in counts.items()) or "no alerts") + ".")
+    print(f"✅ DONE! Alerts saved to: {ALERTS_FILE}")
+    run.finish()
+    return alerts
+
+
+def follow(path=data_store.SILVER_FILE, poll_s=POLL_S, max_polls=None):
+    """
+    Tails silver: every poll, rows appended since the checkpointed offset are scored and
+    their alerts printed and appended to the alerts file. Starts from a replay when there
+    is no checkpoint or silver was rewritten (shorter than the checkpoint).
+    """
+    state = DistressState.load()
+    if not state.source_offset or os.path.getsize(path) < state.source_offset:
+        print("   ↩️ No usable checkpoint for this silver file; replaying history first.")
+        replay(path=path)
+        state = DistressState.load()
+
+    engine = DistressAlertEngine(state)
+    print(f"👀 Watching {path} for new sessions (Ctrl+C to stop)...")
+    polls = 0
+    try:
+        while max_polls is None or polls < max_polls:
+            polls += 1
+            if os.path.getsize(path) > state.source_offset:
+                rows, state.source_offset = read_appended(path, state.source_offset)
+                alerts = engine.process(rows)
+                print_alerts(alerts)
+                append_alerts(alerts)
+                state.save()
+            time.sleep(poll_s)
+    except KeyboardInterrupt:
+        pass
+    state.save()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming distress early warning over cleaned session rows.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--replay', action='store_true', help="Backtest over all of silver and rebuild the state (default)")
+    mode.add_argument('--follow', action='store_true', help="Tail rows appended to silver and alert as they arrive")
+    parser.add_argument('--silver', default=data_store.SILVER_FILE, help="Cleaned silver CSV to read")
+    args = parser.parse_args()
+    if args.follow:
+        follow(args.silver)
+    else:
+        replay(path=args.silver)
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from analytics_service import Dataset
+from silver_dedup import SESSION_KEY, RATERS
+
+# =========================================================
+# GLOBAL FILTER ENGINE
+# The silver table is indexed once per data version (categorical codes per
+# filter column + parsed session dates). A filter combination is then a few
+# array lookups, and the resulting view is LRU-cached, so every page under
+# the same filter reuses the same rows and the same memoized metrics.
+# =========================================================
+
+# Filter key -> candidate silver columns (first one present wins)
+FILTER_COLUMNS = {
+    'therapist': ['therapist_parent_name'],
+    'diagnosis': ['diagnosis', 'Co-existing disability diagnosed details'],
+    'theme': ['Theme_specific_situation']
+}
+DATE_COLUMN = 'session_date'
+VIEW_CACHE_SIZE = 32
+
+
+class FilterIndex:
+    """ Categorical codes and day numbers for the filterable silver columns. """
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self.columns, self.codes, self.categories = {}, {}, {}
+        for key, candidates in FILTER_COLUMNS.items():
+            col = next((c for c in candidates if c in df.columns), None)
+            if col is None:
+                continue
+            cat = pd.Categorical(df[col])
+            self.columns[key] = col
+            self.codes[key] = cat.codes  # -1 = missing
+            self.categories[key] = list(cat.categories)
+
+        self.days = None
+        if DATE_COLUMN in df.columns:
+            dates = pd.to_datetime(df[DATE_COLUMN], dayfirst=True, errors='coerce')
+            self.days = dates.to_numpy(dtype='datetime64[D]')
+
+    def date_bounds(self):
+        if self.days is None or np.isnat(self.days).all():
+            return None
+        valid = self.days[~np.isnat(self.days)]
+        return valid.min().astype(object), valid.max().astype(object)
+
+    def mask(self, key):
+        """ Boolean row mask for a normalised filter key (see make_filter_key). """
+        mask = np.ones(self.n_rows, dtype=bool)
+        for name, value in key:
+            if name == 'date' and self.days is not None:
+                start, end = np.datetime64(value[0], 'D'), np.datetime64(value[1], 'D')
+                mask &= (self.days >= start) & (self.days <= end)  # NaT compares False
+            elif name in self.codes:
+                # Lookup table over category codes; the extra last slot catches -1 (missing)
+                allowed = np.zeros(len(self.categories[name]) + 1, dtype=bool)
+                lookup = {c: i for i, c in enumerate(self.categories[name])}
+                allowed[[lookup[v] for v in value if v in lookup]] = True
+                mask &= allowed[self.codes[name]]
+        return mask
+
+
+def make_filter_key(date_range=None, **selections):
+    """
+    Normalises sidebar selections into a hashable key.
+    Empty selections mean 'all' and are dropped, so equivalent filters share a cache slot.
+    """
+    key = []
+    if date_range:
+        key.append(('date', (str(date_range[0]), str(date_range[1]))))
+    for name in sorted(selections):
+        if selections[name]:
+            key.append((name, tuple(sorted(selections[name]))))
+    return tuple(key)
+
+
+@lru_cache(maxsize=4)
+def filter_index(ds):
+    """ One index per data version """
+    return FilterIndex(ds.df)
+
+
+def sessions_in_view(table, in_view):
+    """ Rows of a session-keyed table whose (participant_id, session_number) is in view. """
+    if table.empty or not set(SESSION_KEY) <= set(table.columns):
+        return table
+    keys = pd.MultiIndex.from_frame(table[SESSION_KEY])
+    return table[keys.isin(in_view)]
+
+
+def pairs_in_view(pairs, df, in_view):
+    """ P/T pairs for the sessions in view, with a rater's columns blanked where that rater's row is filtered out. """
+    pairs = sessions_in_view(pairs, in_view)
+    if pairs.empty or 'submitted_by' not in df.columns or 'Paired' not in pairs.columns:
+        return pairs
+    keys = pd.MultiIndex.from_frame(pairs[SESSION_KEY])
+    seen = {r: keys.isin(pd.MultiIndex.from_frame(df.loc[df['submitted_by'] == r, SESSION_KEY])) for r in RATERS}
+    if all(s.all() for s in seen.values()):
+        return pairs
+    pairs = pairs.copy()
+    for rater, s in seen.items():
+        pairs.loc[~s, [c for c in pairs.columns if c.endswith(f"_{rater}")]] = np.nan
+    pairs['Paired'] = pairs['Paired'].astype(bool) & np.logical_and.reduce(list(seen.values()))
+    return pairs
+
+
+@lru_cache(maxsize=VIEW_CACHE_SIZE)
+def filtered_dataset(ds, key):
+    """
+    Returns a lightweight Dataset view for a filter key.
+    Silver rows are taken by position; NLP, session, P/T pair, rolling time-series and alert rows are kept for the sessions in view.
+    Gold statistical answers, distinctive terms, correlations, reliability and trajectory models are whole-cohort results and are passed through.
+    """
+    if not key:
+        return ds
+
+    rows = np.flatnonzero(filter_index(ds).mask(key))
+    df = ds.df.iloc[rows]
+
+    in_view = pd.MultiIndex.from_frame(df[SESSION_KEY])
+    nlp, sessions = sessions_in_view(ds.nlp, in_view), sessions_in_view(ds.sessions, in_view)
+    timeseries, alerts = sessions_in_view(ds.timeseries, in_view), sessions_in_view(ds.alerts, in_view)
+    pairs = pairs_in_view(ds.pairs, df, in_view)
+
+    tables = {'df': df, 'sessions': sessions, 'pairs': pairs, 'stats': ds.stats, 'nlp': nlp,
+              'keywords': ds.keywords, 'terms': ds.terms, 'correlations': ds.correlations, 'reliability': ds.reliability,
+              'trajectories': ds.trajectories, 'trajectory_participants': ds.trajectory_participants,
+              'timeseries': timeseries, 'alerts': alerts}
+    return Dataset(tables, f"{ds.version}#{key}")
+
+
+def clear_caches():
+    """ Drops the cached indexes and views of older data versions. """
+    filter_index.cache_clear()
+    filtered_dataset.cache_clear()
@@ -0,0 +1,213 @@
+import os
+import sys
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# DATAFRAME BACKENDS (cleaning transforms + silver scans)
+# 'pandas' is the reference: the eager code in data_cleaning.py, which
+# parses the response-time and percentage strings with one Python call
+# per row. 'polars' runs the same steps as one lazy, multi-threaded query
+# (vectorised regex instead of per-row calls), and scans silver lazily so
+# only the requested columns (projection pushdown) and rows (predicate
+# pushdown) are read from the CSV / Parquet file.
+# Both hand pandas frames back, so validation, dedup and the gold engines
+# do not change. Choose with FRAME_BACKEND=polars or --backend polars;
+# `python frame_backend.py --parity` checks both give the same silver and
+# the same gold answers.
+# =========================================================
+
+BACKENDS = ('pandas', 'polars')
+BACKEND_ENV = 'FRAME_BACKEND'
+
+# First number in a response-time string, as in data_cleaning.clean_response_time
+NUMBER_PATTERN = r"([-+]?\d*\.\d+|\d+)"
+# Filter operators accepted by scan_silver (the pandas/pyarrow read_parquet `filters` convention)
+FILTER_OPS = ('==', '!=', '<', '<=', '>', '>=', 'in', 'not in')
+
+
+def resolve(backend=None):
+    """ Backend name: the argument, else $FRAME_BACKEND, else pandas. """
+    backend = backend or os.environ.get(BACKEND_ENV) or 'pandas'
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}' (choose from {', '.join(BACKENDS)})")
+    return backend
+
+
+def _polars():
+    try:
+        import polars as pl
+    except ImportError:
+        raise ImportError("The polars backend needs polars: pip install polars")
+    return pl
+
+
+# --- CLEANING (steps 3-4 of data_cleaning.clean_and_validate) ---
+
+def _to_polars(pl, series):
+    """ One bronze column as a polars Series; non-numeric columns go as text (str() per value, like the pandas parsers). """
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return pl.from_pandas(series)
+    return pl.from_pandas(series.astype('string'))
+
+
+def parse_bronze_polars(df, mapping):
+    """
+    Parses Q15 response times and success percentages and maps the questionnaire
+    columns to numeric, all in one lazy query. Same contract as the pandas steps:
+    returns (df with the parsed / mapped columns set, {silver column: raw bronze Series}).
+    """
+    pl = _polars()
+    mapped = {source: target for source, target in mapping.items() if source in df.columns}
+    sources = list(dict.fromkeys([c for c in ('response_time_min_Q15', 'success_percentage') if c in df.columns] + list(mapped)))
+    frame = pl.DataFrame([_to_polars(pl, df[c]).alias(c) for c in sources]).lazy()
+
+    exprs = []
+    if 'response_time_min_Q15' in df.columns:
+        text = pl.col('response_time_min_Q15').cast(pl.Utf8).str.to_lowercase()
+        number = text.str.extract(NUMBER_PATTERN, 1).cast(pl.Float64)
+        exprs.append(pl.when(text.str.contains('minute', literal=True)).then(number * 60).otherwise(number)
+                     .alias('Q15_Response_Time_Seconds'))
+    else:
+        print("⚠️ Warning: 'response_time_min_Q15' column missing!")
+    if 'success_percentage' in df.columns:
+        exprs.append(pl.col('success_percentage').cast(pl.Utf8).str.replace_all('%', '', literal=True)
+                     .str.strip_chars().cast(pl.Float64, strict=False).alias('Success_Rate_Numeric'))
+
+    # pd.to_numeric(errors='coerce'): numeric columns keep their dtype, text becomes float (junk -> null)
+    schema = frame.collect_schema()
+    for source, target in mapped.items():
+        column = pl.col(source)
+        exprs.append((column if schema[source].is_numeric() else column.cast(pl.Float64, strict=False)).alias(target))
+
+    parsed = frame.select(exprs).collect().to_pandas()
+    parsed.index = df.index
+
+    raw = {target: df[source] for source, target in mapped.items()}
+    for column in parsed.columns:
+        df[column] = parsed[column]
+    return df, raw
+
+
+# --- SILVER SCANS ---
+
+def _pandas_filter(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, value in filters:
+        col = df[column]
+        if op in ('in', 'not in'):
+            hit = col.isin(list(value)).to_numpy()
+            mask &= hit if op == 'in' else ~hit
+        else:
+            mask &= {'==': col.eq, '!=': col.ne, '<': col.lt, '<=': col.le, '>': col.gt, '>=': col.ge}[op](value).to_numpy()
+    return df[mask].reset_index(drop=True)
+
+
+def _polars_filter(pl, filters):
+    predicate = pl.lit(True)
+    for column, op, value in filters:
+        col = pl.col(column)
+        if op in ('in', 'not in'):
+            hit = col.is_in(list(value))
+            predicate &= hit if op == 'in' else ~hit
+        else:
+            predicate &= {'==': col.__eq__, '!=': col.__ne__, '<': col.__lt__, '<=': col.__le__,
+                          '>': col.__gt__, '>=': col.__ge__}[op](value)
+    return predicate
+
+
+def scan_silver(path, columns=None, filters=None, backend=None):
+    """
+    Reads a silver CSV / Parquet file as a pandas frame, keeping only `columns`
+    (those that exist) and the rows matching `filters` [(column, op, value), ...].
+    pandas reads the columns then masks; polars pushes both into the scan.
+    """
+    backend, filters = resolve(backend), list(filters or [])
+    for _, op, _ in filters:
+        if op not in FILTER_OPS:
+            raise ValueError(f"Unsupported filter operator '{op}'")
+    parquet = path.lower().endswith('.parquet')
+
+    if backend == 'pandas':
+        wanted = None if columns is None else set(columns) | {c for c, _, _ in filters}
+        if parquet:
+            import pyarrow.parquet as pq
+            names = pq.read_schema(path).names
+            df = pd.read_parquet(path, columns=None if wanted is None else [c for c in names if c in wanted])
+        else:
+            df = pd.read_csv(path, usecols=None if wanted is None else (lambda c: c in wanted))
+        df = _pandas_filter(df, filters) if filters else df
+        return df if columns is None else df[[c for c in columns if c in df.columns]]
+
+    pl = _polars()
+    # Full-file type inference, so a column typed from its first rows cannot fail later on
+    frame = pl.scan_parquet(path) if parquet else pl.scan_csv(path, infer_schema_length=None)
+    if filters:
+        frame = frame.filter(_polars_filter(pl, filters))
+    if columns is not None:
+        names = frame.collect_schema().names()
+        frame = frame.select([c for c in columns if c in names])
+    return frame.collect().to_pandas()
+
+
+# --- PARITY CHECK ---
+
+def _compare(label, left, right, **kwargs):
+    try:
+        pd.testing.assert_frame_equal(left.reset_index(drop=True), right.reset_index(drop=True), **kwargs)
+    except AssertionError as exc:
+        print(f"   ❌ {label}: {str(exc).strip().splitlines()[0]}")
+        return False
+    print(f"   ✅ {label}")
+    return True
+
+
+def parity(bronze_path=None, n_resamples=200, seed=None):
+    """
+    Cleans the bronze file and answers the gold research queries with every
+    backend, and checks the results against the pandas reference.
+    Returns True when silver and gold match.
+    """
+    import bronze_ingest
+    import data_cleaning
+    import silver_dedup
+    import analytics_gold_stats
+
+    bronze_path = bronze_path or data_cleaning.INPUT_FILE
+    print(f"⚖️ Backend parity on {bronze_path}")
+    bronze = bronze_ingest.load_bronze(bronze_path)
+
+    silver, gold = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in BACKENDS:
+            clean = data_cleaning.clean_bronze_frame(bronze.copy(), backend=backend)
+            clean = silver_dedup.resolve_duplicates(clean)[0]
+            silver[backend] = clean
+            # Round trip through a file so the gold side goes through scan_silver too
+            path = os.path.join(tmp, f"silver_{backend}.csv")
+            clean.to_csv(path, index=False)
+            frame = scan_silver(path, analytics_gold_stats.STATS_COLUMNS, backend=backend)
+            gold[backend] = analytics_gold_stats.compute_statistical_answers(
+                frame, None, n_resamples, seed, silver_dedup.canonical_sessions(clean))
+
+    ok = True
+    for backend in BACKENDS[1:]:
+        print(f"   {backend} vs pandas ({len(silver[backend])} silver rows):")
+        # Values must match; text columns may come back as object instead of str
+        ok &= _compare('silver', silver['pandas'], silver[backend], check_dtype=False)
+        ok &= _compare('gold statistical answers', gold['pandas'], gold[backend], check_dtype=False, rtol=1e-9)
+    print("✅ Backends agree." if ok else "❌ Backends disagree.")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dataframe backends for cleaning and silver scans.")
+    parser.add_argument('--parity', action='store_true', help="Compare silver and gold outputs across backends")
+    parser.add_argument('--bronze', default=None, help="Bronze .csv/.xlsx to clean (default: the pipeline input)")
+    parser.add_argument('--resamples', type=int, default=200, help="Bootstrap/permutation resamples for the gold answers")
+    args = parser.parse_args()
+    if args.parity:
+        sys.exit(0 if parity(args.bronze, args.resamples) else 1)
+    parser.print_help()
@@ -0,0 +1,293 @@
+import io
+import os
+import json
+import time
+import shutil
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import numpy as np
+import pandas as pd
+import data_store
+import data_cleaning
+import silver_dedup
+import distress_alerts
+import analytics_gold_nlp
+import analytics_gold_rolling
+import analytics_gold_reliability
+from instrumentation import RunLogger
+
+# =========================================================
+# LIVE SESSION INGESTION
+# A long-running process that keeps silver and the session-level gold
+# tables in memory and accepts new session records in the bronze layout,
+# over HTTP or through a watched drop folder. For each batch it:
+#   1. cleans + validates the rows with data_cleaning (rejects are returned)
+#   2. dedups them against the existing submissions of the same sessions
+#   3. appends them to silver (rewrites only if a resend supersedes a row)
+#   4. recomputes the session / P-T pair rows of the touched sessions, the
+#      rolling series of the touched participants and P/T reliability, and
+#      feeds the rows to the distress early-warning engine
+#   5. bumps data_store's version token so open dashboards reload
+# Statistical answers, correlations, trajectories and NLP stay batch-only
+# (run_pipeline.py); they pick the new rows up on the next pipeline run.
+#
+#   python ingest_service.py --port 8765
+#       curl -X POST --data-binary @new_sessions.csv -H 'Content-Type: text/csv' localhost:8765/sessions
+#       curl -X POST -d '[{"participant_id": 113, ...}]' -H 'Content-Type: application/json' localhost:8765/sessions
+#   python ingest_service.py --watch data/bronze/incoming
+# =========================================================
+
+DEFAULT_PORT = 8765
+POLL_S = 1.0
+DROP_SUFFIXES = ('.csv', '.json')
+MAX_BODY_BYTES = 16 << 20
+
+
+def write_atomic(df, path):
+    """ Writes a CSV via a temp file + rename so readers never see a half-written table. """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def splice(table, fresh, key_columns, keys):
+    """ table with the rows whose key_columns are in keys replaced by fresh, sorted by key_columns. """
+    if table.empty:
+        return fresh.reset_index(drop=True)
+    current = pd.MultiIndex.from_frame(table[key_columns]) if len(key_columns) > 1 else pd.Index(table[key_columns[0]])
+    kept = table[~current.isin(keys)]
+    merged = pd.concat([kept, fresh], ignore_index=True) if len(fresh) else kept
+    return merged.sort_values(key_columns, kind='stable').reset_index(drop=True)
+
+
+def match_dtypes(new, silver):
+    """ Casts new rows to silver's numeric dtypes where the values allow it, so appended rows read back the same. """
+    for column in silver.columns:
+        dtype = silver[column].dtype
+        if not pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+            continue
+        values = pd.to_numeric(new[column], errors='coerce')
+        if pd.api.types.is_integer_dtype(dtype) and values.notna().all() and (values % 1 == 0).all():
+            values = values.astype(dtype)
+        new[column] = values
+    return new
+
+
+def records_to_bronze(body, content_type):
+    """ Bronze frame from a request body: CSV text or a JSON object / list of objects. """
+    if 'json' in (content_type or ''):
+        records = json.loads(body)
+        return pd.DataFrame([records] if isinstance(records, dict) else records)
+    return pd.read_csv(io.BytesIO(body))
+
+
+class IngestionService:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        run = RunLogger('ingest_startup', log_file=False)
+        with run.span('load_silver') as span:
+            self.silver = pd.read_csv(data_store.SILVER_FILE)
+            span.rows = len(self.silver)
+        self.sessions = self._read(silver_dedup.SESSIONS_FILE)
+        self.pairs = self._read(silver_dedup.PAIRS_FILE)
+        self.timeseries = self._read(analytics_gold_rolling.OUTPUT_FILE)
+        self.nlp = self._read(analytics_gold_nlp.SENTIMENT_FILE, usecols=lambda c: c != 'Master_Text')
+
+        # The alert checkpoint must end exactly where silver does, else rebuild it from history
+        state = distress_alerts.DistressState.load()
+        if state.source_offset != os.path.getsize(data_store.SILVER_FILE):
+            distress_alerts.replay(self.silver)
+            state = distress_alerts.DistressState.load()
+        self.alerts = distress_alerts.DistressAlertEngine(state)
+        print(f"📥 Ingestion service ready: {len(self.silver)} silver rows, {len(self.sessions)} sessions.")
+
+    @staticmethod
+    def _read(path, **kwargs):
+        return pd.read_csv(path, **kwargs) if os.path.exists(path) else pd.DataFrame()
+
+    # --- INGEST ---
+
+    def ingest(self, bronze):
+        """ Cleans, appends and propagates one batch of bronze rows. Returns a summary dict. """
+        with self.lock:
+            return self._ingest(bronze)
+
+    def _ingest(self, bronze):
+        run = RunLogger('ingest')
+        started = time.perf_counter()
+
+        # 1. CLEAN + VALIDATE
+        new, quarantine, _ = data_cleaning.clean_and_validate(bronze.copy(), run)
+        rejected = [{'row': int(i), 'rules': rules} for i, rules in quarantine['quarantine_rules'].items()] \
+            if len(quarantine) else []
+        new = match_dtypes(new.reindex(columns=self.silver.columns), self.silver)
+        new = new.dropna(subset=silver_dedup.SESSION_KEY)
+        if new.empty:
+            run.finish()
+            return {'accepted': 0, 'rejected': rejected, 'duplicates': 0, 'superseded': 0, 'alerts': [], 'version': None}
+
+        # 2. DEDUP AGAINST THE SAME SESSIONS (later submissions supersede earlier ones)
+        with run.span('dedup', rows=len(new)) as span:
+            keys = pd.MultiIndex.from_frame(new[silver_dedup.SESSION_KEY]).unique()
+            existing_mask = pd.MultiIndex.from_frame(self.silver[silver_dedup.SESSION_KEY]).isin(keys)
+            existing = self.silver[existing_mask]
+            new.index = np.arange(len(self.silver), len(self.silver) + len(new))
+            kept, dropped = silver_dedup.resolve_duplicates(pd.concat([existing, new]), run)
+            superseded = existing.index.difference(kept.index)
+            new = new.loc[new.index.intersection(kept.index)]
+            # Corrections of a submission already seen don't count as another session for the alert state
+            seen = pd.MultiIndex.from_frame(existing[silver_dedup.SUBMISSION_KEY])
+            first_seen = ~pd.MultiIndex.from_frame(new[silver_dedup.SUBMISSION_KEY]).isin(seen)
+            span.rows = len(new)
+        if new.empty:
+            run.finish()
+            return {'accepted': 0, 'rejected': rejected, 'duplicates': int(len(dropped)), 'superseded': 0,
+                    'alerts': [], 'version': None}
+
+        # 3. APPEND TO SILVER
+        with run.span('append_silver', rows=len(new)):
+            if len(superseded):
+                self.silver = pd.concat([self.silver.drop(index=superseded), new], ignore_index=True)
+                write_atomic(self.silver, data_store.SILVER_FILE)
+            elif len(new):
+                # One write of whole records, so a tailing reader never sees half a row
+                with open(data_store.SILVER_FILE, 'a', newline='') as f:
+                    f.write(new.to_csv(index=False, header=False))
+                self.silver = pd.concat([self.silver, new], ignore_index=True)
+
+        # 4. SESSION-LEVEL GOLD FOR THE TOUCHED SESSIONS / PARTICIPANTS
+        touched = self.silver[pd.MultiIndex.from_frame(self.silver[silver_dedup.SESSION_KEY]).isin(keys)]
+        with run.span('session_tables', rows=len(touched)):
+            self.sessions = splice(self.sessions, silver_dedup.canonical_sessions(touched), silver_dedup.SESSION_KEY, keys)
+            self.pairs = splice(self.pairs, silver_dedup.pt_pairs(touched), silver_dedup.SESSION_KEY, keys)
+            write_atomic(self.sessions, silver_dedup.SESSIONS_FILE)
+            write_atomic(self.pairs, silver_dedup.PAIRS_FILE)
+
+        with run.span('reliability', rows=len(self.pairs)):
+            write_atomic(analytics_gold_reliability.compute_reliability(self.pairs, run), analytics_gold_reliability.OUTPUT_FILE)
+
+        participants = pd.Index(keys.get_level_values('participant_id').unique())
+        with run.span('rolling', rows=len(participants)):
+            mine = self.sessions[self.sessions['participant_id'].isin(participants)]
+            fresh = analytics_gold_rolling.compute_rolling(analytics_gold_rolling.metric_frame(mine, self.nlp), run=run)
+            self.timeseries = splice(self.timeseries, fresh, ['participant_id'], participants)
+            write_atomic(self.timeseries, analytics_gold_rolling.OUTPUT_FILE)
+
+        with run.span('alerts', rows=len(new)) as span:
+            alerts = self.alerts.process(new[first_seen].sort_values(silver_dedup.SESSION_KEY, kind='stable'))
+            distress_alerts.append_alerts(alerts)
+            self.alerts.state.source_offset = os.path.getsize(data_store.SILVER_FILE)
+            self.alerts.state.save()
+            span.rows = len(alerts)
+
+        # 5. TELL THE DASHBOARDS
+        version = data_store.bump_version()
+        run.finish()
+        print(f"   ✅ Ingested {len(new)} row(s) ({len(dropped)} duplicate, {len(rejected)} rejected, "
+              f"{len(alerts)} alert(s)) in {time.perf_counter() - started:.2f}s -> version {version}")
+        distress_alerts.print_alerts(alerts)
+        return {'accepted': int(len(new)), 'rejected': rejected, 'duplicates': int(len(dropped)),
+                'superseded': int(len(superseded)),
+                'alerts': json.loads(alerts.to_json(orient='records')), 'version': version}
+
+
+# --- HTTP ---
+
+def make_handler(service):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path.rstrip('/') != '/health':
+                return self._send(404, {'error': 'not found'})
+            self._send(200, {'status': 'ok', 'silver_rows': len(service.silver), 'version': data_store.data_version()})
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/sessions':
+                return self._send(404, {'error': 'not found'})
+            length = int(self.headers.get('Content-Length') or 0)
+            if not 0 < length <= MAX_BODY_BYTES:
+                return self._send(413 if length else 400, {'error': 'body must be 1 byte to 16 MB'})
+            try:
+                bronze = records_to_bronze(self.rfile.read(length), self.headers.get('Content-Type'))
+            except (ValueError, pd.errors.ParserError) as exc:
+                return self._send(400, {'error': f"unreadable body: {exc}"})
+            if 'participant_id' not in bronze.columns:
+                return self._send(422, {'error': "records need a 'participant_id' (bronze layout)"})
+            try:
+                summary = service.ingest(bronze)
+            except Exception as exc:
+                print(f"❌ Ingestion failed: {exc}")
+                return self._send(500, {'error': str(exc)})
+            # A resend of known submissions is a no-op, not an error
+            self._send(200 if summary['accepted'] or summary['duplicates'] else 422, summary)
+
+        def log_message(self, format, *args):
+            pass  # The service prints one line per ingested batch instead
+
+    return Handler
+
+
+def serve(port=DEFAULT_PORT, host='127.0.0.1'):
+    service = IngestionService()
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"🌐 Listening on http://{host}:{port}  (POST /sessions, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# --- DROP FOLDER ---
+
+def watch(folder, poll_s=POLL_S, max_polls=None):
+    """ Ingests every .csv / .json dropped into folder, then moves it to processed/ (or failed/). """
+    service = IngestionService()
+    for sub in ('processed', 'failed'):
+        os.makedirs(os.path.join(folder, sub), exist_ok=True)
+    print(f"👀 Watching {folder} for bronze drops (Ctrl+C to stop)...")
+    polls = 0
+    try:
+        while max_polls is None or polls < max_polls:
+            polls += 1
+            for name in sorted(os.listdir(folder)):
+                path = os.path.join(folder, name)
+                if not name.lower().endswith(DROP_SUFFIXES) or not os.path.isfile(path):
+                    continue
+                try:
+                    with open(path, 'rb') as f:
+                        bronze = records_to_bronze(f.read(), 'json' if name.lower().endswith('.json') else 'csv')
+                    service.ingest(bronze)
+                    outcome = 'processed'
+                except Exception as exc:
+                    print(f"❌ {name}: {exc}")
+                    outcome = 'failed'
+                shutil.move(path, os.path.join(folder, outcome, name))
+            time.sleep(poll_s)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live ingestion of bronze session records into silver + session-level gold.")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="HTTP port (default 8765)")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to bind (default localhost only)")
+    parser.add_argument('--watch', default=None, help="Drop folder to poll instead of serving HTTP")
+    args = parser.parse_args()
+    if args.watch:
+        watch(args.watch)
+    else:
+        serve(args.port, args.host)
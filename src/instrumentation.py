@@ -0,0 +1,142 @@
+import os
+import sys
+import json
+import time
+import uuid
+import cProfile
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource  # Not available on Windows
+except ImportError:
+    resource = None
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOG_DIR = os.path.join(BASE_DIR, 'logs')
+RUN_LOG_FILE = os.path.join(LOG_DIR, 'pipeline_runs.jsonl')
+PROFILE_DIR = os.path.join(LOG_DIR, 'profiles')
+
+# Set PIPELINE_PROFILE=1 to dump a cProfile per stage, or a comma list of stage names
+PROFILE_ENV = 'PIPELINE_PROFILE'
+
+
+def peak_rss_mb():
+    """ Process high-water mark RSS in MB (None where the platform can't tell us). """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS reports bytes
+        return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+    except (ImportError, AttributeError):
+        return None
+
+
+class Span:
+    """ One timed step. Set .rows inside the with-block to record rows processed. """
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+
+
+class RunLogger:
+    """
+    Records wall time, CPU time, peak RSS and rows for each pipeline step
+    and appends one JSON line per step to logs/pipeline_runs.jsonl.
+
+        run = RunLogger('cleaning')
+        with run.span('load') as s:
+            df = pd.read_csv(...)
+            s.rows = len(df)
+        run.finish()
+    """
+
+    def __init__(self, pipeline, profile=None, log_file=None):
+        self.pipeline = pipeline
+        self.run_id = f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+        # log_file=False keeps records in memory only (benchmarks, library calls)
+        self.log_file = RUN_LOG_FILE if log_file is None else log_file
+        self.records = []
+        self._profiling = False
+        self._wall0 = time.perf_counter()
+
+        if profile is None:
+            profile = os.environ.get(PROFILE_ENV, '')
+        if profile in (True, '1', 'all'):
+            self.profile = True
+        elif profile:
+            self.profile = set(str(profile).split(','))
+        else:
+            self.profile = False
+
+    def _should_profile(self, name):
+        if self._profiling:
+            return False  # cProfile can't nest
+        return self.profile is True or (bool(self.profile) and name in self.profile)
+
+    @contextmanager
+    def span(self, name, rows=None):
+        span = Span(name)
+        span.rows = rows
+        profiler = cProfile.Profile() if self._should_profile(name) else None
+        started_at = datetime.now().isoformat(timespec='seconds')
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        if profiler:
+            self._profiling = True
+            profiler.enable()
+        try:
+            yield span
+        finally:
+            if profiler:
+                profiler.disable()
+                self._profiling = False
+            record = self._make_record(name, started_at, time.perf_counter() - wall0,
+                                       time.process_time() - cpu0, span.rows, peak_rss_mb())
+            if profiler:
+                os.makedirs(PROFILE_DIR, exist_ok=True)
+                record['profile'] = os.path.join(PROFILE_DIR, f"{self.pipeline}_{self.run_id}_{name}.prof")
+                profiler.dump_stats(record['profile'])
+            self._write(record)
+
+    def record(self, name, wall_s, cpu_s, rows=None, peak_mb=None, started_at=None):
+        """
+        Logs a step timed elsewhere, e.g. inside a worker process
+        (cpu_s / peak_mb are then the worker's, not this process's).
+        """
+        started_at = started_at or datetime.now().isoformat(timespec='seconds')
+        self._write(self._make_record(name, started_at, wall_s, cpu_s, rows, peak_mb))
+
+    def _make_record(self, name, started_at, wall_s, cpu_s, rows, peak_mb):
+        return {
+            'run_id': self.run_id,
+            'pipeline': self.pipeline,
+            'stage': name,
+            'started_at': started_at,
+            'wall_s': round(wall_s, 4),
+            'cpu_s': round(cpu_s, 4),
+            'peak_rss_mb': peak_mb,
+            'rows': rows
+        }
+
+    def _write(self, record):
+        self.records.append(record)
+        if not self.log_file:
+            return
+        os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
+        with open(self.log_file, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+
+    def finish(self):
+        """ Prints a per-stage summary, slowest first. """
+        if not self.records:
+            return
+        # Wall time since the logger was created: steps nest and overlap, so their times don't add up
+        total = time.perf_counter() - self._wall0
+        print(f"   ⏱️ {self.pipeline} run {self.run_id}: {total:.2f}s wall, {len(self.records)} steps")
+        for r in sorted(self.records, key=lambda r: r['wall_s'], reverse=True)[:5]:
+            rows = f" | {r['rows']} rows" if r['rows'] is not None else ""
+            print(f"      - {r['stage']}: {r['wall_s']:.3f}s wall, {r['cpu_s']:.3f}s cpu{rows}")
@@ -0,0 +1,95 @@
+import importlib
+import streamlit as st
+import data_store
+import filter_engine
+import analytics_service
+from analytics_service import Dataset
+
+# --- PAGE REGISTRY ---
+# Sidebar label -> page module. Every page exposes show(ds).
+# Modules are imported on first navigation only, so plotly/scipy stay
+# unloaded until a page that draws or tests something is opened.
+PAGES = {
+    "1. Executive Overview": "executive",
+    "2. Efficacy & Safety": "efficacy",
+    "3. Drivers & Mechanisms": "drivers",
+    "4. Perspective Analysis": "perspective",
+    "5. Qualitative NLP": "nlp_view",
+    "6. Participant Drill-Down": "drilldown",
+    "7. Correlation Heatmap": "correlations",
+    "8. Ad-hoc Query": "adhoc_query"
+}
+
+
+def load_page(label):
+    """ Imports (once) and returns the module behind a sidebar label. """
+    return importlib.import_module(f"{__name__}.{PAGES[label]}")
+
+
+def render_page(label, ds):
+    """ Lazily imports the page and renders it from the shared Dataset. """
+    load_page(label).show(ds)
+
+
+# --- SHARED DATA LOADER (used by both app.py and app_dashboard.py) ---
+# cache_resource hands every session the same read-only, memory-mapped frames
+# (cache_data would pickle a private copy per caller).
+# The ingest service bumps the version on every batch, so only the current and
+# previous Dataset are kept, and memoized results of older versions are dropped
+# on load (the lru_caches key on the Dataset and would otherwise pin its frames).
+@st.cache_resource(max_entries=2)
+def _load_dataset(version):
+    analytics_service.clear_caches()
+    filter_engine.clear_caches()
+    tables = data_store.load_dashboard_data()
+    return Dataset(tables, version) if tables else None
+
+
+def load_dataset():
+    """ Returns the Dataset for the current data version, or None if silver is missing. """
+    return _load_dataset(data_store.data_version())
+
+
+# --- LIVE REFRESH ---
+# ingest_service.py appends sessions while dashboards are open and bumps the
+# data version; polling the (stat-only) version token picks that up within seconds.
+LIVE_REFRESH_S = 3
+
+
+@st.fragment(run_every=LIVE_REFRESH_S)
+def _watch_version(version):
+    if data_store.data_version() != version:
+        st.rerun(scope='app')
+
+
+def live_refresh(ds):
+    """ Sidebar toggle; while on, the whole app reruns (and reloads the data) when the data version changes. """
+    if st.sidebar.toggle("🔄 Live updates", value=True, help=f"Check for newly ingested sessions every {LIVE_REFRESH_S}s"):
+        _watch_version(ds.version)
+
+
+# --- GLOBAL SIDEBAR FILTERS ---
+def sidebar_filters(ds):
+    """
+    Draws the global filter set and returns the filtered Dataset view.
+    Views are cached per filter combination, so switching pages is free.
+    """
+    index = filter_engine.filter_index(ds)
+    labels = {'therapist': "Therapist / Parent", 'diagnosis': "Diagnosis", 'theme': "Theme"}
+
+    with st.sidebar.expander("🔎 Filters", expanded=False):
+        date_range = None
+        bounds = index.date_bounds()
+        if bounds:
+            picked = st.date_input("Session date", value=bounds, min_value=bounds[0], max_value=bounds[1])
+            # The widget returns a single date while a range is half-picked
+            if isinstance(picked, (list, tuple)) and len(picked) == 2 and tuple(picked) != bounds:
+                date_range = tuple(picked)
+
+        selections = {key: st.multiselect(labels[key], index.categories[key]) for key in index.categories}
+
+    view = filter_engine.filtered_dataset(ds, filter_engine.make_filter_key(date_range, **selections))
+    if view.df.empty:
+        st.warning("No sessions match the selected filters.")
+        st.stop()
+    return view
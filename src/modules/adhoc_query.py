@@ -0,0 +1,43 @@
+import time
+import streamlit as st
+
+def show(ds):
+    st.title("🧮 Ad-hoc Query")
+    st.markdown("### Ask a new research question in SQL, without writing an engine.")
+
+    try:
+        import sql_engine
+    except ImportError:
+        st.warning("The SQL engine needs DuckDB. Install it with `pip install duckdb` and reload.")
+        return
+
+    tables = sql_engine.tables()
+    with st.expander(f"📋 Tables ({len(tables)})"):
+        for name, columns in tables.items():
+            st.markdown(f"**{name}** · " + ", ".join(f"`{c}`" for c in columns))
+
+    example = st.selectbox("Start from an example", list(sql_engine.EXAMPLES))
+    with st.form("adhoc_sql"):
+        sql = st.text_area("SQL (DuckDB dialect, SELECT only)", value=sql_engine.EXAMPLES[example], height=180,
+                           key=f"sql_{example}")
+        c1, c2 = st.columns([1, 3])
+        max_rows = c1.number_input("Max rows", min_value=10, max_value=sql_engine.MAX_ROWS, value=1000, step=100)
+        submitted = st.form_submit_button("▶️ Run")
+
+    if not submitted:
+        st.caption("Queries run over the full silver / gold files; the sidebar filters do not apply here. "
+                   "Results are cached until the data changes.")
+        return
+
+    start = time.perf_counter()
+    try:
+        result, truncated, ran_ms = sql_engine.query_with_info(sql, int(max_rows))
+    except sql_engine.QueryError as exc:
+        st.error(str(exc))
+        return
+    took_ms = (time.perf_counter() - start) * 1000
+
+    source = f"cached (first run {ran_ms:.0f} ms)" if took_ms < ran_ms / 2 else f"{ran_ms:.0f} ms"
+    st.caption(f"{len(result):,} rows{f' (first {int(max_rows):,} shown)' if truncated else ''} · {source}")
+    st.dataframe(result, use_container_width=True, hide_index=True)
+    st.download_button("⬇️ Download CSV", result.to_csv(index=False).encode(), "query_result.csv", "text/csv")
@@ -0,0 +1,35 @@
+import streamlit as st
+import plotly.express as px
+import analytics_service as svc
+
+def show(ds):
+    st.title("🔗 Correlation Heatmap")
+    st.markdown("### How every questionnaire score moves with every other one (whole cohort).")
+
+    c1, c2 = st.columns([1, 1])
+    method = c1.radio("Method", ["Pearson", "Spearman"], horizontal=True,
+                      help="Spearman uses ranks, so it is robust to the 0-4 / 0-10 scale mix and outliers.")
+    alpha = c2.select_slider("Hide pairs with p above", options=[1.0, 0.1, 0.05, 0.01], value=1.0)
+
+    matrices = svc.correlation_matrix(ds, method)
+    if matrices is None:
+        st.warning("Correlation results not found. Please run 'src/analytics_gold_correlations.py' first.")
+        return
+    r, p = matrices
+
+    shown = r.where(p <= alpha) if alpha < 1.0 else r
+    fig = px.imshow(shown, color_continuous_scale='RdBu', zmin=-1, zmax=1, aspect='auto',
+                    labels={'color': f"{method} r"})
+    fig.update_layout(height=750, xaxis_title=None, yaxis_title=None)
+    fig.update_xaxes(tickangle=45)
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("Pairwise-complete: each cell uses the sessions where both questions were answered. "
+               "Computed by the gold correlation stage; filters in the sidebar do not apply here.")
+
+    st.divider()
+    st.subheader("🎯 Strongest Drivers of Social Impact (Q26)")
+    drivers = svc.top_correlates(ds, 'Q26', 10, method)
+    if drivers.empty:
+        st.info("Q26 is not in the stored correlation matrix.")
+    else:
+        st.dataframe(drivers.style.format({'r': '{:.2f}', 'p': '{:.4f}'}), use_container_width=True, hide_index=True)
@@ -1,36 +1,122 @@
 import streamlit as st
 import plotly.express as px
-import pandas as pd
+import analytics_service as svc
 
-def show(df):
+# Rolling time-series metric -> label (columns of gold_participant_timeseries.csv)
+ROLLING_LABELS = {'Q26': 'Social Impact', 'Q1': 'Engagement', 'Success': 'Success Rate',
+                  'Distress': 'Distress', 'Sentiment': 'Sentiment'}
+
+
+def rolling_window(ts):
+    """ Shortest rolling window stored for the participant (None without the gold table). """
+    if ts is None:
+        return None
+    windows = sorted(int(c.rsplit('_', 1)[1]) for c in ts.columns if c.startswith('Q26_Mean_'))
+    return windows[0] if windows else None
+
+
+def latest(ts, column):
+    values = ts[column].dropna() if column in ts.columns else []
+    return values.iloc[-1] if len(values) else None
+
+
+def fmt(value, pattern):
+    return pattern.format(value) if value is not None else "n/a"
+
+
+def show_alerts(ts):
+    """ Change alerts raised at the participant's latest session, then a list of earlier ones. """
+    alerts = [c for c in ts.columns if c.endswith('_Alert')]
+    flagged = ts[['session_number'] + alerts].melt('session_number', var_name='Metric', value_name='Alert')
+    flagged = flagged[flagged['Alert'].fillna('') != '']
+    if flagged.empty:
+        return
+    flagged['Metric'] = flagged['Metric'].str.replace('_Alert', '').map(ROLLING_LABELS)
+    last = flagged[flagged['session_number'] == ts['session_number'].max()]
+    for _, row in last.iterrows():
+        warn = st.warning if row['Alert'] == 'Regression' else st.success
+        warn(f"**{row['Alert']}** in {row['Metric']} at session {row['session_number']} (recent sessions vs. the ones before).")
+    with st.expander(f"Change alerts across all sessions ({len(flagged)})"):
+        st.dataframe(flagged.sort_values('session_number'), hide_index=True)
+
+
+def show(ds):
+    df = ds.df
     st.header("👤 Individual Patient Tracker")
     
     # Select Participant
     if 'participant_id' in df.columns:
-        participants = sorted(df['participant_id'].unique())
+        participants = svc.participant_ids(ds)
         pid = st.selectbox("Select Participant ID:", participants)
         
-        # Filter Data
-        p_data = df[df['participant_id'] == pid]
+        # Filter Data (row positions per participant are precomputed once per data version)
+        p_data = svc.participant_rows(ds, pid)
         
+        # Rolling means, slopes and change alerts are precomputed per participant (analytics_gold_rolling.py)
+        ts = svc.participant_timeseries(ds, pid)
+        window = rolling_window(ts)
+
         # Mini Metrics
         m1, m2, m3 = st.columns(3)
         m1.metric("Total Sessions", len(p_data))
-        m2.metric("Avg Impact", f"{p_data['Q26_Social_Impact_Numeric'].mean():.1f}")
-        m3.metric("Best Success Rate", f"{p_data['Success_Rate_Numeric'].max()}%")
+        if window:
+            impact, impact_slope = latest(ts, f"Q26_Mean_{window}"), latest(ts, f"Q26_Slope_{window}")
+            success, success_slope = latest(ts, f"Success_Mean_{window}"), latest(ts, f"Success_Slope_{window}")
+            m2.metric(f"Impact (last {window})", fmt(impact, "{:.1f}"), fmt(impact_slope, "{:+.2f} / session"))
+            m3.metric(f"Success Rate (last {window})", fmt(success, "{:.0f}%"), fmt(success_slope, "{:+.1f} pts / session"))
+            show_alerts(ts)
+        else:
+            m2.metric("Avg Impact", f"{p_data['Q26_Social_Impact_Numeric'].mean():.1f}")
+            m3.metric("Best Success Rate", f"{p_data['Success_Rate_Numeric'].max()}%")
         
         # Tabs for Charts vs Data
         tab1, tab2 = st.tabs(["Charts", "Raw Data"])
         
         with tab1:
             st.subheader("Progress Over Time")
-            # Dual Line Chart
-            fig_p = px.line(p_data, x='session_number', y=['Q26_Social_Impact_Numeric', 'Q1_Engagement_Numeric'],
-                            markers=True, title="Impact vs. Engagement")
+            if window:
+                metric = st.radio("Score:", [m for m in ROLLING_LABELS if m in ts.columns], horizontal=True,
+                                  format_func=ROLLING_LABELS.get)
+                means = [c for c in ts.columns if c.startswith(f"{metric}_Mean_")]
+                fig_p = px.line(ts, x='session_number', y=[metric] + means, markers=True,
+                                title=f"{ROLLING_LABELS[metric]}: session scores vs. rolling means")
+                flagged = ts[ts[f"{metric}_Alert"].fillna('') != '']
+                if len(flagged):
+                    fig_p.add_scatter(x=flagged['session_number'], y=flagged[metric], mode='markers', name='Change alert',
+                                      marker=dict(symbol='x', size=12, color='#e74c3c'), text=flagged[f"{metric}_Alert"])
+            else:
+                # Dual Line Chart
+                fig_p = px.line(p_data, x='session_number', y=['Q26_Social_Impact_Numeric', 'Q1_Engagement_Numeric'],
+                                markers=True, title="Impact vs. Engagement")
             st.plotly_chart(fig_p, use_container_width=True)
-            
+
+            # Model-based trajectory (stored mixed-effects fit, see analytics_gold_trajectories.py)
+            traj = svc.participant_trajectory(ds, pid, 'Q26')
+            cohort = svc.trajectory_model(ds, 'Q26')
+            if traj is not None and cohort is not None:
+                st.subheader("Model-Based Trajectory (Social Impact)")
+                t1, t2 = st.columns(2)
+                t1.metric("Personal Slope", f"{traj['Slope']:+.2f} pts/session",
+                          f"{traj['Slope'] - cohort['Slope']:+.2f} vs. cohort")
+                t2.metric("Cohort Slope", f"{cohort['Slope']:+.2f} pts/session",
+                          f"95% CI {cohort['Slope_CI_Low']:.2f} to {cohort['Slope_CI_High']:.2f}", delta_color="off")
+                x_line = [traj['First_Session'], traj['Last_Session']]
+                fig_t = px.scatter(p_data, x='session_number', y='Q26_Social_Impact_Numeric',
+                                   labels={'Q26_Social_Impact_Numeric': 'Social Impact Score (0-10)',
+                                           'session_number': 'Session Number'})
+                fig_t.add_scatter(x=x_line, y=[traj['Intercept'] + traj['Slope'] * x for x in x_line],
+                                  mode='lines', name='Participant (model)')
+                fig_t.add_scatter(x=x_line, y=[cohort['Intercept'] + cohort['Slope'] * x for x in x_line],
+                                  mode='lines', name='Cohort average', line=dict(dash='dash'))
+                st.plotly_chart(fig_t, use_container_width=True)
+                st.caption(f"Mixed-effects model ({cohort['Structure'].lower()}) fitted across all participants; "
+                           "the personal line borrows strength from the cohort, so it is steadier than a per-participant OLS fit.")
+
         with tab2:
             st.dataframe(p_data)
+            if ts is not None:
+                st.caption("Rolling metrics")
+                st.dataframe(ts)
             
     else:
         st.error("⚠️ Dataset missing 'participant_id' column.")
\ No newline at end of file
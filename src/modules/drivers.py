@@ -1,31 +1,18 @@
 import streamlit as st
 import plotly.express as px
-import pandas as pd
-from scipy import stats
+import analytics_service as svc
 
-def show(df, stats_df):
+def show(ds):
+    df = ds.df
     st.header("🔍 Drivers & Mechanisms")
     
     # --- 1. THE COMPARISON (Home vs. Clinic) ---
     st.subheader("🏆 Critical Analysis: What drives success?")
     st.markdown("Comparing Home Application vs. Story Engagement as predictors of Social Imapact.")
 
-    # A. Calculate Correlations
-    # 1. Home Application (Q20)
-    if 'applied_learning_Q20' in df.columns:
-        r_home, p_home = stats.pearsonr(df['applied_learning_Q20'], df['Q26_Social_Impact_Numeric'])
-    else:
-        r_home, p_home = 0.0, 1.0
-
-    # 2. Story Engagement (Q1)
-    if 'Q1_Engagement_Numeric' in df.columns:
-        r_engage, p_engage = stats.pearsonr(df['Q1_Engagement_Numeric'], df['Q26_Social_Impact_Numeric'])
-    else:
-        r_engage, p_engage = 0.0, 1.0
-
-    # B. Determine the Winner
-    winner = "Home Application" if abs(r_home) > abs(r_engage) else "Story Engagement"
-    diff = abs(r_home) - abs(r_engage)
+    # A. Correlations (Home Application Q20, Story Engagement Q1) & B. the Winner
+    m = svc.driver_metrics(ds)
+    r_home, r_engage, winner, diff = m['r_home'], m['r_engage'], m['winner'], m['diff']
     
     # C. Display Metrics
     c1, c2, c3 = st.columns(3)
@@ -41,17 +28,19 @@ def show(df, stats_df):
     with col1:
         st.subheader("Home Practice Effect")
         fig_home = px.scatter(df, x='applied_learning_Q20', y='Q26_Social_Impact_Numeric', 
-                              trendline='ols', 
                               title=f"Impact of Home Application (r={r_home:.2f})",
                               labels={'applied_learning_Q20': 'Home Application Score (0-4)', 'Q26_Social_Impact_Numeric': 'Social Impact Score'})
+        if m['home_line'] is not None:
+            fig_home.add_scatter(x=m['home_line'][0], y=m['home_line'][1], mode='lines', name='OLS trend', showlegend=False)
         st.plotly_chart(fig_home, use_container_width=True)
 
     with col2:
         st.subheader("Story Engagement Effect")
         fig_eng = px.scatter(df, x='Q1_Engagement_Numeric', y='Q26_Social_Impact_Numeric', 
-                             trendline='ols', 
                              title=f"Impact of Engagement (r={r_engage:.2f})",
                              labels={'Q1_Engagement_Numeric': 'Engagement Score (0-4)', 'Q26_Social_Impact_Numeric': 'Social Impact Score'})
+        if m['engage_line'] is not None:
+            fig_eng.add_scatter(x=m['engage_line'][0], y=m['engage_line'][1], mode='lines', name='OLS trend', showlegend=False)
         st.plotly_chart(fig_eng, use_container_width=True)
 
     # --- 3. CLINICAL INTERPRETATION ---
@@ -63,8 +52,20 @@ def show(df, stats_df):
         st.info(f"""
         **Clinical Insight:** **Engagement is the primary driver.**
         The data suggests that high engagement (r={r_engage:.2f}) is the most critical factor for success. If the child likes the story, they improve.
-        
+
         """)
+
+    # --- 4. THE FULL PICTURE (stored correlation matrix) ---
+    drivers = svc.top_correlates(ds, 'Q26', 5)
+    if not drivers.empty:
+        st.divider()
+        st.subheader("📊 Beyond Home vs. Engagement: Top 5 Correlates of Social Impact")
+        fig_top = px.bar(drivers.iloc[::-1], x='r', y='Question', orientation='h', range_x=[-1, 1],
+                         color='r', color_continuous_scale='RdBu', range_color=[-1, 1],
+                         hover_data={'p': ':.4f', 'N': True})
+        fig_top.update_layout(yaxis_title=None, coloraxis_showscale=False, height=300)
+        st.plotly_chart(fig_top, use_container_width=True)
+        st.caption("Whole-cohort Pearson r across all questions; see '7. Correlation Heatmap' for every pair.")
 '''
 #6.	Personalization Effect (Enjoyment): Do sessions with high Personalization Scores
 #  (Q2) consistently yield higher Enjoyment Scores (Q7) than sessions with low personalization?
@@ -1,39 +1,16 @@
 import streamlit as st
 import plotly.express as px
-import pandas as pd
-import numpy as np
-
-# --- HELPER FUNCTION ---
-def get_stat_text(stats_df, qid):
-    """Helper to fetch stat result safely"""
-    if not stats_df.empty and 'ID' in stats_df.columns:
-        row = stats_df[stats_df['ID'] == qid]
-        if not row.empty:
-            return f"**💡 Research Verdict:** {row.iloc[0]['Result']} (Stat: {row.iloc[0]['Stat']})"
-    return "💡 Calculation pending..."
+import analytics_service as svc
 
 # --- MAIN SHOW FUNCTION ---
-def show(df, stats_df):
+def show(ds):
+    df = ds.df
     st.header("🧪 Efficiency & Safety")
     
     # --- 1. METRICS ROW (Learning Speed) ---
-    # Calculate Response Time Drop (First 3 vs Last 3)
-    all_sessions = sorted(df['session_number'].unique())
-    if len(all_sessions) >= 2:
-        split_idx = min(3, len(all_sessions) // 2)
-        first_block = df[df['session_number'].isin(all_sessions[:split_idx])]['Q15_Response_Time_Seconds']
-        last_block = df[df['session_number'].isin(all_sessions[-split_idx:])]['Q15_Response_Time_Seconds']
-        
-        # Calculate % Drop & Cohen's d
-        avg_start = first_block.mean()
-        avg_end = last_block.mean()
-        pct_drop = ((avg_start - avg_end) / avg_start) * 100 if avg_start > 0 else 0
-        
-        pooled_sd = np.sqrt((first_block.std()**2 + last_block.std()**2) / 2)
-        cohens_d = (avg_start - avg_end) / pooled_sd if pooled_sd > 0 else 0.0
-        effect_label = "Large" if abs(cohens_d) > 0.8 else ("Medium" if abs(cohens_d) > 0.5 else "Small")
-    else:
-        pct_drop, cohens_d, effect_label = 0.0, 0.0, "N/A"
+    # Response Time Drop (First 3 vs Last 3) & Cohen's d from the shared analytics layer
+    m = svc.efficacy_metrics(ds)
+    pct_drop, cohens_d, effect_label, avg_end = m['pct_drop'], m['cohens_d'], m['effect_label'], m['avg_end']
 
     # Display Metrics
     #st.subheader("⚡ Speed of Adaptation (Learning Curve)")
@@ -50,7 +27,7 @@ def show(df, stats_df):
     # COLUMN 1: RESPONSE TIME (Learning Curve)
     with c1:
         st.subheader("Response Time Trajectory")
-        time_trend = df.groupby('session_number')['Q15_Response_Time_Seconds'].mean().reset_index()
+        time_trend = m['time_trend']
         
         fig_time = px.line(time_trend, x='session_number', y='Q15_Response_Time_Seconds', markers=True,
                            labels={'Q15_Response_Time_Seconds': 'Avg Response Time (Seconds)', 'session_number': 'Session'},
@@ -61,7 +38,7 @@ def show(df, stats_df):
         st.plotly_chart(fig_time, use_container_width=True)
         
         st.info(f"**Analysis:** The child became **{pct_drop:.1f}% faster on responsing to a emotion or question**") #, showing a **{effect_label}** clinical improvement (d={cohens_d:.2f}) .")
-       # st.caption(get_stat_text(stats_df, "Q2"))
+       # st.caption(svc.stat_text(ds, "Q2"))
 
    # COLUMN 2: SAFETY & DISTRESS (Adverse Events)
     with c2:
@@ -71,9 +48,7 @@ def show(df, stats_df):
         # 0=Not at all, 1=Rarely, 2=Occasionally, 3=Often, 4=Very Frequently
         # Clinical Threshold: We consider "Often" (3) and "Very Frequently" (4) as High Distress.
         
-        high_distress_count = len(df[df['distress_boredom_frustration_score_Q8'] >= 3])
-        total_sessions = len(df)
-        safety_rate = ((total_sessions - high_distress_count) / total_sessions) * 100 if total_sessions > 0 else 0
+        high_distress_count, safety_rate = m['high_distress_count'], m['safety_rate']
         
         # --- 2. VISUALIZATION ---
         fig_safe = px.scatter(df, x='session_number', y='distress_boredom_frustration_score_Q8',
@@ -103,5 +78,14 @@ def show(df, stats_df):
             st.success(f" **Protocol Safe:** 100% Safety Rate. No participants reported 'Often' or 'Very Frequent' distress.")
         else:
             st.warning(f" **Attention:** {high_distress_count} sessions reported distress levels of 'Often' (3) or higher. Safety Rate: {safety_rate:.1f}%")
+
+        # --- 4. EARLY WARNINGS (streaming engine, see distress_alerts.py) ---
+        early = svc.early_warnings(ds)
+        if early is not None:
+            with st.expander(f"🚨 Early-warning alerts ({len(early['alerts'])})"):
+                st.caption(" · ".join(f"{alert}: {n}" for alert, n in early['counts'].items()))
+                st.dataframe(early['alerts'][['participant_id', 'session_number', 'submitted_by', 'Alert', 'Severity',
+                                              'Distress', 'Consecutive_High', 'Engagement', 'Engagement_EWMA']],
+                             hide_index=True)
             
-       # st.caption(get_stat_text(stats_df, "Q3"))
\ No newline at end of file
+       # st.caption(svc.stat_text(ds, "Q3"))
\ No newline at end of file
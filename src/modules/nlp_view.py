@@ -1,8 +1,9 @@
 import streamlit as st
 import plotly.express as px
-import pandas as pd
+import analytics_service as svc
 
-def show(nlp_df, kw_df):
+def show(ds):
+    nlp_df, kw_df = ds.nlp, ds.keywords
     st.title("🧠 Natural Language Processing Insights")
     st.markdown("### Analyzing the 'Why' behind the numbers using RoBERTa NLP.")
     
@@ -19,20 +20,48 @@ def show(nlp_df, kw_df):
     
     with col2:
         st.subheader("Top Behavioral Keywords")
-        if not kw_df.empty:
+        # Distinctive terms per slice are precomputed (analytics_gold_terms.py); switching is a table lookup
+        slices = svc.term_slices(ds)
+        if slices:
+            s_col1, s_col2, s_col3 = st.columns(3)
+            dimension = s_col1.selectbox("Slice by:", list(slices))
+            group = s_col2.selectbox("Group:", slices[dimension])
+            metric = s_col3.radio("Rank by:", ['Log_Odds_Z', 'TF_IDF'], horizontal=True,
+                                  format_func=lambda m: 'Log-odds (z)' if m == 'Log_Odds_Z' else 'TF-IDF')
+            top_terms = svc.distinctive_terms(ds, dimension, group, metric)
+            if top_terms is not None:
+                fig_t = px.bar(top_terms, x=metric, y='Term', orientation='h', hover_data=['Count', 'Docs', 'Group_Docs'])
+                fig_t.update_layout(yaxis={'categoryorder': 'total ascending'}, height=400)
+                st.plotly_chart(fig_t, use_container_width=True)
+            else:
+                st.info("No distinctive terms for this group.")
+        elif not kw_df.empty:
             k_col1, k_col2 = st.columns(2)
             k_col1.success("**Positive Themes:**\n\n" + ", ".join(kw_df['Positive_Behaviors'].dropna().head(10).tolist()))
             k_col2.error("**Negative Themes:**\n\n" + ", ".join(kw_df['Negative_Behaviors'].dropna().head(10).tolist()))
 
+    # Strategy tags come from the same encoder pass as the sentiment (see analytics_gold_nlp.py)
+    strategies = svc.strategy_summary(ds)
+    if strategies is not None:
+        st.divider()
+        st.subheader("🧩 Intervention Strategies Detected")
+        fig_s = px.bar(strategies, x='Sessions', y='Strategy', orientation='h', color='Positive_Share',
+                       color_continuous_scale='RdYlGn', range_color=[0, 1],
+                       labels={'Positive_Share': 'Positive sentiment share'})
+        fig_s.update_layout(yaxis={'categoryorder': 'total ascending'})
+        st.plotly_chart(fig_s, use_container_width=True)
+
     st.divider()
     st.subheader("📝 Clinical Narrative Explorer")
     st.info("The Master Text below combines: Theme + Engagement + Success % + All qualitative comments.")
     
-    participants = sorted(nlp_df['participant_id'].unique())
+    participants = svc.participant_ids(ds, 'nlp')
     pid = st.selectbox("Select Participant for Narrative:", participants)
-    filtered_nlp = nlp_df[nlp_df['participant_id'] == pid]
+    filtered_nlp = svc.participant_rows(ds, pid, 'nlp')
     
     for _, row in filtered_nlp.iterrows():
         with st.expander(f"Session {row['session_number']} | Theme: {row.get('Theme_specific_situation', 'N/A')} | Sentiment: {row['Sentiment_Label']}"):
             st.markdown(f"**Confidence:** `{row['Sentiment_Score']:.2f}`")
+            if isinstance(row.get('Strategy_Tags'), str) and row['Strategy_Tags']:
+                st.markdown(f"**Strategies:** {row['Strategy_Tags']}")
             st.write(row['Master_Text'])
\ No newline at end of file
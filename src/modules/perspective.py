@@ -2,8 +2,10 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+import analytics_service as svc
 
-def show(df):
+def show(ds):
+    df = ds.df
     st.title(" Perspective Triangulation")
     st.markdown("### Inter-rater Reliability: Parent (P) vs. Therapist (T) on Social Impact Score")
 
@@ -12,19 +14,16 @@ def show(df):
         st.error("Column 'submitted_by' not found. Cannot perform comparison.")
         return
 
-    # Create separate dataframes
-    parent_df = df[df['submitted_by'] == 'P'].groupby('session_number')['Q26_Social_Impact_Numeric'].mean()
-    therapist_df = df[df['submitted_by'] == 'T'].groupby('session_number')['Q26_Social_Impact_Numeric'].mean()
+    # Per-session P vs T means (shared analytics layer)
+    m = svc.perspective_comparison(ds)
     
-    if len(parent_df) > 0 and len(therapist_df) > 0:
-        comparison_df = pd.DataFrame({'Parent_Score': parent_df, 'Therapist_Score': therapist_df}).reset_index()
-        comparison_df['Gap'] = comparison_df['Parent_Score'] - comparison_df['Therapist_Score']
-        avg_gap = comparison_df['Gap'].mean()
+    if m is not None:
+        comparison_df, avg_gap = m['comparison_df'], m['avg_gap']
         
         # Metrics
         m1, m2, m3 = st.columns(3)
-        m1.metric("Avg Parent Score", f"{parent_df.mean():.2f}", "Optimism Bias?")
-        m2.metric("Avg Therapist Score", f"{therapist_df.mean():.2f}", "Clinical Baseline")
+        m1.metric("Avg Parent Score", f"{m['parent_mean']:.2f}", "Optimism Bias?")
+        m2.metric("Avg Therapist Score", f"{m['therapist_mean']:.2f}", "Clinical Baseline")
         m3.metric("Perspective Gap", f"{avg_gap:.2f}", "Pos = Parent Higher")
         
         st.divider()
@@ -39,19 +38,58 @@ def show(df):
         
         fig_dual.update_layout(title="Parent vs. Therapist View", xaxis_title="Session", yaxis_title="Score (0-10)")
         st.plotly_chart(fig_dual, use_container_width=True)
-        '''
-        # Agreement Scatter
+
+        # Agreement Scatter (sessions rated by both, from the precomputed P/T pairs table)
         st.subheader("🧩 Agreement Matrix")
-        p_view = df[df['submitted_by'] == 'P'][['participant_id', 'session_number', 'Q26_Social_Impact_Numeric']].rename(columns={'Q26_Social_Impact_Numeric': 'Parent'})
-        t_view = df[df['submitted_by'] == 'T'][['participant_id', 'session_number', 'Q26_Social_Impact_Numeric']].rename(columns={'Q26_Social_Impact_Numeric': 'Therapist'})
-        
-        scatter_data = pd.merge(p_view, t_view, on=['participant_id', 'session_number'])
-        
-        if not scatter_data.empty:
-            fig_scat = px.scatter(scatter_data, x='Therapist', y='Parent', color='session_number', 
-                                  title="Correlation: Parent vs. Therapist Rating")
+        scatter_data = svc.rater_agreement(ds)
+        if scatter_data is not None:
+            fig_scat = px.scatter(scatter_data, x='Therapist', y='Parent', color='session_number',
+                                  hover_data=['participant_id'], title="Correlation: Parent vs. Therapist Rating")
             fig_scat.add_shape(type="line", x0=0, y0=0, x1=10, y1=10, line=dict(color="Red", dash="dash"))
             st.plotly_chart(fig_scat, use_container_width=True)
+        else:
+            st.info("No session has both a Parent and a Therapist rating in the current view.")
     else:
         st.warning("Not enough data to compare P vs T yet.")
-        '''
\ No newline at end of file
+
+    show_reliability(ds)
+
+
+def show_reliability(ds):
+    """ Stored reliability results (analytics_gold_reliability.py), no computation on render. """
+    overall = svc.reliability_table(ds, 'Overall')
+    if overall is None:
+        return
+
+    st.divider()
+    st.subheader("📏 Inter-rater Reliability (all questions)")
+    st.dataframe(overall[['Question', 'N_Pairs', 'ICC', 'ICC_Band', 'Kappa_Quadratic', 'Exact_Agreement',
+                          'Bias', 'LoA_Low', 'LoA_High']], hide_index=True, use_container_width=True)
+    st.caption("ICC(2,1): two-way random, absolute agreement. Kappa: quadratic weighted (ordinal scores only). "
+               "Bias and limits of agreement (Bland-Altman) are Parent minus Therapist. Whole-cohort results.")
+
+    questions = list(overall['Question'])
+    qid = st.selectbox("Question:", questions, index=questions.index('Q26') if 'Q26' in questions else 0)
+    row = overall[overall['Question'] == qid].iloc[0]
+
+    # Bland-Altman: per-session difference vs mean, with the stored bias and limits
+    pairs = svc.rater_agreement(ds, row['Column'])
+    if pairs is not None and pd.notna(row['Bias']):
+        ba = pairs.assign(Mean=(pairs['Parent'] + pairs['Therapist']) / 2, Difference=pairs['Parent'] - pairs['Therapist'])
+        fig_ba = px.scatter(ba, x='Mean', y='Difference', color='session_number', hover_data=['participant_id'],
+                            title=f"Bland-Altman: {qid} (Parent - Therapist)")
+        for value, dash in ((row['Bias'], 'solid'), (row['LoA_Low'], 'dash'), (row['LoA_High'], 'dash')):
+            if pd.notna(value):
+                fig_ba.add_hline(y=value, line=dict(color='red', dash=dash))
+        st.plotly_chart(fig_ba, use_container_width=True)
+
+    scope = st.radio("Break down by:", ['Therapist', 'Session'], horizontal=True)
+    breakdown = svc.reliability_table(ds, scope, qid)
+    if breakdown is not None:
+        fig_g = px.bar(breakdown, x='Group', y='ICC', hover_data=['N_Pairs', 'Kappa_Quadratic', 'Bias'],
+                       title=f"{qid} ICC by {scope.lower()}")
+        fig_g.update_xaxes(type='category')
+        st.plotly_chart(fig_g, use_container_width=True)
+        st.dataframe(breakdown.drop(columns=['Scope', 'Column']), hide_index=True, use_container_width=True)
+        if (breakdown['N_Pairs'] < 5).any():
+            st.caption("Groups with few paired sessions give unstable ICC / kappa; check N_Pairs.")
@@ -0,0 +1,273 @@
+import io
+import json
+import time
+import hashlib
+import argparse
+import threading
+import urllib.request
+from functools import lru_cache
+from urllib.parse import urlparse, parse_qs, urlencode
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pandas as pd
+import pyarrow as pa
+import data_store
+import filter_engine
+import analytics_service
+from analytics_service import Dataset
+
+# =========================================================
+# READ API (silver + gold for notebooks and reporting tools)
+# Serves the same memory-mapped Dataset the dashboard uses, loaded once and
+# reloaded only when data_store's data version changes. Every response is a
+# page of one table after the dashboard's own filters (filter_engine), as
+# JSON or an Arrow IPC stream. Encoded pages are LRU-cached per data version
+# and carry an ETag, so a consumer revalidating an unchanged page gets a 304.
+#
+#   python read_api.py --port 8766
+#       GET /v1/tables
+#       GET /v1/timelines?participant=113&page_size=100
+#       GET /v1/sentiment?therapist=Dr.%20Fozuch&date_from=2025-10-01&date_to=2025-10-31&format=arrow
+#   read_table('pt', therapist='Fatemeh Najafi')   # -> DataFrame, all pages
+# =========================================================
+
+DEFAULT_PORT = 8766
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 10_000
+RELOAD_CHECK_S = 1.0
+RESPONSE_CACHE_SIZE = 256
+ARROW_MIME = 'application/vnd.apache.arrow.stream'
+
+# Endpoint -> Dataset table. Session-keyed tables follow the filters; the rest are whole-cohort results.
+ENDPOINTS = {
+    'stats': 'stats',
+    'sessions': 'sessions',
+    'timelines': 'timeseries',
+    'pt': 'pairs',
+    'sentiment': 'nlp',
+    'reliability': 'reliability',
+    'alerts': 'alerts',
+    'silver': 'df'
+}
+# Query parameter -> filter_engine key
+FILTER_PARAMS = {'therapist': 'therapist', 'theme': 'theme', 'diagnosis': 'diagnosis'}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# --- DATA ---
+
+class DataHolder:
+    """ The current Dataset; the (stat-only) data version is checked at most once per RELOAD_CHECK_S. """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ds, self._checked = None, 0.0
+
+    def get(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._ds is None or now - self._checked >= RELOAD_CHECK_S:
+                self._checked = now
+                version = data_store.data_version()
+                if self._ds is None or self._ds.version != version:
+                    tables = data_store.load_dashboard_data()
+                    if tables is None:
+                        raise ApiError(503, "silver layer not found; run the pipeline first")
+                    self._ds = Dataset(tables, version)
+                    clear_caches()
+            return self._ds
+
+
+def _values(query, name):
+    """ Repeated and comma separated values of one query parameter. """
+    return tuple(sorted({v.strip() for raw in query.get(name, []) for v in raw.split(',') if v.strip()}))
+
+
+def parse_request(query):
+    """ Normalised, hashable request parameters (equivalent URLs share a cache entry and an ETag). """
+    def number(name, default, low, high):
+        try:
+            value = int(query.get(name, [default])[0])
+        except ValueError:
+            raise ApiError(400, f"'{name}' must be an integer")
+        if not low <= value <= high:
+            raise ApiError(400, f"'{name}' must be between {low} and {high}")
+        return value
+
+    date_from, date_to = query.get('date_from', [None])[0], query.get('date_to', [None])[0]
+    if bool(date_from) != bool(date_to):
+        raise ApiError(400, "give both 'date_from' and 'date_to'")
+    for value in (date_from, date_to):
+        if value and pd.isna(pd.to_datetime(value, errors='coerce')):
+            raise ApiError(400, f"unreadable date '{value}' (use YYYY-MM-DD)")
+    key = filter_engine.make_filter_key((date_from, date_to) if date_from else None,
+                                        **{k: list(_values(query, p)) for p, k in FILTER_PARAMS.items()})
+    fmt = query.get('format', ['json'])[0]
+    if fmt not in ('json', 'arrow'):
+        raise ApiError(400, "'format' must be json or arrow")
+    return {
+        'key': key,
+        'participants': _values(query, 'participant'),
+        'columns': _values(query, 'columns'),
+        'page': number('page', 1, 1, 10 ** 9),
+        'page_size': number('page_size', DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE),
+        'format': fmt
+    }
+
+
+@lru_cache(maxsize=64)
+def select_rows(ds, table, key, participants):
+    """ One table of the filtered view, narrowed to the given participants. Cached per data version. """
+    frame = getattr(filter_engine.filtered_dataset(ds, key), table)
+    if participants and 'participant_id' in frame.columns:
+        frame = frame[frame['participant_id'].astype(str).isin(participants)]
+    return frame
+
+
+@lru_cache(maxsize=RESPONSE_CACHE_SIZE)
+def render(ds, endpoint, params):
+    """ (body bytes, content type, total rows) for one page. Cached per data version + request. """
+    params = dict(params)
+    frame = select_rows(ds, ENDPOINTS[endpoint], params['key'], params['participants'])
+    if params['columns']:
+        unknown = [c for c in params['columns'] if c not in frame.columns]
+        if unknown:
+            raise ApiError(400, f"unknown columns: {', '.join(unknown)}")
+        frame = frame[list(params['columns'])]
+
+    total, size = len(frame), params['page_size']
+    start = (params['page'] - 1) * size
+    page = frame.iloc[start:start + size]
+
+    if params['format'] == 'arrow':
+        table = pa.Table.from_pandas(page, preserve_index=False)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue(), ARROW_MIME, total
+
+    # Rows are encoded by pandas; only the small envelope goes through json
+    envelope = json.dumps({'endpoint': endpoint, 'total': total, 'page': params['page'], 'page_size': size,
+                           'pages': -(-total // size), 'data': None})
+    body = envelope.replace('"data": null', f'"data": {page.to_json(orient="records", date_format="iso")}')
+    return body.encode(), 'application/json', total
+
+
+def clear_caches():
+    """ Drops pages, views and metrics cached for older data versions (they pin the old Dataset). """
+    render.cache_clear()
+    select_rows.cache_clear()
+    filter_engine.clear_caches()
+    analytics_service.clear_caches()
+
+
+def etag(ds, endpoint, params):
+    digest = hashlib.sha1(f"{ds.version}|{endpoint}|{sorted(params)}".encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+# --- HTTP ---
+
+def make_handler(holder):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def _send(self, status, body=b'', content_type='application/json', headers=None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if status != 304:
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if status != 304:
+                self.wfile.write(body)
+
+        def _error(self, status, message):
+            self._send(status, json.dumps({'error': message}).encode())
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split('/') if p]
+            try:
+                ds = holder.get()
+                if parts == ['v1', 'tables']:
+                    listing = {name: {'table': table, 'rows': len(getattr(ds, table)),
+                                      'columns': list(getattr(ds, table).columns)} for name, table in ENDPOINTS.items()}
+                    return self._send(200, json.dumps({'version': ds.version, 'endpoints': listing}).encode())
+                if len(parts) != 2 or parts[0] != 'v1' or parts[1] not in ENDPOINTS:
+                    raise ApiError(404, f"unknown endpoint; try /v1/tables or /v1/<{'|'.join(ENDPOINTS)}>")
+
+                query = parse_qs(url.query)
+                params = parse_request(query)
+                # Content negotiation: ?format= wins, else the Accept header
+                if 'format' not in query and ARROW_MIME in (self.headers.get('Accept') or ''):
+                    params['format'] = 'arrow'
+                params = tuple(sorted(params.items()))
+                tag = etag(ds, parts[1], params)
+                headers = {'ETag': tag, 'Cache-Control': 'no-cache', 'X-Data-Version': hashlib.sha1(ds.version.encode()).hexdigest()[:12]}
+                if tag in [t.strip() for t in (self.headers.get('If-None-Match') or '').split(',')]:
+                    return self._send(304, headers=headers)
+
+                body, content_type, total = render(ds, parts[1], params)
+                headers['X-Total-Count'] = str(total)
+                page, size = dict(params)['page'], dict(params)['page_size']
+                if page * size < total:
+                    next_query = {k: v for k, v in query.items() if k != 'page'}
+                    next_query['page'] = [str(page + 1)]
+                    headers['Link'] = f'<{url.path}?{urlencode(next_query, doseq=True)}>; rel="next"'
+                self._send(200, body, content_type, headers)
+            except ApiError as exc:
+                self._error(exc.status, str(exc))
+            except Exception as exc:
+                print(f"❌ {self.path}: {exc}")
+                self._error(500, str(exc))
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(port=DEFAULT_PORT, host='127.0.0.1'):
+    holder = DataHolder()
+    ds = holder.get()
+    server = ThreadingHTTPServer((host, port), make_handler(holder))
+    print(f"📚 Read API on http://{host}:{port}/v1/tables ({len(ds.df)} silver rows, version reload every {RELOAD_CHECK_S:g}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# --- CLIENT (for notebooks) ---
+
+def read_table(endpoint, base_url=f"http://127.0.0.1:{DEFAULT_PORT}", page_size=MAX_PAGE_SIZE, **params):
+    """
+    Fetches every page of an endpoint as one DataFrame over Arrow.
+    Filters are keyword arguments: participant=, therapist=, theme=, diagnosis=, date_from=, date_to=, columns=.
+    """
+    query = {k: ','.join(map(str, v)) if isinstance(v, (list, tuple)) else v for k, v in params.items()}
+    frames, page = [], 1
+    while True:
+        url = f"{base_url}/v1/{endpoint}?{urlencode({**query, 'format': 'arrow', 'page': page, 'page_size': page_size})}"
+        with urllib.request.urlopen(url) as response:
+            total = int(response.headers['X-Total-Count'])
+            frames.append(pa.ipc.open_stream(response.read()).read_pandas())
+        if page * page_size >= total:
+            return pd.concat(frames, ignore_index=True)
+        page += 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Paginated JSON / Arrow read API over the silver and gold tables.")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="HTTP port (default 8766)")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to bind (default localhost only)")
+    args = parser.parse_args()
+    serve(args.port, args.host)
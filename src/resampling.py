@@ -0,0 +1,205 @@
+import os
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# BATCHED RESAMPLING (bootstrap CIs + permutation p-values)
+# All B resamples are evaluated at once with matrix products instead of a
+# Python loop:
+#   - Cluster bootstrap: each resample draws participants with replacement,
+#     i.e. a B x P matrix of multinomial counts. Statistics are built from
+#     per-participant sums, so a resample is counts @ sums (cost B x P,
+#     independent of how many sessions each participant has).
+#   - Permutation: B shuffles of the labels / outcome as a B x n index
+#     matrix, processed in chunks to bound memory.
+# Every resampling call seeds its own generator, so results are
+# reproducible and don't depend on query order.
+# =========================================================
+
+N_RESAMPLES = int(os.environ.get('STATS_RESAMPLES', 10_000))
+SEED = int(os.environ.get('STATS_SEED', 2024))
+CI_LEVEL = 0.95
+
+# With fewer participants than this the cluster bootstrap has too few distinct
+# resamples to mean anything, so sessions are resampled instead (CI_Unit says which)
+MIN_CLUSTERS = 10
+
+# Max elements of one permutation chunk (B_chunk x n)
+CHUNK_ELEMENTS = 4_000_000
+
+
+class ClusterBootstrap:
+    """
+    Participant-level bootstrap.
+
+        boot = ClusterBootstrap(df['participant_id'], n_resamples=10_000, seed=1)
+        r = boot.pearson(df['x'], df['y'])      # array of B correlations
+    """
+
+    def __init__(self, clusters, n_resamples=None, seed=None, row_unit='session'):
+        self.codes, uniques = pd.factorize(np.asarray(clusters))
+        self.unit = 'participant'
+        if len(uniques) < MIN_CLUSTERS:
+            # row_unit names what a row is, for the CI_Unit column
+            self.codes, uniques = np.arange(len(self.codes)), self.codes
+            self.unit = row_unit
+        self.n_clusters = len(uniques)
+        self.n_resamples = n_resamples or N_RESAMPLES
+        rng = np.random.default_rng(SEED if seed is None else seed)
+        p = np.full(self.n_clusters, 1.0 / self.n_clusters) if self.n_clusters else np.array([])
+        self.counts = rng.multinomial(self.n_clusters, p, size=self.n_resamples).astype(float)
+
+    def totals(self, *values):
+        """ Resampled sums of each row-level value -> tuple of length-B arrays. """
+        return tuple(self.counts @ np.bincount(self.codes, weights=np.asarray(v, dtype=float), minlength=self.n_clusters)
+                     for v in values)
+
+    def _moments(self, x, y):
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        # Centring is free here and keeps the sums well conditioned
+        x, y = x - x.mean(), y - y.mean()
+        n, sx, sy, sxx, syy, sxy = self.totals(np.ones_like(x), x, y, x * x, y * y, x * y)
+        return n, n * sxy - sx * sy, n * sxx - sx ** 2, n * syy - sy ** 2
+
+    def pearson(self, x, y):
+        _, cov, var_x, var_y = self._moments(x, y)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return cov / np.sqrt(var_x * var_y)
+
+    def slope(self, x, y):
+        _, cov, var_x, _ = self._moments(x, y)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return cov / var_x
+
+    def group_means(self, y, in_group, rows=None):
+        """
+        Resampled (mean of y where in_group, mean of y elsewhere).
+        rows limits both groups to a subset; NaN values of y are skipped like Series.mean().
+        """
+        y, g = np.asarray(y, dtype=float), np.asarray(in_group, dtype=float)
+        keep = np.isfinite(y) & (True if rows is None else np.asarray(rows, dtype=bool))
+        y = np.where(keep, y, 0.0)
+        g1, g0 = g * keep, (1 - g) * keep
+        s1, n1, s0, n0 = self.totals(y * g1, g1, y * g0, g0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return s1 / n1, s0 / n0
+
+
+# --- PERMUTATION NULLS ---
+
+def _permutation_chunks(n, n_resamples, rng):
+    """ Yields B_chunk x n index matrices, each row a random permutation of range(n). """
+    chunk = max(1, min(n_resamples, CHUNK_ELEMENTS // max(n, 1)))
+    done = 0
+    while done < n_resamples:
+        size = min(chunk, n_resamples - done)
+        yield rng.permuted(np.tile(np.arange(n), (size, 1)), axis=1)
+        done += size
+
+
+def permutation_pearson(x, y, n_resamples=None, seed=None):
+    """ Null distribution of Pearson r with y shuffled against x (also the null for an OLS slope). """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    xc, yc = x - x.mean(), y - y.mean()
+    denom = np.sqrt((xc ** 2).sum() * (yc ** 2).sum())
+    rng = np.random.default_rng(SEED if seed is None else seed)
+    n_resamples = n_resamples or N_RESAMPLES
+    if denom == 0:
+        return np.full(n_resamples, np.nan)
+    return np.concatenate([yc[idx] @ xc / denom for idx in _permutation_chunks(len(x), n_resamples, rng)])
+
+
+def permutation_group_means(sums, counts, labels, n_resamples=None, seed=None):
+    """
+    Null distribution of (mean in group, mean outside group) with labels shuffled across units.
+    Units are rows (counts = 1) or whole participants (per-participant sums/counts)
+    when the label is a participant attribute such as gender.
+    """
+    sums, counts = np.asarray(sums, dtype=float), np.asarray(counts, dtype=float)
+    labels = np.asarray(labels, dtype=float)
+    rng = np.random.default_rng(SEED if seed is None else seed)
+    n_resamples = n_resamples or N_RESAMPLES
+    total_s, total_n = sums.sum(), counts.sum()
+    m1, m0 = [], []
+    for idx in _permutation_chunks(len(labels), n_resamples, rng):
+        shuffled = labels[idx]
+        s1, n1 = shuffled @ sums, shuffled @ counts
+        with np.errstate(invalid='ignore', divide='ignore'):
+            m1.append(s1 / n1)
+            m0.append((total_s - s1) / (total_n - n1))
+    return np.concatenate(m1), np.concatenate(m0)
+
+
+def cluster_sums(values, clusters):
+    """ Per-participant (sum, count) of a row-level value, plus the factorized participant codes. """
+    codes, uniques = pd.factorize(np.asarray(clusters))
+    values = np.asarray(values, dtype=float)
+    return (np.bincount(codes, weights=values, minlength=len(uniques)),
+            np.bincount(codes, minlength=len(uniques)).astype(float), codes)
+
+
+# --- PER-QUERY HELPERS ---
+
+def pearson_summary(boot, x, y, n_resamples=None, seed=None):
+    """ Bootstrap CI + permutation p for a Pearson correlation. """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    observed = np.corrcoef(x, y)[0, 1] if len(x) > 1 and x.std() > 0 and y.std() > 0 else np.nan
+    return summarise(boot.pearson(x, y), permutation_pearson(x, y, n_resamples, seed), observed, unit=boot.unit)
+
+
+def mean_difference_summary(boot, y, in_group, rows=None, clusters=None, n_resamples=None, seed=None):
+    """
+    Bootstrap CI + permutation p for mean(y | in_group) - mean(y | not in_group).
+    Pass clusters when the group is a participant attribute (e.g. gender):
+    labels are then shuffled between participants, not between sessions.
+    """
+    y_all, g_all = np.asarray(y, dtype=float), np.asarray(in_group, dtype=bool)
+    keep = np.isfinite(y_all) & (True if rows is None else np.asarray(rows, dtype=bool))
+    y, g = y_all[keep], g_all[keep]
+    if g.all() or not g.any():
+        return summarise()
+    observed = y[g].mean() - y[~g].mean()
+
+    m1, m0 = boot.group_means(y_all, g_all, rows=keep)
+
+    if clusters is None:
+        null1, null0 = permutation_group_means(y, np.ones_like(y), g, n_resamples, seed)
+    else:
+        sums, counts, codes = cluster_sums(y, np.asarray(clusters)[keep])
+        labels = np.zeros(len(sums), dtype=bool)
+        labels[codes[g]] = True  # group is constant within a participant
+        null1, null0 = permutation_group_means(sums, counts, labels, n_resamples, seed)
+    return summarise(m1 - m0, null1 - null0, observed, unit=boot.unit)
+
+
+# --- SUMMARIES ---
+
+def confidence_interval(boot, level=CI_LEVEL):
+    """ Percentile interval, ignoring degenerate resamples (e.g. zero variance). """
+    boot = np.asarray(boot, dtype=float)
+    boot = boot[np.isfinite(boot)]
+    if len(boot) == 0:
+        return np.nan, np.nan
+    tail = (1 - level) / 2 * 100
+    low, high = np.percentile(boot, [tail, 100 - tail])
+    return float(low), float(high)
+
+
+def permutation_p(null, observed):
+    """ Two-sided permutation p-value with the +1 correction (never exactly 0). """
+    null = np.asarray(null, dtype=float)
+    null = null[np.isfinite(null)]
+    if len(null) == 0 or not np.isfinite(observed):
+        return np.nan
+    return float((1 + (np.abs(null) >= abs(observed) - 1e-12).sum()) / (len(null) + 1))
+
+
+def summarise(boot=None, null=None, observed=np.nan, digits=3, unit=None):
+    """ CI_Low / CI_High / CI_Unit / Perm_p columns for one gold answer. """
+    low, high = confidence_interval(boot) if boot is not None else (np.nan, np.nan)
+    return {
+        'CI_Low': round(low, digits) if np.isfinite(low) else np.nan,
+        'CI_High': round(high, digits) if np.isfinite(high) else np.nan,
+        'CI_Unit': unit if boot is not None else None,
+        'Perm_p': round(permutation_p(null, observed), 4) if null is not None else np.nan
+    }
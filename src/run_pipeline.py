@@ -0,0 +1,318 @@
+import os
+import ast
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import data_store
+
+# =========================================================
+# PIPELINE ORCHESTRATOR (bronze -> silver -> gold)
+# Each stage declares its input/output files and the code it runs.
+# A stage is skipped when the content hash of its inputs, the hash of its
+# code and its settings (e.g. resample count) are unchanged since the last
+# successful run and its outputs still exist. Independent stages (the gold engines) run concurrently,
+# and a silver frame produced in this run is handed over in memory.
+# =========================================================
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.path.join(data_store.BASE_DIR, 'data', '.pipeline_state.json')
+# Part of every stage's code version: file locations and run logging
+SHARED_CODE = ['data_store.py', 'instrumentation.py']
+
+
+class Stage:
+    def __init__(self, name, run, inputs, outputs, code, deps=(), optional=False, settings=None):
+        self.name = name
+        self.run = run            # callable(frames) -> in-memory result or None
+        self.inputs = inputs      # files whose content decides if we rerun
+        self.outputs = outputs    # files the stage writes
+        # Source files that make up the stage's code version (plus their local imports and SHARED_CODE)
+        self.code = code_closure(list(code) + [os.path.join(SRC_DIR, name) for name in SHARED_CODE])
+        self.deps = tuple(deps)
+        self.optional = optional  # only runs when explicitly requested
+        self.settings = settings  # callable() -> dict of run settings that change the outputs (env knobs)
+
+
+# --- STAGE RUNNERS (imports are local so a skipped stage costs nothing) ---
+
+def _run_generate(frames):
+    import data_generator
+    return data_generator.generate_dataset()
+
+
+def _run_cleaning(frames, bronze=None):
+    import data_cleaning
+    return data_cleaning.run_cleaning_pipeline(bronze)
+
+
+def _run_stats(frames):
+    import analytics_gold_stats
+    return analytics_gold_stats.run_statistical_engine(frames.get('clean'))
+
+
+def _backend_settings():
+    import frame_backend
+    return {'backend': frame_backend.resolve()}
+
+
+def _stats_settings():
+    import resampling
+    return {**_backend_settings(), 'resamples': resampling.N_RESAMPLES, 'seed': resampling.SEED}
+
+
+def _run_nlp(frames):
+    import analytics_gold_nlp
+    return analytics_gold_nlp.run_nlp_engine(frames.get('clean'))
+
+
+def _run_terms(frames):
+    import analytics_gold_terms
+    return analytics_gold_terms.run_terms_engine()
+
+
+def _run_rolling(frames):
+    import analytics_gold_rolling
+    return analytics_gold_rolling.run_rolling_engine(frames.get('clean'))
+
+
+def _run_alerts(frames):
+    import distress_alerts
+    return distress_alerts.replay(frames.get('clean'))
+
+
+def _run_correlations(frames):
+    import analytics_gold_correlations
+    return analytics_gold_correlations.run_correlation_engine(frames.get('clean'))
+
+
+def _run_reliability(frames):
+    import analytics_gold_reliability
+    return analytics_gold_reliability.run_reliability_engine(frames.get('clean'))
+
+
+def _run_trajectories(frames):
+    import analytics_gold_trajectories
+    return analytics_gold_trajectories.run_trajectory_engine(frames.get('clean'))
+
+
+def build_stages(bronze=None):
+    """ bronze: .csv/.xlsx export (or a directory / glob of them) to clean instead of data_cleaning.INPUT_FILE. """
+    import analytics_gold_nlp
+    import data_cleaning
+    import distress_alerts
+    import data_generator
+    import silver_dedup
+    import silver_schema
+    src = lambda name: os.path.join(SRC_DIR, name)
+    bronze = bronze or data_cleaning.INPUT_FILE
+    return [
+        Stage('generate', _run_generate, inputs=[], outputs=[data_generator.OUTPUT_PATH],
+              code=[src('data_generator.py')], optional=True),
+        Stage('clean', lambda frames: _run_cleaning(frames, bronze), inputs=data_cleaning.resolve_inputs(bronze),
+              outputs=[data_cleaning.OUTPUT_FILE, silver_schema.QUARANTINE_FILE,
+                       silver_dedup.SESSIONS_FILE, silver_dedup.PAIRS_FILE],
+              code=[src('data_cleaning.py'), src('bronze_ingest.py'), src('silver_schema.py'), src('silver_dedup.py'),
+                    src('frame_backend.py'), src('data_generator.py')],
+              # Waits for a regenerated workbook when --generate selects that stage (ignored otherwise)
+              deps=['generate'], settings=_backend_settings),
+        Stage('stats', _run_stats, inputs=[data_store.SILVER_FILE, silver_dedup.SESSIONS_FILE],
+              outputs=[data_store.TABLES['stats']],
+              code=[src('analytics_gold_stats.py'), src('resampling.py'), src('silver_dedup.py'), src('frame_backend.py')],
+              deps=['clean'], settings=_stats_settings),
+        Stage('nlp', _run_nlp, inputs=[data_store.SILVER_FILE],
+              outputs=[data_store.TABLES['nlp'], data_store.TABLES['keywords'], analytics_gold_nlp.EMBEDDINGS_FILE],
+              code=[src('analytics_gold_nlp.py'), src('stream_pipeline.py'), src('data_generator.py')], deps=['clean']),
+        Stage('terms', _run_terms, inputs=[data_store.TABLES['nlp']],
+              outputs=[data_store.TABLES['terms']], code=[src('analytics_gold_terms.py')], deps=['nlp']),
+        Stage('rolling', _run_rolling, inputs=[silver_dedup.SESSIONS_FILE, data_store.TABLES['nlp']],
+              outputs=[data_store.TABLES['timeseries']], code=[src('analytics_gold_rolling.py')], deps=['clean', 'nlp']),
+        Stage('alerts', _run_alerts, inputs=[data_store.SILVER_FILE],
+              outputs=[distress_alerts.ALERTS_FILE, distress_alerts.STATE_FILE],
+              code=[src('distress_alerts.py')], deps=['clean']),
+        Stage('correlations', _run_correlations, inputs=[data_store.SILVER_FILE],
+              outputs=[data_store.TABLES['correlations']],
+              code=[src('analytics_gold_correlations.py')], deps=['clean']),
+        Stage('reliability', _run_reliability, inputs=[silver_dedup.PAIRS_FILE],
+              outputs=[data_store.TABLES['reliability']],
+              code=[src('analytics_gold_reliability.py')], deps=['clean']),
+        Stage('trajectories', _run_trajectories, inputs=[data_store.SILVER_FILE],
+              outputs=[data_store.TABLES['trajectories'], data_store.TABLES['trajectory_participants']],
+              code=[src('analytics_gold_trajectories.py')], deps=['clean'])
+    ]
+
+
+# --- HASHING & STATE ---
+
+def _module_imports(node):
+    """ Import statements that run when the module is imported (function bodies are skipped). """
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.Import, ast.ImportFrom)):
+            yield child
+        elif not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            yield from _module_imports(child)
+
+
+def local_imports(path):
+    """ src/ modules a source file imports at module level. """
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = set()
+    for node in _module_imports(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif node.module and not node.level:
+            names.add(node.module.split('.')[0])
+    return [os.path.join(SRC_DIR, f"{name}.py") for name in names if os.path.exists(os.path.join(SRC_DIR, f"{name}.py"))]
+
+
+def code_closure(paths):
+    """
+    The given files plus every src/ module they import, transitively, so an edit to a
+    shared module (instrumentation, data_store, silver_dedup, ...) reruns its stages.
+    Imports inside functions are not followed (they would pull in CLI-only helpers);
+    list those modules in the stage's code explicitly.
+    """
+    seen, todo = set(), list(paths)
+    while todo:
+        path = todo.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        if os.path.exists(path):
+            todo.extend(local_imports(path))
+    return sorted(seen)
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """ Streams the file through sha256 (None if it doesn't exist). """
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def combined_hash(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(f"{os.path.basename(path)}:{file_hash(path)};".encode())
+    return digest.hexdigest()
+
+
+def load_state():
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    tmp_path = f"{STATE_FILE}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def fingerprint(stage):
+    fp = {'inputs': combined_hash(stage.inputs), 'code': combined_hash(stage.code)}
+    if stage.settings:
+        fp['settings'] = stage.settings()
+    return fp
+
+
+def is_up_to_date(stage, state):
+    return (state.get(stage.name) == fingerprint(stage)
+            and all(os.path.exists(p) for p in stage.outputs))
+
+
+# --- SCHEDULER ---
+
+def topological_levels(stages):
+    """ Groups stages into levels; every stage in a level only depends on earlier levels. """
+    names = {s.name for s in stages}
+    remaining = {s.name: s for s in stages}
+    done, levels = set(), []
+    while remaining:
+        # Dependencies outside the selected stages count as satisfied (their outputs are on disk)
+        ready = [s for s in remaining.values() if all(d in done or d not in names for d in s.deps)]
+        if not ready:
+            raise ValueError(f"Cycle in pipeline stages: {sorted(remaining)}")
+        levels.append(ready)
+        for s in ready:
+            done.add(s.name)
+            del remaining[s.name]
+    return levels
+
+
+def run_pipeline(only=None, force=False, generate=False, max_workers=None, bronze=None):
+    """
+    Runs the bronze -> silver -> gold DAG, skipping up-to-date stages.
+    only: stage names to consider (default: all non-optional stages).
+    bronze: .csv/.xlsx export, directory or glob for the clean stage (default: data/bronze/data_bronze_raw.csv).
+    Returns {stage: 'ran' | 'skipped' | 'failed' | 'blocked'}.
+    """
+    stages = [s for s in build_stages(bronze) if (generate or not s.optional)]
+    if only:
+        stages = [s for s in stages if s.name in only]
+    names = {s.name for s in stages}
+
+    state = load_state()
+    frames, status = {}, {}
+    print(f"🚀 Pipeline: {' -> '.join(s.name for s in stages)}")
+
+    def execute(stage):
+        if any(status.get(d) in ('failed', 'blocked') for d in stage.deps if d in names):
+            return stage, 'blocked', None
+        if not force and is_up_to_date(stage, state):
+            return stage, 'skipped', None
+        try:
+            result = stage.run(frames)
+        except Exception as exc:
+            print(f"❌ Stage '{stage.name}' failed: {exc}")
+            return stage, 'failed', None
+        if result is None or not all(os.path.exists(p) for p in stage.outputs):
+            print(f"❌ Stage '{stage.name}' produced no output.")
+            return stage, 'failed', None
+        return stage, 'ran', result
+
+    for level in topological_levels(stages):
+        workers = max_workers or len(level)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for stage, outcome, result in pool.map(execute, level):
+                status[stage.name] = outcome
+                if outcome == 'ran':
+                    frames[stage.name] = result
+                    # Fingerprint after the run so downstream hashes see the new outputs
+                    state[stage.name] = fingerprint(stage)
+                    save_state(state)
+
+    for name, outcome in status.items():
+        icon = {'ran': '✅', 'skipped': '⏭️', 'failed': '❌', 'blocked': '⛔'}[outcome]
+        print(f"   {icon} {name}: {outcome}")
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the bronze -> silver -> gold pipeline.")
+    parser.add_argument('--only', help="Comma separated stages to consider, e.g. stats,nlp")
+    parser.add_argument('--force', action='store_true', help="Rerun stages even if up to date")
+    parser.add_argument('--generate', action='store_true', help="Also regenerate the synthetic bronze workbook")
+    parser.add_argument('--workers', type=int, default=None, help="Max concurrent stages per level")
+    parser.add_argument('--bronze', default=None, help="Bronze .csv/.xlsx export, directory or glob to clean")
+    parser.add_argument('--backend', choices=('pandas', 'polars'), default=None,
+                        help="Dataframe backend for cleaning and silver scans (see frame_backend.py)")
+    args = parser.parse_args()
+    if args.backend:
+        # Read by every stage (and stage worker process) through frame_backend.resolve()
+        os.environ['FRAME_BACKEND'] = args.backend
+
+    outcome = run_pipeline(only=args.only.split(',') if args.only else None,
+                           force=args.force, generate=args.generate, max_workers=args.workers,
+                           bronze=args.bronze)
+    sys.exit(1 if 'failed' in outcome.values() else 0)
@@ -0,0 +1,205 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from instrumentation import RunLogger
+
+# =========================================================
+# SILVER DEDUP + P/T RECONCILIATION
+# A session can arrive twice from the same rater (re-exported weekly
+# files, edited resubmissions) and once from each rater (Parent + Therapist).
+# Rows are hashed (pd.util.hash_pandas_object, one uint64 per row) on:
+#   - every content column   -> exact duplicates (dropped, first kept)
+#   - key + score columns    -> near duplicates: same scores, only text differs
+#                               (dropped, latest kept)
+#   - key columns            -> conflicts: same rater + session, different
+#                               scores (latest submission wins, logged)
+# Key = (participant_id, session_number, submitted_by). With multi-site input,
+# a session whose (non-identical) rows come from more than one site is a
+# participant-ID collision between clinics, not a resubmission: all of its
+# rows are quarantined as 'cross_site' instead of being resolved. The deduplicated rows
+# then give a canonical one-row-per-session table (P and T averaged) and a
+# P/T pairs table, both keyed by (participant_id, session_number), so the
+# gold stats and the perspective page don't rebuild them on every run/render.
+# =========================================================
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SILVER_DIR = os.path.join(BASE_DIR, 'data', 'silver', 'After_transformation_Data')
+SILVER_FILE = os.path.join(SILVER_DIR, 'silver_cleaned.csv')
+SESSIONS_FILE = os.path.join(SILVER_DIR, 'silver_sessions.csv')
+PAIRS_FILE = os.path.join(SILVER_DIR, 'silver_pairs.csv')
+DUPLICATES_FILE = os.path.join(BASE_DIR, 'data', 'silver', 'quarantine', 'silver_duplicates.csv')
+
+SESSION_KEY = ['participant_id', 'session_number']
+SUBMISSION_KEY = SESSION_KEY + ['submitted_by']
+
+# Provenance, not content: the same row re-sent in another weekly file is still the same row
+PROVENANCE_COLUMNS = ['source_file', 'site']
+SITE_COLUMN = 'site'
+
+SCORE_COLUMNS = [
+    'Q1_Engagement_Numeric', 'Q2_Personalization_Numeric', 'emotional_connection_Q3',
+    'verbal_participation_score_Q4', 'enjoyment_Q7', 'distress_boredom_frustration_score_Q8',
+    'initiation_Q9', 'creativity_Q11', 'relationship_impact_Q13', 'Q15_Response_Time_Seconds',
+    'theme_understand_Q18', 'applied_learning_Q20', 'confidence_Q21', 'generalisation_Q22',
+    'real_life_link_Q25', 'Q26_Social_Impact_Numeric', 'Success_Rate_Numeric'
+]
+
+# Session-level descriptors carried into the canonical table (first non-null per session)
+SESSION_COLUMNS = ['session_date', 'age', 'gender', 'Autism Level', "Theme of Today's Story"]
+
+RATERS = {'P': 'Parent', 'T': 'Therapist'}
+THERAPIST_COLUMN = 'therapist_parent_name'
+
+
+def row_hash(df, columns):
+    """ One uint64 per row over the given columns. """
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+
+def resolve_duplicates(df, run=None):
+    """
+    Drops exact / near duplicate submissions and resolves same-rater conflicts.
+    Sessions with rows from several sites are quarantined whole (Duplicate_Type 'cross_site').
+    Returns (deduplicated rows in original order, log of dropped rows with Duplicate_Type).
+    """
+    run = run or RunLogger('silver_dedup', log_file=False)
+    key = [c for c in SUBMISSION_KEY if c in df.columns]
+    scores = [c for c in SCORE_COLUMNS if c in df.columns]
+    content = [c for c in df.columns if c not in PROVENANCE_COLUMNS]
+
+    with run.span('hash_rows', rows=len(df)):
+        content_hash = row_hash(df, content)
+        score_hash = row_hash(df, key + scores)
+        key_hash = row_hash(df, key)
+
+    with run.span('resolve', rows=len(df)):
+        kind = np.full(len(df), None, dtype=object)
+        exact = pd.Series(content_hash).duplicated(keep='first').to_numpy()
+        kind[exact] = 'exact'
+        alive = ~exact
+        # Same session from two clinics: the IDs collide, neither row can supersede the other
+        if SITE_COLUMN in df.columns:
+            session_hash = row_hash(df, [c for c in SESSION_KEY if c in df.columns])
+            sites = pd.DataFrame({'session': session_hash[alive], 'site': df[SITE_COLUMN].to_numpy()[alive]})
+            shared = sites.groupby('session')['site'].nunique()
+            cross = alive.copy()
+            cross[alive] = sites['session'].map(shared).to_numpy() > 1
+            kind[cross] = 'cross_site'
+            alive &= ~cross
+        # Later rows are later submissions/files, so they supersede earlier ones
+        near = alive.copy()
+        near[alive] = pd.Series(score_hash[alive]).duplicated(keep='last').to_numpy()
+        kind[near] = 'near'
+        alive &= ~near
+        conflict = alive.copy()
+        conflict[alive] = pd.Series(key_hash[alive]).duplicated(keep='last').to_numpy()
+        kind[conflict] = 'conflict'
+        alive &= ~conflict
+
+        log_cols = key + [c for c in PROVENANCE_COLUMNS if c in df.columns]
+        dropped = df.loc[~alive, log_cols].assign(Duplicate_Type=kind[~alive])
+    return (df[alive] if not alive.all() else df), dropped
+
+
+def canonical_sessions(df):
+    """
+    One row per (participant_id, session_number): scores averaged over the
+    raters, plus which raters submitted (Raters = 'P', 'T' or 'P+T').
+    """
+    scores = [c for c in SCORE_COLUMNS if c in df.columns]
+    grouped = df.groupby(SESSION_KEY, sort=True)
+    sessions = grouped[scores].mean()
+    sessions.insert(0, 'N_Submissions', grouped.size())
+    if 'submitted_by' in df.columns:
+        flags = pd.DataFrame({r: df['submitted_by'].eq(r).to_numpy() for r in RATERS}, index=df.index)
+        has = flags.groupby([df[c] for c in SESSION_KEY], sort=True).any()
+        sessions.insert(1, 'Raters', np.select([has['P'] & has['T'], has['P'], has['T']], ['P+T', 'P', 'T'], ''))
+    descriptors = [c for c in SESSION_COLUMNS if c in df.columns]
+    if descriptors:
+        sessions = grouped[descriptors].first().join(sessions)
+    return sessions.reset_index()
+
+
+def pt_pairs(df):
+    """
+    Parent vs Therapist scores side by side, one row per session
+    (<score>_P / <score>_T; NaN where a rater didn't submit, Paired = both did).
+    Therapist is the name on the T submission.
+    """
+    scores = [c for c in SCORE_COLUMNS if c in df.columns]
+    if 'submitted_by' not in df.columns:
+        return pd.DataFrame(columns=SESSION_KEY + ['Paired'])
+    rated = df[df['submitted_by'].isin(list(RATERS))]
+    # Keys are unique after resolve_duplicates, so a plain unstack does the pairing
+    wide = rated.set_index(SUBMISSION_KEY)[scores].unstack('submitted_by')
+    wide = wide.reindex(columns=pd.MultiIndex.from_product([scores, list(RATERS)]))
+    wide.columns = [f"{score}_{rater}" for score, rater in wide.columns]
+    raters = rated.groupby(SESSION_KEY)['submitted_by'].nunique()
+    wide.insert(0, 'Paired', (raters.reindex(wide.index) == len(RATERS)).to_numpy())
+    if THERAPIST_COLUMN in rated.columns:
+        names = rated.loc[rated['submitted_by'] == 'T'].set_index(SESSION_KEY)[THERAPIST_COLUMN]
+        wide.insert(1, 'Therapist', names.reindex(wide.index).to_numpy())
+    return wide.reset_index()
+
+
+def build_session_tables(df, run=None):
+    """ (deduplicated silver, duplicates log, canonical sessions, P/T pairs). """
+    run = run or RunLogger('silver_dedup', log_file=False)
+    df, dropped = resolve_duplicates(df, run)
+    with run.span('canonical_sessions', rows=len(df)) as span:
+        sessions = canonical_sessions(df)
+        span.rows = len(sessions)
+    with run.span('pt_pairs', rows=len(df)) as span:
+        pairs = pt_pairs(df)
+        span.rows = len(pairs)
+    return df, dropped, sessions, pairs
+
+
+def save_session_tables(dropped, sessions, pairs):
+    os.makedirs(os.path.dirname(DUPLICATES_FILE), exist_ok=True)
+    dropped.to_csv(DUPLICATES_FILE, index=False)
+    sessions.to_csv(SESSIONS_FILE, index=False)
+    pairs.to_csv(PAIRS_FILE, index=False)
+
+
+def run_dedup(df=None):
+    """
+    Rebuilds the sessions / pairs tables (and dedups silver_cleaned.csv in place).
+    The cleaning pipeline already does this on every run; this is for a silver file edited by hand.
+    """
+    print("🧬 Starting Silver Dedup & P/T Reconciliation...")
+    run = RunLogger('silver_dedup')
+    if df is None:
+        if not os.path.exists(SILVER_FILE):
+            print(f"❌ Error: {SILVER_FILE} not found.")
+            return
+        with run.span('load') as span:
+            df = pd.read_csv(SILVER_FILE)
+            span.rows = len(df)
+
+    deduped, dropped, sessions, pairs = build_session_tables(df, run)
+    report(dropped, sessions, pairs)
+    with run.span('save', rows=len(deduped)):
+        if len(dropped):
+            deduped.to_csv(SILVER_FILE, index=False)
+        save_session_tables(dropped, sessions, pairs)
+    print(f"✅ DONE! Sessions and P/T pairs saved to: {SILVER_DIR}")
+    run.finish()
+    return sessions
+
+
+def report(dropped, sessions, pairs):
+    if len(dropped):
+        counts = dropped['Duplicate_Type'].value_counts()
+        print(f"   ⚠️ Dropped {len(dropped)} duplicate submissions: "
+              + ", ".join(f"{kind} x {n}" for kind, n in counts.items()))
+        if 'cross_site' in counts:
+            print(f"   ⚠️ {counts['cross_site']} rows quarantined: the same participant/session arrived from several sites "
+                  f"(see {DUPLICATES_FILE})")
+    print(f"   - {len(sessions)} sessions, {int(pairs['Paired'].sum()) if len(pairs) else 0} with both P and T.")
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description="Deduplicate silver and rebuild the session / P-T pair tables.").parse_args()
+    run_dedup()
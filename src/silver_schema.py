@@ -0,0 +1,170 @@
+import os
+import numpy as np
+import pandas as pd
+
+# =========================================================
+# SILVER SCHEMA + VALIDATION
+# One declarative entry per silver column: the bronze column it comes
+# from, its type, allowed range or categorical domain, and whether it may
+# be missing. compile_schema() turns the entries into arrays so that
+# validate() checks every numeric column at once on a 2D block (rows x
+# columns) instead of column by column. Rows that break a rule go to the
+# quarantine file with the rules they broke; missing-but-allowed values
+# are not violations (cleaning still fills mapped scores with 0).
+# =========================================================
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUARANTINE_DIR = os.path.join(BASE_DIR, 'data', 'silver', 'quarantine')
+QUARANTINE_FILE = os.path.join(QUARANTINE_DIR, 'silver_quarantine.csv')
+RULE_COUNTS_FILE = os.path.join(QUARANTINE_DIR, 'silver_quarantine_rules.csv')
+
+# Rows validated per block (bounds the temporary rows x columns arrays)
+BLOCK_ROWS = 262_144
+
+
+def score(source, high=4):
+    """ Questionnaire score: whole number from 0 to high, may be left blank. """
+    return {'source': source, 'dtype': 'int', 'min': 0, 'max': high, 'nullable': True}
+
+
+SILVER_SCHEMA = {
+    'session_number': {'source': 'session_number', 'dtype': 'int', 'min': 1, 'max': 500, 'nullable': False},
+    'submitted_by': {'source': 'submitted_by', 'dtype': 'category', 'domain': ['P', 'T'], 'nullable': True},
+
+    'Q1_Engagement_Numeric': score('engagement_score_Q1'),
+    'Q2_Personalization_Numeric': score('story_personalised_to_participant_Q2'),
+    'emotional_connection_Q3': score('demonstrate_emotional_connection_Q3'),
+    'verbal_participation_score_Q4': score('verbal_participation_score_Q4', high=10),
+    'enjoyment_Q7': score('sign_of_enjoyment_Q7'),
+    'distress_boredom_frustration_score_Q8': score('distress_boredom_frustration_score_Q8'),
+    'initiation_Q9': score('participant_initiate_interaction_Q9'),
+    'creativity_Q11': score('participant_try_creatively_changes_story_Q11'),
+    'relationship_impact_Q13': score('how_much_relationship_between_particiant& carer/parent Improved_Q13'),
+    'theme_understand_Q18': score('what_extend_participant_understand_theme_Q18'),
+    'applied_learning_Q20': score('applied_learning_during/immediately after session_both_P &T_Q20'),
+    'confidence_Q21': score('participant_feel_confidence&has_potential_appy_story_after_session_Q21'),
+    'generalisation_Q22': score('generalise_behaviour_outside_story_Q22'),
+    'real_life_link_Q25': score('Link_story_to_real_life_experiences_Q25'),
+    'Q26_Social_Impact_Numeric': score('how_much_different_scenarios_stories_impact_overall_social_behaviour_Q26', high=10),
+
+    # Parsed from '120 seconds' / '80%' strings; blank stays NaN
+    'Q15_Response_Time_Seconds': {'source': 'response_time_min_Q15', 'dtype': 'float', 'min': 0, 'max': 3600, 'nullable': True},
+    'Success_Rate_Numeric': {'source': 'success_percentage', 'dtype': 'float', 'min': 0, 'max': 100, 'nullable': True}
+}
+
+RULES = ['unparseable', 'out_of_range', 'not_integer', 'missing', 'not_in_domain']
+
+
+class CompiledSchema:
+    """ The numeric part of a schema as aligned arrays, plus the categorical checks. """
+
+    def __init__(self, schema, columns):
+        numeric = [c for c, spec in schema.items() if spec['dtype'] != 'category' and c in columns]
+        self.numeric = numeric
+        self.sources = [schema[c]['source'] for c in numeric]
+        self.low = np.array([schema[c].get('min', -np.inf) for c in numeric], dtype=float)
+        self.high = np.array([schema[c].get('max', np.inf) for c in numeric], dtype=float)
+        self.integer = np.array([schema[c]['dtype'] == 'int' for c in numeric])
+        self.required = np.array([not schema[c]['nullable'] for c in numeric])
+        self.categorical = [(c, schema[c]['domain'], schema[c]['nullable'])
+                            for c, spec in schema.items() if spec['dtype'] == 'category' and c in columns]
+
+
+def compile_schema(columns, schema=None):
+    return CompiledSchema(schema or SILVER_SCHEMA, set(columns))
+
+
+def _reasons(names, masks):
+    """ 'col:rule; col:rule' per row, from {rule: rows x columns mask} (failing rows only). """
+    n = next(iter(masks.values())).shape[0]
+    parts = [[] for _ in range(n)]
+    for rule, mask in masks.items():
+        for i, j in zip(*np.nonzero(mask)):
+            parts[i].append(f"{names[j]}:{rule}")
+    return np.array(['; '.join(p) for p in parts], dtype=object)
+
+
+def _numeric_array(series):
+    """ Numeric numpy view of a column (no copy for numpy int/float dtypes). """
+    values = pd.to_numeric(series, errors='coerce')
+    if values.dtype.kind in 'iuf' and isinstance(values.dtype, np.dtype):
+        return values.to_numpy()
+    return values.to_numpy(dtype=float, na_value=np.nan)
+
+
+def validate(df, raw=None, schema=None):
+    """
+    Checks df against the schema in one vectorized pass.
+    raw: {silver column: bronze Series before parsing}, for columns whose bronze
+    source was overwritten in place; others are read from df[source].
+    Returns (bad row mask, reasons for the bad rows, per-rule counts DataFrame).
+    """
+    compiled = compile_schema(df.columns, schema)
+    raw = raw or {}
+    n, names = len(df), compiled.numeric
+    counts = {rule: np.zeros(len(names), dtype=np.int64) for rule in RULES[:4]}
+    bad = np.zeros(n, dtype=bool)
+    reasons = pd.Series(index=df.index, dtype=object)
+
+    values = [_numeric_array(df[c]) for c in names]
+    present = [(raw[c] if c in raw else df[src]).notna().to_numpy() for c, src in zip(names, compiled.sources)]
+    # Integer dtypes are whole numbers already; only float columns need the check
+    check_whole = [j for j in np.flatnonzero(compiled.integer) if values[j].dtype.kind == 'f']
+
+    # --- NUMERIC: all columns of a row block at once ---
+    for start in range(0, n, BLOCK_ROWS):
+        stop = min(start + BLOCK_ROWS, n)
+        # Laid out columns x rows, so every column is contiguous and the
+        # per-column bounds broadcast down whole rows of the array
+        X = np.empty((len(names), stop - start))
+        given = np.empty(X.shape, dtype=bool)
+        for j in range(len(names)):
+            X[j] = values[j][start:stop]
+            given[j] = present[j][start:stop]
+
+        # Fast pass: a cell is fine if it is in range, or blank where blanks are allowed (NaN fails both)
+        ok = (X >= compiled.low[:, None]) & (X <= compiled.high[:, None])
+        ok |= ~given & ~compiled.required[:, None]
+        for j in check_whole:
+            ok[j] &= ~(X[j] - np.floor(X[j]) > 0)  # NaN compares False, so blanks pass
+        block_bad = ~ok.all(axis=0)
+        if not block_bad.any():
+            continue
+
+        # Slow pass on the failing rows only: which rule each cell broke (rows x columns)
+        rows = np.flatnonzero(block_bad)
+        Xb, gb = X[:, rows].T, given[:, rows].T
+        missing = np.isnan(Xb)
+        with np.errstate(invalid='ignore'):
+            masks = {
+                'unparseable': gb & missing,
+                'out_of_range': (Xb < compiled.low) | (Xb > compiled.high),
+                'not_integer': compiled.integer & ~missing & (Xb != np.floor(Xb)),
+                'missing': compiled.required & ~gb
+            }
+        for rule, mask in masks.items():
+            counts[rule] += mask.sum(axis=0)
+        reasons.iloc[start + rows] = _reasons(names, masks)
+        bad[start:stop] = block_bad
+
+    # --- CATEGORICAL: one isin per column ---
+    table = [(c, rule, int(counts[rule][j])) for rule in counts for j, c in enumerate(names)]
+    for column, domain, nullable in compiled.categorical:
+        col = df[column]
+        wrong = (~col.isin(domain) & (col.notna() if nullable else True)).to_numpy()
+        table.append((column, 'not_in_domain', int(wrong.sum())))
+        if wrong.any():
+            rule = f"{column}:not_in_domain"
+            rows = np.flatnonzero(wrong)
+            reasons.iloc[rows] = [f"{r}; {rule}" if isinstance(r, str) and r else rule for r in reasons.iloc[rows]]
+            bad |= wrong
+
+    rule_counts = pd.DataFrame(table, columns=['Column', 'Rule', 'Count'])
+    return bad, reasons[bad], rule_counts[rule_counts['Count'] > 0].reset_index(drop=True)
+
+
+def save_quarantine(quarantine, rule_counts):
+    """ Writes the quarantined rows and the per-rule counts (both empty when all rows passed). """
+    os.makedirs(QUARANTINE_DIR, exist_ok=True)
+    quarantine.to_csv(QUARANTINE_FILE, index=False)
+    rule_counts.to_csv(RULE_COUNTS_FILE, index=False)
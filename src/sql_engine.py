@@ -0,0 +1,210 @@
+import os
+import re
+import time
+import argparse
+from functools import lru_cache
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import data_store
+
+# =========================================================
+# AD-HOC SQL ENGINE (DuckDB, in-process)
+# Every silver / gold table in data_store.TABLES is registered as a DuckDB
+# view over its memory-mapped Arrow cache, so queries scan the columns they
+# need straight from the OS page cache: no pandas frame is built for the input,
+# only for the (small) result. One connection per data version; results are
+# LRU-cached per (data version, SQL) and dropped when the data changes.
+#
+#   python sql_engine.py --tables
+#   python sql_engine.py "SELECT therapist_parent_name, avg(Q26_Social_Impact_Numeric) FROM silver GROUP BY 1"
+#   sql_engine.query("SELECT ...")   # -> DataFrame
+# =========================================================
+
+# data_store table name -> SQL name (everything else keeps its name)
+SQL_NAMES = {'df': 'silver'}
+# Tables with a day-first 'session_date' string also get a parsed 'session_day' DATE column
+DATE_FORMATS = ['%d/%m/%Y', '%Y-%m-%d', '%d/%m/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S']
+MAX_ROWS = 10_000
+QUERY_CACHE_SIZE = 64
+
+EXAMPLES = {
+    "Social impact by therapist": """SELECT therapist_parent_name AS therapist,
+       count(*) AS submissions,
+       round(avg(Q26_Social_Impact_Numeric), 2) AS avg_social_impact
+FROM silver
+GROUP BY therapist
+ORDER BY avg_social_impact DESC""",
+    "Engagement trend by session": """SELECT session_number,
+       count(DISTINCT participant_id) AS participants,
+       round(avg(Q1_Engagement_Numeric), 2) AS avg_engagement,
+       round(avg(Success_Rate_Numeric), 2) AS avg_success
+FROM sessions
+GROUP BY session_number
+ORDER BY session_number""",
+    "Submissions per month and theme": """SELECT date_trunc('month', session_day) AS month,
+       Theme_specific_situation AS theme,
+       count(*) AS submissions
+FROM silver
+GROUP BY ALL
+ORDER BY month, submissions DESC""",
+    "Sentiment by outcome band": """SELECT Success_Band, Sentiment_Label, count(*) AS n,
+       round(avg(Sentiment_Score), 3) AS avg_score
+FROM nlp
+GROUP BY ALL
+ORDER BY Success_Band, n DESC""",
+    "Early-warning alerts per participant": """SELECT participant_id, Severity, Alert,
+       count(*) AS alerts, max(session_number) AS last_session
+FROM alerts
+GROUP BY ALL
+ORDER BY participant_id, alerts DESC"""
+}
+
+
+class QueryError(Exception):
+    pass
+
+
+def sql_name(name):
+    return SQL_NAMES.get(name, name)
+
+
+class QueryEngine:
+    """ A DuckDB connection with every available table registered as a read-only view. """
+
+    def __init__(self, version=None):
+        self.version = version
+        self.con = duckdb.connect(':memory:')
+        self.columns, self.arrow = {}, {}
+
+        silver = data_store.SILVER_FILE if os.path.exists(data_store.SILVER_FILE) else data_store.SILVER_FALLBACK
+        sources = {**data_store.TABLES, 'df': silver}
+        for name, path in sources.items():
+            if not os.path.exists(path):
+                continue
+            # 1. Zero-copy Arrow table over the Feather cache (shared with the dashboard)
+            arrow = feather.read_table(data_store.build_arrow_cache(path), memory_map=True)
+            self.arrow[f"_{sql_name(name)}_arrow"] = arrow
+            self.con.register(f"_{sql_name(name)}_arrow", arrow)
+
+            # 2. Public view (with a parsed date when the table has session_date)
+            extra = ''
+            if 'session_date' in arrow.column_names:
+                formats = ', '.join(f"'{f}'" for f in DATE_FORMATS)
+                extra = f", CAST(try_strptime(CAST(session_date AS VARCHAR), [{formats}]) AS DATE) AS session_day"
+            self.con.execute(f'CREATE VIEW "{sql_name(name)}" AS SELECT *{extra} FROM "_{sql_name(name)}_arrow"')
+            self.columns[sql_name(name)] = list(arrow.column_names) + (['session_day'] if extra else [])
+
+        # Analysts get the registered tables only: no file reads/writes, no extensions
+        self.con.execute("SET enable_external_access = false")
+        self.con.execute("SET lock_configuration = true")
+
+    def tables(self):
+        """ SQL table name -> column names. """
+        return self.columns
+
+    def cursor(self):
+        """
+        Per-call cursor: a DuckDB connection must not be shared between threads (Streamlit sessions).
+        Registered Arrow tables are connection-local, so each cursor gets them too (pointer only, no copy).
+        """
+        cursor = self.con.cursor()
+        for name, arrow in self.arrow.items():
+            cursor.register(name, arrow)
+        return cursor
+
+    def check(self, sql):
+        """ Rejects anything but a single read-only SELECT. """
+        try:
+            statements = self.con.extract_statements(sql)
+        except duckdb.Error as exc:
+            raise QueryError(str(exc).splitlines()[0])
+        if len(statements) != 1:
+            raise QueryError("Run one statement at a time.")
+        if statements[0].type != duckdb.StatementType.SELECT:
+            raise QueryError(f"Only SELECT queries are allowed (got {statements[0].type.name}).")
+
+    def run(self, sql, max_rows=MAX_ROWS, params=None):
+        """ Runs a SELECT and returns (Arrow table, truncated flag). """
+        sql = normalise(sql)
+        self.check(sql)
+        cursor = self.cursor()
+        try:
+            limited = f"SELECT * FROM (\n{sql}\n) AS q LIMIT {int(max_rows) + 1}" if max_rows else sql
+            result = cursor.execute(limited, params).fetch_arrow_table()
+        except duckdb.Error as exc:
+            raise QueryError(str(exc))
+        finally:
+            cursor.close()
+        truncated = bool(max_rows) and result.num_rows > max_rows
+        return (result.slice(0, max_rows) if truncated else result), truncated
+
+    def explain(self, sql):
+        sql = normalise(sql)
+        self.check(sql)
+        cursor = self.cursor()
+        try:
+            return "\n".join(row[-1] for row in cursor.execute(f"EXPLAIN {sql}").fetchall())
+        finally:
+            cursor.close()
+
+
+def normalise(sql):
+    """ Trims whitespace and trailing semicolons (so trivially different texts share a cache entry). """
+    return re.sub(r'[\s;]+$', '', sql.strip())
+
+
+@lru_cache(maxsize=1)
+def engine(version):
+    """ The engine for one data version (rebuilt, and the old one dropped, when the data changes). """
+    return QueryEngine(version)
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _cached_query(version, sql, max_rows):
+    start = time.perf_counter()
+    table, truncated = engine(version).run(sql, max_rows)
+    frame = table.to_pandas(types_mapper={pa.string(): pd.StringDtype('pyarrow')}.get)
+    return frame, truncated, round((time.perf_counter() - start) * 1000, 1)
+
+
+def query(sql, max_rows=MAX_ROWS, version=None):
+    """
+    Runs a read-only SELECT over the silver / gold tables and returns a DataFrame.
+    Results are cached per data version; at most max_rows rows are returned.
+    """
+    frame, _, _ = query_with_info(sql, max_rows, version)
+    return frame
+
+
+def query_with_info(sql, max_rows=MAX_ROWS, version=None):
+    """ Like query(), plus (truncated, ms the query took when it actually ran). """
+    return _cached_query(version or data_store.data_version(), normalise(sql), max_rows)
+
+
+def tables(version=None):
+    return engine(version or data_store.data_version()).tables()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run ad-hoc SQL over the silver and gold tables (DuckDB).")
+    parser.add_argument('sql', nargs='?', help="SELECT statement (table names: see --tables)")
+    parser.add_argument('--tables', action='store_true', help="List the queryable tables and their columns")
+    parser.add_argument('--explain', action='store_true', help="Print the query plan instead of running the query")
+    parser.add_argument('--max-rows', type=int, default=50, help="Rows to print (default 50)")
+    args = parser.parse_args()
+
+    pd.set_option('display.width', 200)
+    if args.tables or not args.sql:
+        for name, cols in tables().items():
+            print(f"📋 {name}: {', '.join(cols)}")
+    elif args.explain:
+        print(engine(data_store.data_version()).explain(args.sql))
+    else:
+        try:
+            result, truncated, ms = query_with_info(args.sql, args.max_rows)
+        except QueryError as exc:
+            raise SystemExit(f"❌ {exc}")
+        print(result.to_string(index=False))
+        print(f"\n⏱️ {len(result)} rows{' (truncated)' if truncated else ''} in {ms} ms")
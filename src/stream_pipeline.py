@@ -0,0 +1,188 @@
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+
+# =========================================================
+# BOUNDED-QUEUE STREAMING PIPELINE
+# source -> stage -> stage -> ... -> sink. The source and every stage run
+# on their own thread, joined by bounded queues: a slow stage blocks the
+# put() of the one before it, so only ~queue_size items per hop are ever in
+# memory while all stages work at the same time. A stage with workers > 1
+# fans out to a thread pool and still hands results on in input order.
+# The sink runs on the calling thread. The first exception raised anywhere
+# stops every stage and is re-raised to the caller.
+# =========================================================
+
+QUEUE_SIZE = 8
+POLL_S = 0.1
+
+_DONE = object()
+_STOPPED = object()
+
+
+class StreamStage:
+    """
+    fn(item) -> item. expand=True: fn returns an iterable and each element is passed on.
+    workers > 1 runs fn in a thread pool (the work must release the GIL to gain anything,
+    e.g. Rust tokenizers, numpy, torch).
+    """
+
+    def __init__(self, name, fn, workers=1, expand=False):
+        if expand and workers > 1:
+            raise ValueError("expand stages run on a single worker")
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.expand = expand
+
+
+class _Timer:
+    """ Busy wall / CPU time and output rows of one stage, summed over its calls (any thread). """
+
+    def __init__(self, size):
+        self.size = size
+        self.wall = self.cpu = 0.0
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def call(self, fn, *args):
+        wall0, cpu0 = time.perf_counter(), time.thread_time()
+        out = fn(*args)
+        wall, cpu = time.perf_counter() - wall0, time.thread_time() - cpu0
+        with self._lock:
+            self.wall += wall
+            self.cpu += cpu
+        return out
+
+    def count(self, item):
+        with self._lock:
+            self.rows += self.size(item)
+
+
+class StreamPipeline:
+    """
+        pipeline = StreamPipeline([StreamStage('parse', parse), StreamStage('score', score, workers=4)])
+        pipeline.run(iter_chunks(), sink=write, run=run, source_name='read')
+    """
+
+    def __init__(self, stages, queue_size=QUEUE_SIZE, size=len):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.size = size
+        self._stop = threading.Event()
+        self._error = None
+        self._lock = threading.Lock()
+
+    # --- QUEUE HELPERS (give up as soon as any stage has failed) ---
+
+    def _put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=POLL_S)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                item = q.get(timeout=POLL_S)
+            except queue.Empty:
+                continue
+            # Pool stages pass futures on in submission order; resolving here keeps the order
+            return item.result() if isinstance(item, Future) else item
+        return _STOPPED
+
+    def _fail(self, error):
+        with self._lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    # --- THREAD BODIES ---
+
+    def _source(self, source, outbox, timer):
+        try:
+            iterator = iter(source)
+            while True:
+                item = timer.call(next, iterator, _DONE)
+                if item is _DONE:
+                    break
+                timer.count(item)
+                if not self._put(outbox, item):
+                    return
+            self._put(outbox, _DONE)
+        except BaseException as error:
+            self._fail(error)
+
+    def _stage(self, stage, inbox, outbox, timer):
+        pool = ThreadPoolExecutor(stage.workers, thread_name_prefix=stage.name) if stage.workers > 1 else None
+        try:
+            while True:
+                item = self._get(inbox)
+                if item is _STOPPED:
+                    return
+                if item is _DONE:
+                    self._put(outbox, _DONE)
+                    return
+                if pool is not None:
+                    future = pool.submit(self._timed_call, stage, timer, item)
+                    if not self._put(outbox, future):
+                        return
+                    continue
+                # Expanded outputs are materialised inside the timer so lazy generators are timed too
+                out = timer.call(lambda i: list(stage.fn(i)), item) if stage.expand else (timer.call(stage.fn, item),)
+                for result in out:
+                    timer.count(result)
+                    if not self._put(outbox, result):
+                        return
+        except BaseException as error:
+            self._fail(error)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=self._stop.is_set())
+
+    def _timed_call(self, stage, timer, item):
+        out = timer.call(stage.fn, item)
+        timer.count(out)
+        return out
+
+    # --- RUN ---
+
+    def run(self, source, sink, run=None, source_name='read', sink_name='write'):
+        """
+        Streams every item of source through the stages into sink(item).
+        Per-stage busy time (wall / CPU, summed over calls) and rows are logged to run.
+        """
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        timers = {name: _Timer(self.size) for name in [source_name] + [s.name for s in self.stages] + [sink_name]}
+        threads = [threading.Thread(target=self._source, args=(source, queues[0], timers[source_name]),
+                                    name=source_name, daemon=True)]
+        for i, stage in enumerate(self.stages):
+            threads.append(threading.Thread(target=self._stage, args=(stage, queues[i], queues[i + 1], timers[stage.name]),
+                                            name=stage.name, daemon=True))
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _STOPPED or item is _DONE:
+                    break
+                timers[sink_name].call(sink, item)
+                timers[sink_name].count(item)
+        except BaseException as error:
+            self._fail(error)
+        finally:
+            if self._error is not None:
+                self._stop.set()
+            for thread in threads:
+                thread.join()
+
+        if self._error is not None:
+            raise self._error
+        if run is not None:
+            for name, timer in timers.items():
+                run.record(name, timer.wall, timer.cpu, rows=timer.rows)